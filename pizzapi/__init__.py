@@ -1,12 +1,62 @@
-from .address import Address
-from .customer import Customer
-from .menu import Menu
-from .order import Order
-from .payment import PaymentObject
-from .store import Store
-from .track import track_by_order, track_by_phone, Tracking
-from .utils import request_json, request_xml
-from .item import Item
-from .image import Image
-from .nearby_stores import NearbyStores
-from .amounts_breakdown import AmountsBreakdown
+import sys
+
+# Public names and the submodule each one lives in. Submodules are only
+# imported when one of their names is first used, so `from pizzapi import
+# Address` doesn't load the menu, order or HTTP machinery.
+_EXPORTS = {
+    'address': ('Address',),
+    'address_parser': ('ParsedAddress', 'parse_address', 'parse_addresses', 'parse_address_csv'),
+    'customer': ('Customer',),
+    'menu': ('Menu',),
+    'order': ('Order',),
+    'order_journal': ('OrderJournal', 'OrderInDoubtError'),
+    'order_validator': ('OrderValidator', 'ValidationIssue'),
+    'payment': ('PaymentObject', 'card_type', 'luhn_valid', 'validate_cards'),
+    'store': ('Store', 'StoreProfileCache', 'StoreSummary'),
+    'store_index': ('StoreIndex',),
+    'track': ('track_by_order', 'track_by_phone', 'iter_track_by_phone', 'Tracking', 'StatusEvent'),
+    'tracker': ('OrderTracker', 'TrackedOrder'),
+    'utils': ('request_json', 'request_xml'),
+    'item': ('Item',),
+    'image': ('Image', 'ImageCache', 'PrefetchReport', 'prefetch_images'),
+    'nearby_stores': ('NearbyStores',),
+    'pipeline': ('OrderPipeline', 'PipelineResult'),
+    'scheduler': ('OrderScheduler', 'ScheduledOrder'),
+    'service_hours': ('ServiceHours',),
+    'amounts_breakdown': ('AmountsBreakdown', 'AmountsBreakdownBatch'),
+    'cache': ('TTLCache',),
+    'client': ('PizzaClient',),
+    'hooks': ('RequestEvent', 'Metrics', 'Exporter', 'LoggingExporter', 'PeriodicExporter',
+              'add_hook', 'remove_hook'),
+}
+
+_MODULES = {name: module for module, names in _EXPORTS.items() for name in names}
+
+# Submodules reachable as attributes (pizzapi.menu etc.) without an import
+_SUBMODULES = set(_EXPORTS) | {'dominos_format', 'profiling', 'urls'}
+
+__all__ = list(_MODULES)
+
+
+def __getattr__(name):
+    from importlib import import_module
+    if name in _SUBMODULES:
+        # Importing a submodule binds it in globals() itself
+        return import_module('.' + name, __name__)
+    module = _MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module('.' + module, __name__), name)
+    # Cache it so __getattr__ isn't called for this name again
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+if sys.version_info < (3, 7):
+    # No module __getattr__ (PEP 562) before 3.7: import everything now
+    for _name in __all__:
+        __getattr__(_name)
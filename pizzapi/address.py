@@ -1,8 +1,6 @@
-from .store import Store
-from .utils import request_json
 from .urls import Urls, COUNTRY_USA
 from .dominos_format import DominosFormat
-import re
+from .address_parser import parse_address, canonical_key
 
 
 class Address(DominosFormat):
@@ -29,6 +27,13 @@ class Address(DominosFormat):
 
     def __init__(self, street='', city='', region='', zip='', country=COUNTRY_USA, *args):
         super().__init__()
+
+        # Additional address fields
+        self.street_number = ''
+        self.street_name = ''
+        self.unit_type = ''
+        self.unit_number = ''
+        self.delivery_instructions = ''
         
         # Handle string parsing
         if isinstance(street, str) and not city and not region and not zip:
@@ -39,51 +44,21 @@ class Address(DominosFormat):
             self.region = str(region).strip()
             self.postal_code = str(zip).strip()
             
-        # Additional address fields
-        self.street_number = ''
-        self.street_name = ''
-        self.unit_type = ''
-        self.unit_number = ''
-        self.delivery_instructions = ''
         
         self.urls = Urls(country)
         self.country = country
         
     def parse_address_string(self, address_string):
-        """Parse a full address string into components."""
-        # Simple parsing - can be enhanced
-        parts = address_string.split(', ')
-        
-        if len(parts) >= 3:
-            self.street = parts[0].strip()
-            self.city = parts[1].strip()
-            
-            # Handle state and zip
-            state_zip = parts[2].strip()
-            state_zip_parts = state_zip.split(' ')
-            if len(state_zip_parts) >= 2:
-                self.region = state_zip_parts[0]
-                self.postal_code = ' '.join(state_zip_parts[1:])
-            else:
-                self.region = state_zip
-                self.postal_code = ''
-        elif len(parts) == 2:
-            self.street = parts[0].strip()
-            city_state = parts[1].strip()
-            # Try to split city and state
-            city_state_parts = city_state.rsplit(' ', 1)
-            if len(city_state_parts) == 2:
-                self.city = city_state_parts[0]
-                self.region = city_state_parts[1]
-            else:
-                self.city = city_state
-                self.region = ''
-            self.postal_code = ''
-        else:
-            self.street = address_string.strip()
-            self.city = ''
-            self.region = ''
-            self.postal_code = ''
+        """Parse a full address string into components (see address_parser.parse_address)."""
+        parsed = parse_address(address_string)
+        self.street = parsed.street
+        self.street_number = parsed.street_number
+        self.street_name = parsed.street_name
+        self.unit_type = parsed.unit_type
+        self.unit_number = parsed.unit_number
+        self.city = parsed.city
+        self.region = parsed.region
+        self.postal_code = parsed.postal_code
 
     @property
     def data(self):
@@ -106,6 +81,11 @@ class Address(DominosFormat):
         """Get the second line of the address."""
         return f"{self.city} {self.region} {self.postal_code}".strip()
         
+    @property
+    def canonical_key(self):
+        """Get a canonical key for the address, suitable as a cache key."""
+        return canonical_key(self.line1, self.city, self.region, self.postal_code)
+
     @property
     def address_lines(self):
         """Get address lines as a dictionary."""
@@ -114,9 +94,19 @@ class Address(DominosFormat):
             'line2': self.line2
         }
 
-    def closest_store(self, service='Delivery'):
-        from .nearby_stores import NearbyStores
-        nearby = NearbyStores(self, service)
-        if not nearby.stores:
+    def closest_store(self, service='Delivery', index=None, latitude=None, longitude=None):
+        """Get the closest open store.
+
+        With a StoreIndex and the address's coordinates the store is found
+        locally when the index covers the address; otherwise the store
+        locator API is called (and its response added to the index).
+        """
+        if index is not None:
+            stores = index.lookup(self, latitude, longitude, 1, service)
+        else:
+            from .nearby_stores import NearbyStores
+            closest = NearbyStores(self, service).get_closest_store()
+            stores = [closest] if closest else []
+        if not stores:
             raise Exception('No local stores are currently open')
-        return nearby.stores[0]
+        return stores[0]
@@ -0,0 +1,258 @@
+import csv
+import re
+
+from .urls import COUNTRY_USA, COUNTRY_CANADA
+
+
+US_REGIONS = {
+    'ALABAMA': 'AL', 'ALASKA': 'AK', 'ARIZONA': 'AZ', 'ARKANSAS': 'AR', 'CALIFORNIA': 'CA',
+    'COLORADO': 'CO', 'CONNECTICUT': 'CT', 'DELAWARE': 'DE', 'DISTRICT OF COLUMBIA': 'DC',
+    'FLORIDA': 'FL', 'GEORGIA': 'GA', 'HAWAII': 'HI', 'IDAHO': 'ID', 'ILLINOIS': 'IL',
+    'INDIANA': 'IN', 'IOWA': 'IA', 'KANSAS': 'KS', 'KENTUCKY': 'KY', 'LOUISIANA': 'LA',
+    'MAINE': 'ME', 'MARYLAND': 'MD', 'MASSACHUSETTS': 'MA', 'MICHIGAN': 'MI', 'MINNESOTA': 'MN',
+    'MISSISSIPPI': 'MS', 'MISSOURI': 'MO', 'MONTANA': 'MT', 'NEBRASKA': 'NE', 'NEVADA': 'NV',
+    'NEW HAMPSHIRE': 'NH', 'NEW JERSEY': 'NJ', 'NEW MEXICO': 'NM', 'NEW YORK': 'NY',
+    'NORTH CAROLINA': 'NC', 'NORTH DAKOTA': 'ND', 'OHIO': 'OH', 'OKLAHOMA': 'OK', 'OREGON': 'OR',
+    'PENNSYLVANIA': 'PA', 'PUERTO RICO': 'PR', 'RHODE ISLAND': 'RI', 'SOUTH CAROLINA': 'SC',
+    'SOUTH DAKOTA': 'SD', 'TENNESSEE': 'TN', 'TEXAS': 'TX', 'UTAH': 'UT', 'VERMONT': 'VT',
+    'VIRGINIA': 'VA', 'WASHINGTON': 'WA', 'WEST VIRGINIA': 'WV', 'WISCONSIN': 'WI', 'WYOMING': 'WY',
+}
+
+CA_REGIONS = {
+    'ALBERTA': 'AB', 'BRITISH COLUMBIA': 'BC', 'MANITOBA': 'MB', 'NEW BRUNSWICK': 'NB',
+    'NEWFOUNDLAND AND LABRADOR': 'NL', 'NOVA SCOTIA': 'NS', 'NORTHWEST TERRITORIES': 'NT',
+    'NUNAVUT': 'NU', 'ONTARIO': 'ON', 'PRINCE EDWARD ISLAND': 'PE', 'QUEBEC': 'QC',
+    'SASKATCHEWAN': 'SK', 'YUKON': 'YT',
+}
+
+UNIT_TYPES = {
+    'APT': 'APT', 'APARTMENT': 'APT', 'STE': 'STE', 'SUITE': 'STE', 'UNIT': 'UNIT',
+    'FL': 'FL', 'FLOOR': 'FL', 'RM': 'RM', 'ROOM': 'RM', 'BLDG': 'BLDG', 'BUILDING': 'BLDG',
+    'LOT': 'LOT', 'TRLR': 'TRLR', 'TRAILER': 'TRLR', 'DEPT': 'DEPT', 'SPC': 'SPC',
+    'SPACE': 'SPC', 'PH': 'PH', 'PENTHOUSE': 'PH', '#': '#',
+}
+
+STREET_SUFFIXES = {
+    'ALLEY': 'ALY', 'AVENUE': 'AVE', 'AV': 'AVE', 'BOULEVARD': 'BLVD', 'CIRCLE': 'CIR',
+    'COURT': 'CT', 'CRESCENT': 'CRES', 'DRIVE': 'DR', 'EXPRESSWAY': 'EXPY', 'FREEWAY': 'FWY',
+    'HIGHWAY': 'HWY', 'LANE': 'LN', 'LOOP': 'LOOP', 'PARKWAY': 'PKWY', 'PIKE': 'PIKE',
+    'PLACE': 'PL', 'PLAZA': 'PLZ', 'ROAD': 'RD', 'ROW': 'ROW', 'SQUARE': 'SQ', 'STREET': 'ST',
+    'TERRACE': 'TER', 'TRAIL': 'TRL', 'WAY': 'WAY',
+}
+_SUFFIX_TOKENS = set(STREET_SUFFIXES) | set(STREET_SUFFIXES.values())
+
+DIRECTIONS = {
+    'NORTH': 'N', 'SOUTH': 'S', 'EAST': 'E', 'WEST': 'W',
+    'NORTHEAST': 'NE', 'NORTHWEST': 'NW', 'SOUTHEAST': 'SE', 'SOUTHWEST': 'SW',
+}
+
+_CANONICAL_WORDS = dict(STREET_SUFFIXES, **DIRECTIONS)
+_CANONICAL_WORDS.update((unit, canonical) for unit, canonical in UNIT_TYPES.items() if unit != '#')
+
+_REGION_NAMES = sorted(list(US_REGIONS.items()) + list(CA_REGIONS.items()),
+                       key=lambda item: -len(item[0]))
+_REGION_CODES = {code: COUNTRY_USA for code in US_REGIONS.values()}
+_REGION_CODES.update((code, COUNTRY_CANADA) for code in CA_REGIONS.values())
+
+_US_POSTAL = re.compile(r'(?:^|[\s,])(\d{5})(?:[-\s]?(\d{4}))?$')
+_CA_POSTAL = re.compile(r'(?:^|[\s,])([A-Z]\d[A-Z])[-\s]?(\d[A-Z]\d)$')
+_UNIT_ALTERNATION = '|'.join(sorted((re.escape(u) for u in UNIT_TYPES), key=len, reverse=True))
+_UNIT = re.compile(r'(?:^|[\s,])(' + _UNIT_ALTERNATION + r')\.?\s*#?\s*([A-Z0-9][A-Z0-9-]*)$')
+# A unit at the start of the text ("SUITE 200 SPRINGFIELD"); the unit word
+# must be followed by '.', a space or '#' so "STERLING" isn't STE RLING
+_LEADING_UNIT = re.compile(r'^(' + _UNIT_ALTERNATION + r')(?:\.?\s+#?\s*|\.\s*|\s*#\s*|(?<=#)\s*)'
+                           r'([A-Z0-9][A-Z0-9-]*)(?=\s|$)')
+# A unit number with a digit, or a single letter ("Apt B"), so a city
+# like "Lot Ranch" isn't taken for a unit
+_UNIT_NUMBER = re.compile(r'.*\d|[A-Z]$')
+_STREET_NUMBER = re.compile(r'^(\d+[A-Z]?(?:[-/]\d+[A-Z]?)?)\s+(.+)$')
+_PUNCTUATION = re.compile(r'[^\w\s#-]')
+
+
+def canonical_key(street, city, region, postal_code):
+    """Get a canonical key for an address, suitable as a cache key.
+
+    Case, punctuation and spacing are normalized, common street words
+    are abbreviated (STREET -> ST, NORTH -> N, APARTMENT -> APT), ZIP+4 is
+    cut to the ZIP and Canadian postal codes lose their space. City names
+    are kept whole, so North Bay doesn't become N BAY.
+    """
+    def words(text, abbreviations=None):
+        tokens = _PUNCTUATION.sub(' ', str(text).upper()).split()
+        if abbreviations:
+            tokens = [abbreviations.get(token, token) for token in tokens]
+        return ' '.join(tokens)
+
+    postal = str(postal_code).upper().replace(' ', '').replace('-', '')
+    if postal[:5].isdigit():
+        postal = postal[:5]
+    region = str(region).strip().upper()
+    for name, code in _REGION_NAMES:
+        if region == name:
+            region = code
+            break
+    return '|'.join((words(street, _CANONICAL_WORDS), words(city), region, postal))
+
+
+class ParsedAddress(object):
+    """
+    The components of a parsed North American address.
+
+    Attributes:
+        street (String): Street line as written, including any unit
+        street_number (String): Street number
+        street_name (String): Street name
+        unit_type (String): Canonical unit type (APT, STE, UNIT, #, ...)
+        unit_number (String): Unit number
+        city (String): City
+        region (String): Two-letter state/province code when recognized
+        postal_code (String): ZIP (with +4 if given) or Canadian postal code
+        country (String): 'us' or 'ca'
+    """
+
+    __slots__ = ('street', 'street_number', 'street_name', 'unit_type', 'unit_number',
+                 'city', 'region', 'postal_code', 'country')
+
+    def __init__(self, street='', street_number='', street_name='', unit_type='', unit_number='',
+                 city='', region='', postal_code='', country=COUNTRY_USA):
+        self.street = street
+        self.street_number = street_number
+        self.street_name = street_name
+        self.unit_type = unit_type
+        self.unit_number = unit_number
+        self.city = city
+        self.region = region
+        self.postal_code = postal_code
+        self.country = country
+
+    @property
+    def key(self):
+        """Get the canonical key of the address (see canonical_key)."""
+        return canonical_key(self.street, self.city, self.region, self.postal_code)
+
+    def __repr__(self):
+        return (f"ParsedAddress(street={self.street!r}, city={self.city!r}, "
+                f"region={self.region!r}, postal_code={self.postal_code!r})")
+
+
+def _take_postal_code(text, result):
+    upper = text.upper()
+    match = _CA_POSTAL.search(upper)
+    if match:
+        result.postal_code = f"{match.group(1)} {match.group(2)}"
+        result.country = COUNTRY_CANADA
+        return text[:match.start(1)]
+    match = _US_POSTAL.search(upper)
+    if match:
+        result.postal_code = match.group(1) + (f"-{match.group(2)}" if match.group(2) else '')
+        return text[:match.start(1)]
+    return text
+
+
+def _take_region(text, result):
+    stripped = text.rstrip(' ,')
+    upper = stripped.upper()
+    for name, code in _REGION_NAMES:
+        if upper.endswith(name) and (len(upper) == len(name) or upper[-len(name) - 1] in ' ,'):
+            result.region = code
+            stripped = stripped[:-len(name)]
+            break
+    else:
+        tail = upper[-2:]
+        if tail in _REGION_CODES and (len(upper) == 2 or upper[-3] in ' ,'):
+            result.region = tail
+            stripped = stripped[:-2]
+    if result.region and _REGION_CODES.get(result.region) == COUNTRY_CANADA:
+        result.country = COUNTRY_CANADA
+    return stripped.rstrip(' ,')
+
+
+def _split_street_city(text):
+    parts = [part.strip() for part in text.split(',') if part.strip()]
+    if len(parts) >= 2:
+        # A bare unit ("Apt 4") written as its own part belongs to the street
+        if len(parts) >= 3 and _UNIT.search(' ' + parts[1].upper()):
+            return f"{parts[0]} {parts[1]}", ', '.join(parts[2:])
+        return parts[0], ', '.join(parts[1:])
+    if not parts:
+        return '', ''
+
+    # No commas: end the street after its last suffix (or unit)
+    tokens = parts[0].split()
+    end = 0
+    for index, token in enumerate(tokens):
+        if token.upper().rstrip('.') in _SUFFIX_TOKENS and index > 0:
+            end = index + 1
+    if end and end < len(tokens):
+        rest = ' '.join(tokens[end:])
+        unit = _LEADING_UNIT.match(rest.upper())
+        if unit and _UNIT_NUMBER.match(unit.group(2)):
+            end += len(rest[:unit.end()].split())
+    elif not end:
+        # No suffix ("500 Broadway Ste 2 Oakland"): end after the first unit
+        for index in range(1, len(tokens)):
+            rest = ' '.join(tokens[index:])
+            unit = _LEADING_UNIT.match(rest.upper())
+            if unit and _UNIT_NUMBER.match(unit.group(2)):
+                end = index + len(rest[:unit.end()].split())
+                break
+    if not end:
+        return parts[0], ''
+    return ' '.join(tokens[:end]), ' '.join(tokens[end:])
+
+
+def _split_street(street, result):
+    remainder = street
+    match = _UNIT.search(street.upper())
+    if match:
+        result.unit_type = UNIT_TYPES.get(match.group(1), match.group(1))
+        result.unit_number = street[match.start(2):match.end(2)]
+        remainder = street[:match.start(1)].rstrip(' ,')
+    match = _STREET_NUMBER.match(remainder)
+    if match:
+        result.street_number, result.street_name = match.group(1), match.group(2)
+    else:
+        result.street_name = remainder
+
+
+def parse_address(text, country=None):
+    """Parse a one-line address string into a ParsedAddress.
+
+    Handles "street, city, region postal" and comma-less forms, unit
+    designators (Apt, Suite, #, ...), ZIP+4, Canadian postal codes and
+    full state/province names.
+    """
+    result = ParsedAddress()
+    text = ' '.join(str(text).split())
+    rest = _take_postal_code(text, result)
+    rest = _take_region(rest, result)
+    result.street, result.city = _split_street_city(rest)
+    _split_street(result.street, result)
+    if country is not None:
+        result.country = country
+    return result
+
+
+def parse_addresses(rows, country=None):
+    """Parse an iterable of address strings lazily, yielding ParsedAddress objects."""
+    for row in rows:
+        yield parse_address(row, country)
+
+
+def parse_address_csv(fileobj, columns=None, country=None, **reader_options):
+    """Stream ParsedAddress objects from a CSV file.
+
+    Args:
+        fileobj: Open text file (or any iterable of CSV lines)
+        columns: Optional header names to join into the address, e.g.
+            ('street', 'city', 'state', 'zip'); without it every field
+            of a row is joined
+        country: Force the country of every result
+        **reader_options: Passed to csv.reader / csv.DictReader
+    """
+    if columns:
+        for row in csv.DictReader(fileobj, **reader_options):
+            yield parse_address(', '.join(row.get(column) or '' for column in columns), country)
+    else:
+        for row in csv.reader(fileobj, **reader_options):
+            yield parse_address(', '.join(field for field in row if field), country)
@@ -1,3 +1,6 @@
+from array import array
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
 from .dominos_format import DominosFormat
 
 
@@ -76,3 +79,181 @@ class AmountsBreakdown(DominosFormat):
             f"Total: ${self.calculate_total():.2f}"
         ]
         return '\n'.join(lines)
+
+
+# Every amount field, in column order
+FIELDS = (
+    'food_and_beverage', 'adjustment', 'surcharge', 'delivery_fee',
+    'tax', 'tax1', 'tax2', 'tax3', 'tax4', 'tax5',
+    'bottle_deposit', 'customer_total', 'rounding_adjustment', 'cash', 'savings',
+)
+# Fields summed by AmountsBreakdown.calculate_total / get_total_tax
+TOTAL_FIELDS = (
+    'food_and_beverage', 'adjustment', 'surcharge', 'delivery_fee',
+    'tax', 'tax1', 'tax2', 'tax3', 'tax4', 'tax5',
+    'bottle_deposit', 'rounding_adjustment',
+)
+TAX_FIELDS = ('tax', 'tax1', 'tax2', 'tax3', 'tax4', 'tax5')
+
+# API keys that don't follow snake_to_pascal
+_API_ALIASES = {'Bottle': 'bottle_deposit', 'Customer': 'customer_total'}
+_API_KEYS = dict({''.join(word.capitalize() for word in field.split('_')): field for field in FIELDS},
+                 **_API_ALIASES)
+_CENT = Decimal('0.01')
+
+
+def to_cents(value):
+    """Convert an amount (number or numeric string) to integer cents, rounding half up.
+
+    Thousands separators are allowed ("1,234.56").
+
+    Raises:
+        ValueError: The value isn't a finite amount
+    """
+    if value is None or value == '':
+        return 0
+    if isinstance(value, int):
+        return value * 100
+    # str() so floats convert as written (2.675 -> 268, not 267)
+    text = str(value).strip().replace(',', '')
+    whole, _, fraction = text.partition('.')
+    if len(fraction) <= 2 and fraction.isdigit() and whole.lstrip('-').isdigit():
+        # Plain "12.34": no rounding needed, skip Decimal
+        cents = int(whole.lstrip('-')) * 100 + int(fraction.ljust(2, '0'))
+        return -cents if whole.startswith('-') else cents
+    try:
+        return int(Decimal(text).quantize(_CENT, rounding=ROUND_HALF_UP) * 100)
+    except InvalidOperation:
+        raise ValueError(f"Invalid amount: {value!r}") from None
+
+
+def from_cents(cents):
+    """Convert integer cents to an exact Decimal amount."""
+    return Decimal(cents).scaleb(-2)
+
+
+class AmountsBreakdownBatch(object):
+    """
+    Many amounts breakdowns stored column-wise as integer cents.
+
+    Each field in FIELDS is an array('q') of cents, alongside the store
+    ID and business date of every row. Amounts are rounded half up to
+    the cent once, on the way in, so totals and group-bys are exact
+    integer sums and come out as Decimals.
+
+    Example:
+        batch = AmountsBreakdownBatch.from_responses(responses)
+        batch.total()                 # Decimal('123456.78')
+        batch.group_by('store_id')    # {'4336': {'total': ..., ...}}
+    """
+
+    def __init__(self):
+        self.columns = {field: array('q') for field in FIELDS}
+        self.store_ids = []
+        self.business_dates = []
+
+    def __len__(self):
+        return len(self.store_ids)
+
+    def append(self, breakdown, store_id='', business_date=''):
+        """Add one breakdown: an AmountsBreakdown or an API AmountsBreakdown dict."""
+        if isinstance(breakdown, AmountsBreakdown):
+            for field in FIELDS:
+                self.columns[field].append(to_cents(getattr(breakdown, field, 0)))
+        else:
+            row = dict.fromkeys(FIELDS, 0)
+            for key, value in (breakdown or {}).items():
+                field = _API_KEYS.get(key, key if key in row else None)
+                if field is not None and not isinstance(value, (dict, list)):
+                    row[field] = to_cents(value)
+            for field in FIELDS:
+                self.columns[field].append(row[field])
+        self.store_ids.append(str(store_id))
+        self.business_dates.append(str(business_date))
+
+    def append_response(self, response):
+        """Add the breakdown of an Order.price() (or place) response."""
+        order = response.get('Order', response)
+        self.append(order.get('AmountsBreakdown') or {},
+                    order.get('StoreID', ''), order.get('BusinessDate', ''))
+
+    def extend(self, other):
+        """Append every row of another batch."""
+        for field in FIELDS:
+            self.columns[field].extend(other.columns[field])
+        self.store_ids.extend(other.store_ids)
+        self.business_dates.extend(other.business_dates)
+
+    @classmethod
+    def from_responses(cls, responses):
+        """Build a batch from an iterable of price responses."""
+        batch = cls()
+        for response in responses:
+            batch.append_response(response)
+        return batch
+
+    @classmethod
+    def from_breakdowns(cls, breakdowns):
+        """Build a batch from AmountsBreakdown objects or API dicts."""
+        batch = cls()
+        for breakdown in breakdowns:
+            batch.append(breakdown)
+        return batch
+
+    def sum(self, field):
+        """Get the exact sum of one field."""
+        return from_cents(sum(self.columns[field]))
+
+    def totals(self):
+        """Get the exact sum of every field."""
+        return {field: from_cents(sum(self.columns[field])) for field in FIELDS}
+
+    def total(self):
+        """Get the grand total, summing the same fields as AmountsBreakdown.calculate_total."""
+        return from_cents(sum(sum(self.columns[field]) for field in TOTAL_FIELDS))
+
+    def total_tax(self):
+        """Get the total of every tax field."""
+        return from_cents(sum(sum(self.columns[field]) for field in TAX_FIELDS))
+
+    def row_totals(self):
+        """Get each row's calculate_total as an array of cents."""
+        return array('q', map(sum, zip(*(self.columns[field] for field in TOTAL_FIELDS))))
+
+    def group_by(self, key='store_id'):
+        """Sum every field per store, business date or both.
+
+        Args:
+            key: 'store_id', 'business_date', or ('store_id', 'business_date')
+
+        Returns:
+            dict: Group key to a dict of Decimal field sums plus 'total',
+                'total_tax' and 'count'
+        """
+        keys = {'store_id': self.store_ids, 'business_date': self.business_dates}
+        if isinstance(key, str):
+            group_keys = keys[key]
+        else:
+            group_keys = list(zip(*(keys[part] for part in key)))
+
+        # One running list of cents per group, with the row count last
+        sums = {}
+        for group in group_keys:
+            cents = sums.get(group)
+            if cents is None:
+                cents = sums[group] = [0] * (len(FIELDS) + 1)
+            cents[-1] += 1
+        for position, field in enumerate(FIELDS):
+            column = self.columns[field]
+            for index, group in enumerate(group_keys):
+                sums[group][position] += column[index]
+
+        rows = {}
+        for group, cents in sums.items():
+            by_field = dict(zip(FIELDS, cents))
+            result = {field: from_cents(value) for field, value in by_field.items()}
+            result['total'] = from_cents(sum(by_field[field] for field in TOTAL_FIELDS))
+            result['total_tax'] = from_cents(sum(by_field[field] for field in TAX_FIELDS))
+            result['count'] = cents[-1]
+            rows[group] = result
+        return rows
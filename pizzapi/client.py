@@ -0,0 +1,166 @@
+from . import hooks
+from .cache import TTLCache
+from .urls import Urls, COUNTRY_USA
+from .utils import _requests
+
+
+class PizzaClient(object):
+    """
+    One configured connection to the API, shared by everything that uses it.
+
+    A client owns the country's URL templates, a pooled requests.Session,
+    the menu, price and store profile caches, and a hooks.Metrics of its
+    own requests. Pass it as `client=` to Menu, Store, NearbyStores, Order,
+    Tracking and Image (or use the factory methods below) and they send
+    every request through it, using its country.
+
+    Example:
+        client = PizzaClient(pool_size=20)
+        store = client.store(4336)
+        menu = client.menu(4336)       # cached for menu_ttl seconds
+        client.metrics()
+
+    Attributes:
+        country (String): Country whose API is used
+        lang (String): Default menu language
+        urls (Urls): URL templates of the country
+        session (requests.Session): Session every request goes through
+        cache (TTLCache): Parsed menus, keyed by (store ID, lang)
+        price_cache (TTLCache): Price responses, keyed by Order.price_fingerprint()
+        profile_cache (StoreProfileCache): Store profiles
+        image_cache (ImageCache): On-disk product images, or None
+        request_metrics (hooks.Metrics): Counters and latencies of the
+            client's requests, per endpoint
+    """
+
+    def __init__(self, country=COUNTRY_USA, session=None, cache=None, price_cache=None,
+                 profile_cache=None, image_cache=None, pool_size=10, lang='en',
+                 menu_ttl=300, price_ttl=30, profile_ttl=60):
+        from .store import StoreProfileCache
+        from .image import ImageCache
+
+        self.country = country
+        self.lang = lang
+        self.urls = Urls(country)
+        self.session = session or self._make_session(pool_size)
+        self.cache = cache if cache is not None else TTLCache(ttl=menu_ttl, maxsize=256)
+        self.price_cache = price_cache if price_cache is not None else TTLCache(ttl=price_ttl)
+        self.profile_cache = (profile_cache if profile_cache is not None
+                              else StoreProfileCache(ttl=profile_ttl, client=self))
+        if image_cache is not None and not isinstance(image_cache, ImageCache):
+            image_cache = ImageCache(image_cache)
+        self.image_cache = image_cache
+        # Fed the same RequestEvents as the registered hooks, but only
+        # this client's, and whether or not any hook is registered
+        self.request_metrics = hooks.Metrics()
+
+    @staticmethod
+    def _make_session(pool_size):
+        requests = _requests()
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        session.mount('https://', adapter)
+        return session
+
+    def url(self, endpoint):
+        """Get an endpoint's URL template, e.g. client.url('menu_url')."""
+        return self.urls.get(endpoint)
+
+    def request(self, endpoint, method='GET', url=None, **kwargs):
+        """Send a request through the client's session and count it under `endpoint`.
+
+        Args:
+            endpoint: Endpoint name used for the metrics (and for the
+                URL when `url` isn't given)
+            method: HTTP method
+            url: Full URL; defaults to the endpoint's template, unformatted
+            **kwargs: Passed to requests.Session.request
+
+        Returns:
+            requests.Response: The response; HTTP errors are raised
+                except 304 Not Modified
+        """
+        url = url or self.url(endpoint)
+        response = hooks.call(endpoint, method, url, lambda: self.session.request(method, url, **kwargs),
+                              kwargs.get('stream', False), self.request_metrics)
+        if response.status_code != 304:
+            response.raise_for_status()
+        return response
+
+    def get_json(self, endpoint, url=None, **kwargs):
+        """GET a JSON endpoint, formatting its template with kwargs (like request_json)."""
+        return self.request(endpoint, url=(url or self.url(endpoint)).format(**kwargs)).json()
+
+    def get_xml_records(self, endpoint, tag, parent=None, **kwargs):
+        """Stream the `tag` elements of an XML endpoint (like request_xml_records)."""
+        from .utils import iter_xml_records
+        response = self.request(endpoint, url=self.url(endpoint).format(**kwargs), stream=True)
+        try:
+            response.raw.decode_content = True
+            yield from iter_xml_records(response.raw, tag, parent)
+        finally:
+            response.close()
+
+    def post_json(self, endpoint, payload, headers=None):
+        """POST a JSON payload to an endpoint and decode the JSON response."""
+        return self.request(endpoint, 'POST', headers=headers, json=payload).json()
+
+    def menu(self, store_id, lang=None):
+        """Get a store's Menu, from the menu cache when it is fresh."""
+        from .menu import Menu
+        key = (str(store_id), lang or self.lang)
+        menu = self.cache.get(key)
+        hooks.cache_lookup('menu_url', menu is not None)
+        if menu is None:
+            menu = Menu.from_store(store_id, key[1], self.country, client=self)
+            self.cache.set(key, menu)
+        return menu
+
+    def store(self, store_id_or_data, lang=None):
+        """Create a Store that uses this client."""
+        from .store import Store
+        return Store(store_id_or_data, self.country, lang or self.lang, client=self)
+
+    def nearby_stores(self, address, pickup_type='Delivery'):
+        """Find the stores near an address through this client."""
+        from .nearby_stores import NearbyStores
+        return NearbyStores(address, pickup_type, self.country, client=self)
+
+    def order(self):
+        """Create an empty Order that uses this client."""
+        from .order import Order
+        return Order(client=self)
+
+    def tracking(self):
+        """Create a Tracking that uses this client."""
+        from .track import Tracking
+        return Tracking(client=self)
+
+    def image(self, product_code):
+        """Create an Image that uses this client's session and image cache."""
+        from .image import Image
+        return Image(product_code, self.country, client=self)
+
+    def metrics(self):
+        """Get per-endpoint request metrics (see hooks.Metrics.snapshot) and the caches' statistics."""
+        return {'endpoints': self.request_metrics.snapshot(),
+                'menu_cache': self.cache.stats,
+                'price_cache': self.price_cache.stats,
+                'profile_cache': self.profile_cache.stats}
+
+    def reset_metrics(self):
+        """Reset the per-endpoint request metrics."""
+        self.request_metrics.reset()
+
+    def close(self):
+        """Close the client's session."""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __repr__(self):
+        return f"PizzaClient(country={self.country!r})"
@@ -0,0 +1,337 @@
+import logging
+import math
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+# Registered hooks. A tuple, so call sites can check it and emit can
+# iterate it without a lock; add_hook/remove_hook replace it whole.
+registered = ()
+_registry_lock = threading.Lock()
+
+
+class RequestEvent(object):
+    """
+    One outbound API call, or one cache lookup in front of one.
+
+    Request events have `cache` set to None. Cache lookups (price,
+    menu, store profile and image caches) are reported as their own
+    events with `cache` set to 'hit' or 'miss' and no status; a miss is
+    followed by the request event of the fetch it causes.
+
+    Attributes:
+        endpoint (String): Endpoint name, e.g. 'menu_url' (see urls.URLS)
+        method (String): HTTP method
+        url (String): Requested URL
+        status (Integer): HTTP status, or None if there was no response
+        seconds (Float): Time until the response (its headers, for streams)
+        bytes_sent (Integer): Request body size
+        bytes_received (Integer): Response body size, or None when unknown
+        retries (Integer): Retries made by the transport
+        cache (String): 'hit', 'miss' or None
+        error (String): Exception class name if the call raised
+    """
+
+    __slots__ = ('endpoint', 'method', 'url', 'status', 'seconds', 'bytes_sent',
+                 'bytes_received', 'retries', 'cache', 'error', 'timestamp')
+
+    def __init__(self, endpoint, method='GET', url='', status=None, seconds=0.0, bytes_sent=0,
+                 bytes_received=None, retries=0, cache=None, error=None):
+        self.endpoint = endpoint
+        self.method = method
+        self.url = url
+        self.status = status
+        self.seconds = seconds
+        self.bytes_sent = bytes_sent
+        self.bytes_received = bytes_received
+        self.retries = retries
+        self.cache = cache
+        self.error = error
+        self.timestamp = time.time()
+
+    @property
+    def failed(self):
+        return self.error is not None or (self.status is not None and self.status >= 400)
+
+    def __repr__(self):
+        if self.cache is not None:
+            return f"RequestEvent({self.endpoint!r}, cache={self.cache!r})"
+        return f"RequestEvent({self.endpoint!r}, status={self.status!r}, seconds={self.seconds:.3f})"
+
+
+def add_hook(hook):
+    """Call `hook(event)` with a RequestEvent for every API call from now on.
+
+    Returns:
+        The hook, so this can be used as a decorator
+    """
+    global registered
+    with _registry_lock:
+        registered = registered + (hook,)
+    return hook
+
+
+def remove_hook(hook):
+    """Stop calling a hook added with add_hook."""
+    global registered
+    with _registry_lock:
+        registered = tuple(h for h in registered if h is not hook)
+
+
+def emit(event, hook=None):
+    """Pass an event to every registered hook, and to `hook` when given.
+
+    A failing hook is logged and skipped.
+    """
+    targets = registered if hook is None else registered + (hook,)
+    for target in targets:
+        try:
+            target(event)
+        except Exception:
+            logger.exception("pizzapi hook %r failed", target)
+
+
+def _bytes_sent(response):
+    body = getattr(getattr(response, 'request', None), 'body', None)
+    return len(body) if body else 0
+
+
+def _bytes_received(response, stream):
+    if not stream:
+        return len(response.content)
+    length = response.headers.get('Content-Length')
+    return int(length) if length and length.isdigit() else None
+
+
+def _retries(response):
+    retry = getattr(getattr(response, 'raw', None), 'retries', None)
+    return len(getattr(retry, 'history', None) or ())
+
+
+def observe(endpoint, method, url, send, stream=False, hook=None):
+    """Call `send()` (which returns a requests.Response) and emit its RequestEvent.
+
+    The event goes to the registered hooks and to `hook`, if given.
+    """
+    started = time.perf_counter()
+    try:
+        response = send()
+    except Exception as e:
+        status = getattr(getattr(e, 'response', None), 'status_code', None)
+        emit(RequestEvent(endpoint, method, url, status, time.perf_counter() - started,
+                          error=type(e).__name__), hook)
+        raise
+    seconds = time.perf_counter() - started
+    emit(RequestEvent(endpoint, method, url, response.status_code, seconds, _bytes_sent(response),
+                      _bytes_received(response, stream), _retries(response)), hook)
+    return response
+
+
+def call(endpoint, method, url, send, stream=False, hook=None):
+    """Send an API request: call `send()` and return its requests.Response.
+
+    Every request in pizzapi goes through here. The call is only timed
+    and reported (see observe) when a hook is registered or `hook` is
+    given, so an unobserved request costs one truth test.
+
+    Args:
+        endpoint: Endpoint name, e.g. 'menu_url'
+        method: HTTP method
+        url: Requested URL
+        send: Callable sending the request
+        stream: Whether the response body is streamed (its size isn't read)
+        hook: Extra hook for this call only, e.g. a PizzaClient's Metrics
+    """
+    if registered or hook is not None:
+        return observe(endpoint, method, url, send, stream, hook)
+    return send()
+
+
+def cache_lookup(endpoint, hit):
+    """Emit the event of a cache lookup in front of `endpoint`."""
+    if registered:
+        emit(RequestEvent(endpoint, cache='hit' if hit else 'miss'))
+
+
+class Histogram(object):
+    """
+    A fixed-memory latency histogram.
+
+    Values are counted in logarithmic buckets that grow by `growth`, so
+    percentiles are accurate to within that ratio (5% by default) however
+    many values are recorded.
+    """
+
+    def __init__(self, minimum=1e-4, growth=1.05):
+        self.minimum = minimum
+        self.growth = growth
+        self._log_growth = math.log(growth)
+        self._buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value):
+        index = 0 if value <= self.minimum else int(math.log(value / self.minimum) / self._log_growth) + 1
+        self._buckets[index] = self._buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, p):
+        """Get the value below which `p` percent of the values fall (0 if empty)."""
+        if not self.count:
+            return 0.0
+        rank = p / 100.0 * self.count
+        seen = 0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if seen >= rank:
+                return min(self.minimum * self.growth ** index, self.max)
+        return self.max
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+
+class EndpointMetrics(object):
+    """Counters and a latency histogram for one endpoint."""
+
+    __slots__ = ('latency', 'requests', 'errors', 'bytes_sent', 'bytes_received', 'retries',
+                 'cache_hits', 'cache_misses', 'statuses')
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.requests = 0
+        self.errors = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.retries = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.statuses = {}
+
+    def snapshot(self):
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'p50': self.latency.percentile(50),
+            'p95': self.latency.percentile(95),
+            'p99': self.latency.percentile(99),
+            'mean': self.latency.mean,
+            'max': self.latency.max,
+            'seconds': self.latency.total,
+            'bytes_sent': self.bytes_sent,
+            'bytes_received': self.bytes_received,
+            'retries': self.retries,
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'statuses': dict(self.statuses),
+        }
+
+
+class Metrics(object):
+    """
+    In-process request metrics; register an instance as a hook.
+
+    Example:
+        metrics = add_hook(Metrics())
+        ...
+        metrics.snapshot()['menu_url']['p95']
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def __call__(self, event):
+        with self._lock:
+            metrics = self._endpoints.get(event.endpoint)
+            if metrics is None:
+                metrics = self._endpoints[event.endpoint] = EndpointMetrics()
+            if event.cache == 'hit':
+                metrics.cache_hits += 1
+                return
+            if event.cache == 'miss':
+                metrics.cache_misses += 1
+                return
+            metrics.requests += 1
+            metrics.errors += event.failed
+            metrics.latency.record(event.seconds)
+            metrics.bytes_sent += event.bytes_sent
+            metrics.bytes_received += event.bytes_received or 0
+            metrics.retries += event.retries
+            metrics.statuses[event.status] = metrics.statuses.get(event.status, 0) + 1
+
+    def snapshot(self):
+        """Get every endpoint's counters and p50/p95/p99 latencies (seconds)."""
+        with self._lock:
+            return {endpoint: metrics.snapshot() for endpoint, metrics in self._endpoints.items()}
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+    def export(self, exporter):
+        """Send a snapshot to an Exporter."""
+        exporter.export(self.snapshot())
+
+
+class Exporter(object):
+    """Interface for sending Metrics snapshots somewhere; implement `export`."""
+
+    def export(self, snapshot):
+        raise NotImplementedError
+
+
+class LoggingExporter(Exporter):
+    """Log one line per endpoint."""
+
+    def __init__(self, logger=None, level=logging.INFO):
+        self.logger = logger or logging.getLogger(__name__)
+        self.level = level
+
+    def export(self, snapshot):
+        for endpoint, metrics in sorted(snapshot.items()):
+            self.logger.log(self.level, "%s requests=%d errors=%d p50=%.3fs p95=%.3fs p99=%.3fs "
+                            "cache_hits=%d cache_misses=%d", endpoint, metrics['requests'],
+                            metrics['errors'], metrics['p50'], metrics['p95'], metrics['p99'],
+                            metrics['cache_hits'], metrics['cache_misses'])
+
+
+class PeriodicExporter(object):
+    """Export a Metrics snapshot every `interval` seconds from a background thread."""
+
+    def __init__(self, metrics, exporter, interval=60):
+        self.metrics = metrics
+        self.exporter = exporter
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.metrics.export(self.exporter)
+            except Exception:
+                logger.exception("pizzapi metrics export failed")
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='pizzapi-metrics', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, flush=True):
+        """Stop exporting, exporting one last snapshot when `flush` is set."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if flush:
+            self.metrics.export(self.exporter)
@@ -1,55 +1,355 @@
-import base64
-import requests
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from . import hooks
 from .urls import Urls, COUNTRY_USA
+from .utils import _requests
+
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+
+class ImageCache(object):
+    """
+    Content-addressed on-disk cache of product images.
+
+    Each image is stored under the SHA-256 of its (country, product_code)
+    key, with a small JSON sidecar holding the ETag/Last-Modified headers
+    used to revalidate it. Files are written to a temporary name and
+    renamed into place, so readers never see partial images.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(country, product_code):
+        """Get the content address of an image."""
+        return hashlib.sha256(f"{country}:{product_code}".encode('utf-8')).hexdigest()
+
+    def path(self, country, product_code):
+        """Get the path an image is (or would be) cached at."""
+        key = self.key(country, product_code)
+        return os.path.join(self.directory, key[:2], key + '.jpg')
+
+    def has(self, country, product_code):
+        """Check whether an image is cached."""
+        return os.path.exists(self.path(country, product_code))
+
+    def meta(self, country, product_code):
+        """Get the cached validators (etag, last_modified) of an image, or {}."""
+        try:
+            with open(self.path(country, product_code) + '.json', 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def read(self, country, product_code):
+        """Read a cached image's bytes, or None if it isn't cached."""
+        try:
+            with open(self.path(country, product_code), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def write(self, country, product_code, chunks, meta=None):
+        """Store an image from an iterable of byte chunks.
+
+        Returns:
+            int: Number of bytes written
+        """
+        path = self.path(country, product_code)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        size = _write_atomic(path, chunks)
+        with open(path + '.json', 'w', encoding='utf-8') as f:
+            json.dump(dict(meta or {}, size=size), f)
+        return size
+
+
+def _write_atomic(path, chunks):
+    # Created like open() would, 0666 less the umask (mkstemp's files are
+    # always 0600), under a unique name in the target's directory
+    tmp_path = f"{path}.{uuid.uuid4().hex}.part"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0), 0o666)
+    size = 0
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for chunk in chunks:
+                f.write(chunk)
+                size += len(chunk)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return size
 
 
 class Image:
     """
     Handles fetching and processing product images from Dominos API.
-    
-    The Image class can fetch product images and convert them to base64
-    for use in applications.
+
+    Images are fetched lazily and kept as raw bytes. With an ImageCache
+    they are streamed to disk and revalidated with conditional requests;
+    base64 and data URLs are only built when asked for.
+
+    With a PizzaClient the client's country, session and image cache are
+    used unless given explicitly, and downloads are counted by the client.
     """
-    
-    def __init__(self, product_code, country=COUNTRY_USA):
+
+    def __init__(self, product_code, country=COUNTRY_USA, cache=None, session=None, client=None):
         if not isinstance(product_code, str):
             raise TypeError("product_code must be a string")
-            
+
+        if client is not None:
+            country = client.country
+            cache = cache if cache is not None else client.image_cache
         self.product_code = product_code
+        self.country = country
         self.urls = Urls(country)
-        self.base64_image = None
-        
-        # Fetch the image
-        self._fetch_image()
-        
+        self.cache = cache
+        self.session = session
+        self._client = client
+        self._content = None
+        self._fetched = False
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        """Get the image's URL."""
+        return self.urls.image_url().format(product_code=self.product_code)
+
+    @property
+    def content(self):
+        """Get the raw image bytes, fetching them on first access (None on failure)."""
+        if not self._fetched:
+            with self._lock:
+                if not self._fetched:
+                    self._fetch_image()
+        return self._content
+
+    @property
+    def base64_image(self):
+        """Get the image as a base64 string, or None if it couldn't be fetched."""
+        import base64
+        content = self.content
+        if content is None:
+            return None
+        return base64.b64encode(content).decode('utf-8')
+
+    def _get(self, headers=None):
+        requests = _requests()
+        if self._client is not None and self.session is None:
+            return self._client.request('image_url', url=self.url, headers=headers or {}, stream=True)
+        response = hooks.call('image_url', 'GET', self.url, lambda: (self.session or requests).get(
+            self.url, headers=headers or {}, stream=True), stream=True)
+        if response.status_code != 304:
+            response.raise_for_status()
+        return response
+
+    @staticmethod
+    def _validators(response):
+        return {'etag': response.headers.get('ETag', ''),
+                'last_modified': response.headers.get('Last-Modified', '')}
+
     def _fetch_image(self):
-        """Fetch the product image and convert to base64."""
+        """Fetch the product image, from the cache when possible."""
+        requests = _requests()
+        # _fetched is set last, so other threads never see it before _content
+        if self.cache is not None:
+            cached = self.cache.has(self.country, self.product_code)
+            hooks.cache_lookup('image_url', cached)
+            if cached:
+                self._content = self.cache.read(self.country, self.product_code)
+                self._fetched = True
+                return
         try:
-            url = self.urls.image_url().format(product_code=self.product_code)
-            response = requests.get(url)
-            response.raise_for_status()
-            
-            # Convert to base64
-            self.base64_image = base64.b64encode(response.content).decode('utf-8')
-            
+            response = self._get()
+            with response:
+                self._content = response.content
+            if self.cache is not None:
+                self.cache.write(self.country, self.product_code, [self._content],
+                                 self._validators(response))
         except requests.RequestException as e:
-            print(f"Error fetching image for product {self.product_code}: {e}")
-            self.base64_image = None
-            
+            logger.warning("Error fetching image for product %s: %s", self.product_code, e,
+                           extra={'product_code': self.product_code})
+            self._content = None
+        self._fetched = True
+
+    def refresh(self):
+        """Revalidate a cached image with the server, downloading it only if it changed.
+
+        Returns:
+            bool: True if a new image was downloaded
+        """
+        if self.cache is None or not self.cache.has(self.country, self.product_code):
+            with self._lock:
+                self._fetched = False
+            return self.content is not None
+        meta = self.cache.meta(self.country, self.product_code)
+        headers = {}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        response = self._get(headers)
+        with response:
+            if response.status_code == 304:
+                return False
+            self.cache.write(self.country, self.product_code,
+                             response.iter_content(CHUNK_SIZE), self._validators(response))
+        with self._lock:
+            self._fetched = False
+            self._content = None
+        return True
+
+    def download(self):
+        """Stream the image into the cache without holding it in memory.
+
+        Returns:
+            int: Bytes downloaded (0 if it was already cached)
+        """
+        if self.cache is None:
+            raise ValueError("download() needs an ImageCache")
+        if self.cache.has(self.country, self.product_code):
+            return 0
+        response = self._get()
+        with response:
+            return self.cache.write(self.country, self.product_code,
+                                    response.iter_content(CHUNK_SIZE), self._validators(response))
+
     def save_to_file(self, filename):
-        """Save the image to a file."""
-        if not self.base64_image:
-            raise ValueError("No image data available")
-            
+        """Save the image to a file, streaming it when it isn't in memory or cached."""
+        requests = _requests()
         try:
-            image_data = base64.b64decode(self.base64_image)
-            with open(filename, 'wb') as f:
-                f.write(image_data)
+            if self._content is not None:
+                _write_atomic(filename, [self._content])
+            elif self.cache is not None:
+                self.download()
+                shutil.copyfile(self.cache.path(self.country, self.product_code), filename)
+            else:
+                response = self._get()
+                with response:
+                    _write_atomic(filename, response.iter_content(CHUNK_SIZE))
+        except requests.RequestException as e:
+            raise ValueError("No image data available") from e
         except Exception as e:
-            raise RuntimeError(f"Error saving image to {filename}: {e}")
-            
+            raise RuntimeError(f"Error saving image to {filename}: {e}") from e
+
     def get_data_url(self, mime_type='image/jpeg'):
         """Get a data URL for the image suitable for use in HTML/CSS."""
-        if not self.base64_image:
+        base64_image = self.base64_image
+        if not base64_image:
             return None
-        return f"data:{mime_type};base64,{self.base64_image}"
+        return f"data:{mime_type};base64,{base64_image}"
+
+
+class PrefetchReport(object):
+    """
+    What a bulk image prefetch did.
+
+    Attributes:
+        downloaded (Integer): Images downloaded
+        cached (Integer): Images skipped because they were already cached
+        failed (List): Product codes that could not be downloaded
+        bytes (Integer): Bytes downloaded
+        seconds (Float): Wall-clock duration
+    """
+
+    __slots__ = ('downloaded', 'cached', 'failed', 'bytes', 'seconds')
+
+    def __init__(self):
+        self.downloaded = 0
+        self.cached = 0
+        self.failed = []
+        self.bytes = 0
+        self.seconds = 0.0
+
+    @property
+    def images_per_second(self):
+        return self.downloaded / self.seconds if self.seconds else 0.0
+
+    @property
+    def bytes_per_second(self):
+        return self.bytes / self.seconds if self.seconds else 0.0
+
+    def __repr__(self):
+        return (f"PrefetchReport(downloaded={self.downloaded}, cached={self.cached}, "
+                f"failed={len(self.failed)}, {self.images_per_second:.1f} images/s)")
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def _shared_session(pool_size):
+    global _session
+    requests = _requests()
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+            _session.mount('https://', adapter)
+        return _session
+
+
+def prefetch_images(product_codes, cache, country=COUNTRY_USA, concurrency=8, session=None, seen=None):
+    """Download many product images concurrently into an ImageCache.
+
+    Args:
+        product_codes: Iterable of product (image) codes
+        cache: ImageCache, or a directory to create one in
+        country: Country whose image URLs should be used
+        concurrency: Number of downloads in flight
+        session: requests.Session to use; a shared pooled one by default
+        seen: Optional set of (country, code) already handled, shared
+            between calls to deduplicate across stores; it is updated,
+            and codes that failed to download are taken out again so a
+            later call retries them
+
+    Returns:
+        PrefetchReport
+    """
+    if not isinstance(cache, ImageCache):
+        cache = ImageCache(cache)
+    session = session or _shared_session(concurrency)
+    seen = seen if seen is not None else set()
+    report = PrefetchReport()
+    lock = threading.Lock()
+
+    codes = []
+    for code in product_codes:
+        if (country, code) in seen:
+            continue
+        seen.add((country, code))
+        if cache.has(country, code):
+            report.cached += 1
+        else:
+            codes.append(code)
+
+    def fetch(code):
+        try:
+            size = Image(code, country, cache, session).download()
+        except Exception:
+            with lock:
+                report.failed.append(code)
+                seen.discard((country, code))
+            return
+        with lock:
+            report.downloaded += 1
+            report.bytes += size
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(fetch, codes))
+    report.seconds = time.perf_counter() - started
+    return report
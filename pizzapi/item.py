@@ -1,3 +1,5 @@
+import threading
+
 from .dominos_format import DominosFormat
 
 
@@ -10,20 +12,28 @@ class Item(DominosFormat):
     """
     
     _id_counter = 1
+    _id_lock = threading.Lock()
     
     def __init__(self, parameters=None):
         super().__init__()
         if parameters:
             self.init = parameters
         
-        self.id = Item._id_counter
-        Item._id_counter += 1
+        self.id = Item._next_id()
         
         self.code = ''
         self.qty = 1
         self.options = {}
         self.is_new = True
         
+    @staticmethod
+    def _next_id():
+        """Allocate a unique item ID; safe to call from any thread."""
+        with Item._id_lock:
+            item_id = Item._id_counter
+            Item._id_counter += 1
+        return item_id
+
     @property
     def formatted(self):
         """Get the formatted representation for the Dominos API."""
@@ -1,8 +1,14 @@
 from __future__ import print_function
+import logging
+
+from . import profiling
 from .urls import Urls, COUNTRY_USA
 from .utils import request_json, to_camel_case, to_pascal_case
 
 
+logger = logging.getLogger(__name__)
+
+
 class MenuCategory(object):
     """Represents a menu category with subcategories and products."""
     
@@ -44,11 +50,18 @@ class Menu(object):
 
     The updated Menu class now provides better organized structure
     with proper categorization and easier access to menu items.
+
+    Log records carry the menu's `store_id` (and the `section` or
+    `product_code` involved) as extra fields.
     """
     
-    def __init__(self, data=None, country=COUNTRY_USA):
+    def __init__(self, data=None, country=COUNTRY_USA, client=None, store_id=''):
+        if client is not None:
+            country = client.country
         self.country = country
-        self.urls = Urls(country)
+        self.store_id = str(store_id)
+        self.urls = client.urls if client is not None else Urls(country)
+        self._client = client
         self._dominos_api_response = {}
         
         # Initialize menu structure
@@ -79,6 +92,7 @@ class Menu(object):
         
         # Legacy properties for backwards compatibility
         self.variants = {}
+        self.variant_toppings = {}
         self.menu_by_code = {}
         self.root_categories = {}
         
@@ -98,81 +112,113 @@ class Menu(object):
         self._dominos_api_response = value
 
     @classmethod
-    def from_store(cls, store_id, lang='en', country=COUNTRY_USA):
-        """Create a Menu instance by fetching data from a specific store."""
-        response = request_json(Urls(country).menu_url(), store_id=store_id, lang=lang)
-        menu = cls(response, country)
+    def from_store(cls, store_id, lang='en', country=COUNTRY_USA, client=None):
+        """Create a Menu instance by fetching data from a specific store.
+
+        With a PizzaClient the menu is fetched through it; use
+        PizzaClient.menu() to also go through its menu cache.
+        """
+        if client is not None:
+            response = client.get_json('menu_url', store_id=store_id, lang=lang)
+        else:
+            response = request_json(Urls(country).menu_url(), store_id=store_id, lang=lang)
+        menu = cls(response, country, client, store_id)
         return menu
         
     def _parse_menu_data(self, data):
         """Parse the menu data from the Dominos API response."""
-        self.dominos_api_response = data
-        
-        # Legacy support - populate old structure
-        self.variants = data.get('Variants', {})
-        
-        if self.variants:
+        with profiling.span('menu.parse'):
+            self.dominos_api_response = data
+            
+            # Legacy support - populate old structure
+            self.variants = data.get('Variants', {})
+            with profiling.span('menu.variant_toppings'):
+                self.variant_toppings = self._parse_variant_toppings(self.variants)
+            
+            if self.variants:
+                with profiling.span('menu.legacy'):
+                    self._parse_legacy_structure(data)
+                    
+            # New organized structure
             try:
+                with profiling.span('menu.new_structure'):
+                    self._parse_new_structure(data)
+            except Exception as e:
+                logger.warning("Error parsing new menu structure: %s", e, extra=self._log_extra())
+
+    def _log_extra(self, **fields):
+        """Get the extra fields of a log record about this menu."""
+        return dict(fields, store_id=self.store_id)
+
+    def _parse_legacy_structure(self, data):
+        """Parse menu items and categories into the legacy structure."""
+        try:
+            with profiling.span('menu.parse_items'):
                 self.products = self.parse_items(data.get('Products', {}))
                 self.coupons = self.parse_items(data.get('Coupons', {}))
                 self.preconfigured = self.parse_items(data.get('PreconfiguredProducts', {}))
-                
-                # Build category structure
+            
+            # Build category structure
+            with profiling.span('menu.build_categories'):
                 for key, value in data.get('Categorization', {}).items():
                     try:
                         self.root_categories[key] = self.build_categories(value)
                     except Exception as e:
-                        print(f"Warning: Error building category {key}: {e}")
+                        logger.warning("Error building category %s: %s", key, e,
+                                       extra=self._log_extra(section=key))
                         continue
-                        
-            except Exception as e:
-                print(f"Warning: Error parsing legacy menu structure: {e}")
-                
-        # New organized structure
-        try:
-            self._parse_new_structure(data)
+                    
         except Exception as e:
-            print(f"Warning: Error parsing new menu structure: {e}")
+            logger.warning("Error parsing legacy menu structure: %s", e, extra=self._log_extra())
         
     def _parse_new_structure(self, data):
         """Parse menu data into the new organized structure."""
         try:
             # Define categories
-            for category_key, dominos_category in data.get('Categorization', {}).items():
-                category = self.menu['categories'][to_camel_case(category_key)] = {}
-                self._define_categories(dominos_category.get('Categories', []), category)
-        except Exception as e:
-            print(f"Warning: Error parsing categories: {e}")
-            
-        # Parse all sections with error handling
-        try:
-            self._parse_section(data.get('Flavors', {}), self.menu['flavors'])
-            self._parse_section(data.get('Sides', {}), self.menu['sides'])
-            self._parse_section(data.get('Sizes', {}), self.menu['sizes'])
-            self._parse_section(data.get('Toppings', {}), self.menu['toppings'])
-        except Exception as e:
-            print(f"Warning: Error parsing menu sections: {e}")
-            
-        try:
-            self._parse_products_section(data.get('Products', {}), self.menu['products'])
-            self._parse_products_section(data.get('PreconfiguredProducts', {}), self.menu['preconfigured_products'])
-            self._parse_products_section(data.get('Coupons', {}), self.menu['coupons']['products'])
-            self._parse_products_section(data.get('Variants', {}), self.menu['variants'])
+            with profiling.span('menu.section.Categorization'):
+                for category_key, dominos_category in data.get('Categorization', {}).items():
+                    category = self.menu['categories'][to_camel_case(category_key)] = {}
+                    self._define_categories(dominos_category.get('Categories', []), category)
         except Exception as e:
-            print(f"Warning: Error parsing product sections: {e}")
+            logger.warning("Error parsing categories: %s", e, extra=self._log_extra(section='Categorization'))
             
+        # Parse every section on its own, so one bad section doesn't
+        # keep the rest from loading
+        for key, section in (('Flavors', self.menu['flavors']),
+                             ('Sides', self.menu['sides']),
+                             ('Sizes', self.menu['sizes']),
+                             ('Toppings', self.menu['toppings'])):
+            try:
+                with profiling.span('menu.section.' + key):
+                    self._parse_section(data.get(key, {}), section)
+            except Exception as e:
+                logger.warning("Error parsing menu section %s: %s", key, e, extra=self._log_extra(section=key))
+
+        for key, section in (('Products', self.menu['products']),
+                             ('PreconfiguredProducts', self.menu['preconfigured_products']),
+                             ('Coupons', self.menu['coupons']['products']),
+                             ('Variants', self.menu['variants'])):
+            try:
+                with profiling.span('menu.section.' + key):
+                    self._parse_products_section(data.get(key, {}), section)
+            except Exception as e:
+                logger.warning("Error parsing product section %s: %s", key, e, extra=self._log_extra(section=key))
+
         # Additional sections
-        try:
-            self._parse_simple_section(data.get('ShortProductDescriptions', {}), self.menu['short_product_descriptions'])
-            self._parse_simple_section(data.get('UnsupportedProducts', {}), self.menu['unsupported']['products'])
-            self._parse_simple_section(data.get('UnsupportedOptions', {}), self.menu['unsupported']['options'])
-            self._parse_simple_section(data.get('CookingInstructions', {}), self.menu['cooking']['instructions'])
-            self._parse_simple_section(data.get('CookingInstructionGroups', {}), self.menu['cooking']['instruction_groups'])
-            self._parse_simple_section(data.get('CouponTiers', {}), self.menu['coupons']['coupon_tiers'])
-            self._parse_simple_section(data.get('ShortCouponDescriptions', {}), self.menu['coupons']['short_coupon_descriptions'])
-        except Exception as e:
-            print(f"Warning: Error parsing additional sections: {e}")
-        
+        for key, section in (('ShortProductDescriptions', self.menu['short_product_descriptions']),
+                             ('UnsupportedProducts', self.menu['unsupported']['products']),
+                             ('UnsupportedOptions', self.menu['unsupported']['options']),
+                             ('CookingInstructions', self.menu['cooking']['instructions']),
+                             ('CookingInstructionGroups', self.menu['cooking']['instruction_groups']),
+                             ('CouponTiers', self.menu['coupons']['coupon_tiers']),
+                             ('ShortCouponDescriptions', self.menu['coupons']['short_coupon_descriptions'])):
+            try:
+                with profiling.span('menu.section.' + key):
+                    self._parse_simple_section(data.get(key, {}), section)
+            except Exception as e:
+                logger.warning("Error parsing additional section %s: %s", key, e,
+                               extra=self._log_extra(section=key))
+
     def _define_categories(self, categories, menu_parent):
         """Recursively define category structure."""
         for category in categories:
@@ -251,13 +297,31 @@ class Menu(object):
         for product_code in category_data['Products']:
             if product_code not in self.menu_by_code:
                 # Instead of raising exception, just continue (skip missing products)
-                print(f"Warning: Product not found: {product_code} in category {category.code}")
+                logger.warning("Product not found: %s in category %s", product_code, category.code,
+                               extra=self._log_extra(product_code=product_code, section=category.code))
                 continue
             product = self.menu_by_code[product_code]
             category.products.append(product)
             product.categories.append(category)
         return category
 
+    @staticmethod
+    def _parse_variant_toppings(variants):
+        """Parse each variant's DefaultToppings tag once, keyed like `variants`.
+
+        Kept apart from the variant dicts so a parsed menu is never
+        written to again and can be read from any number of threads.
+        """
+        toppings = {}
+        for key, variant in variants.items():
+            try:
+                tags = variant.get('Tags') or {}
+                default = tags.get('DefaultToppings') or ''
+                toppings[key] = dict(x.split('=', 1) for x in default.split(',') if x)
+            except (AttributeError, TypeError, ValueError):
+                toppings[key] = {}
+        return toppings
+
     def parse_items(self, parent_data):
         items = []
         for code in parent_data.keys():
@@ -266,6 +330,37 @@ class Menu(object):
             items.append(obj)
         return items
 
+    def product_image_codes(self):
+        """Get the image code of every product in the menu, without duplicates."""
+        codes = []
+        seen = set()
+        for code, product in self.dominos_api_response.get('Products', {}).items():
+            image_code = product.get('ImageCode') or product.get('Code') or code
+            if image_code not in seen:
+                seen.add(image_code)
+                codes.append(image_code)
+        return codes
+
+    def prefetch_images(self, dest, concurrency=8, session=None, seen=None):
+        """Download every product image in the menu concurrently.
+
+        Args:
+            dest: ImageCache or directory to store the images in; images
+                already there are skipped
+            concurrency: Number of downloads in flight
+            session: Optional requests.Session
+            seen: Optional set shared between menus to skip images already
+                handled for another store
+
+        Returns:
+            PrefetchReport: Counts, bytes and throughput
+        """
+        from .image import prefetch_images
+        if session is None and self._client is not None:
+            session = self._client.session
+        return prefetch_images(self.product_image_codes(), dest, self.country,
+                               concurrency, session, seen)
+
     # TODO: Print codes that can actually be used to order items
     def display(self):
         def print_category(category, depth=1):
@@ -296,25 +391,19 @@ class Menu(object):
         """
         results = []
         if not self.variants:
-            print("DEBUG: No variants in menu")
+            logger.debug("No variants in menu", extra=self._log_extra())
             return results
         
-        print(f"DEBUG: Searching {len(self.variants)} variants with conditions: {conditions}")
+        logger.debug("Searching %d variants with conditions: %s", len(self.variants), conditions,
+                     extra=self._log_extra())
         
-        for v in self.variants.values():
-            # Safely handle missing Tags or DefaultToppings
-            try:
-                if 'Tags' in v and 'DefaultToppings' in v['Tags']:
-                    v['Toppings'] = dict(x.split('=', 1) for x in v['Tags']['DefaultToppings'].split(',') if x)
-                else:
-                    v['Toppings'] = {}
-            except (KeyError, AttributeError, ValueError):
-                v['Toppings'] = {}
+        for key, v in self.variants.items():
+            toppings = self.variant_toppings.get(key, {})
             
             # Check if this variant matches all the search conditions
             matches = True
             for field_name, search_value in conditions.items():
-                field_value = v.get(field_name, '')
+                field_value = toppings if field_name == 'Toppings' else v.get(field_name, '')
                 
                 # Convert both to lowercase strings for case-insensitive comparison
                 field_str = str(field_value).lower()
@@ -332,12 +421,14 @@ class Menu(object):
                     'Price': v.get('Price', ''),
                     'SizeCode': v.get('SizeCode', ''),
                     'ProductCode': v.get('ProductCode', ''),
-                    'Toppings': v.get('Toppings', {}),
-                    'FullData': v  # Include full variant data for advanced use
+                    'Toppings': toppings,
+                    # Full variant data with its parsed Toppings, as before;
+                    # a shallow copy, so the shared menu isn't written to
+                    'FullData': dict(v, Toppings=toppings)
                 }
                 results.append(result)
         
-        print(f"DEBUG: Found {len(results)} matching results")
+        logger.debug("Found %d matching results", len(results), extra=self._log_extra())
         return results
 
     def search_and_print(self, **conditions):
@@ -1,33 +1,40 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
 from .address import Address
-from .store import Store
-from .utils import request_json
+from .cache import TTLCache
+from .store import StoreSummary
+from .utils import request_json, RateLimiter
 from .urls import Urls, COUNTRY_USA
 
 
+logger = logging.getLogger(__name__)
+
+
 class NearbyStores:
     """
     Find nearby Dominos stores based on an address.
     
     The NearbyStores class can find stores near a given address and
     filter them based on service type (Delivery, Carryout, etc.).
+
+    With a PizzaClient the locator request goes through the client and
+    its country is used; the stores it returns share the client too.
+
+    A failed locator request leaves no stores and sets `error` to the
+    exception.
     """
     
-    def __init__(self, address_info=None, pickup_type='Delivery', country=COUNTRY_USA):
+    def __init__(self, address_info=None, pickup_type='Delivery', country=COUNTRY_USA, client=None):
+        if client is not None:
+            country = client.country
         if address_info is None:
             # Default address
             address_info = '222 2nd St, San Francisco, CA 94105'
             
         if isinstance(address_info, str):
-            # Parse string address - for now, use a simple split
-            parts = address_info.split(', ')
-            if len(parts) >= 3:
-                street = parts[0]
-                city = parts[1]
-                state_zip = parts[2].split(' ')
-                state = state_zip[0] if state_zip else ''
-                zip_code = ' '.join(state_zip[1:]) if len(state_zip) > 1 else ''
-                self.address = Address(street, city, state, zip_code, country)
-            else:
+            self.address = Address(address_info, country=country)
+            if not self.address.line2:
                 # Fallback to default if parsing fails
                 self.address = Address('222 2nd St', 'San Francisco', 'CA', '94105', country)
         elif isinstance(address_info, Address):
@@ -35,11 +42,14 @@ class NearbyStores:
         else:
             raise TypeError("address_info must be a string or Address object")
             
-        self.stores = []
+        self.summaries = []
+        self._stores = None
         self.pickup_type = pickup_type
         self.country = country
-        self.urls = Urls(country)
+        self.urls = client.urls if client is not None else Urls(country)
+        self._client = client
         self._dominos_api_response = {}
+        self.error = None
         
         # Fetch stores
         self._get_stores()
@@ -56,43 +66,138 @@ class NearbyStores:
             raise TypeError("dominos_api_response must be a dictionary")
         self._dominos_api_response = value
         
+    @property
+    def stores(self):
+        """Get the open stores as full Store objects, promoted on first access."""
+        if self._stores is None:
+            self._stores = [summary.to_store(self._client) for summary in self.summaries]
+        return self._stores
+
+    @stores.setter
+    def stores(self, value):
+        self._stores = value
+
     def _get_stores(self):
         """Fetch nearby stores from the API."""
         try:
-            response = request_json(
-                self.urls.find_url(),
-                line1=self.address.line1,
-                line2=self.address.line2, 
-                type=self.pickup_type
-            )
+            query = {'line1': self.address.line1, 'line2': self.address.line2, 'type': self.pickup_type}
+            if self._client is not None:
+                response = self._client.get_json('find_url', **query)
+            else:
+                response = request_json(self.urls.find_url(), **query)
             
             self.dominos_api_response = response
             
-            # Filter and create Store objects
-            if 'Stores' in response:
-                self.stores = [
-                    Store(store_data, self.country) 
-                    for store_data in response['Stores']
-                    if store_data.get('IsOnlineNow', False) and 
-                       store_data.get('ServiceIsOpen', {}).get(self.pickup_type, False)
-                ]
-            else:
-                self.stores = []
+            # Keep compact summaries of the open stores; Store objects are
+            # only built when asked for
+            summaries = []
+            for store_data in response.get('Stores', []):
+                summary = StoreSummary(store_data, self.country)
+                if summary.is_online and summary.is_service_open(self.pickup_type):
+                    summaries.append(summary)
+            self.summaries = summaries
+            self._stores = None
+            self.error = None
                 
         except Exception as e:
-            print(f"Error fetching nearby stores: {e}")
-            self.stores = []
+            logger.warning("Error fetching nearby stores: %s", e,
+                           extra={'pickup_type': self.pickup_type, 'country': self.country})
+            self.error = e
+            self.summaries = []
+            self._stores = None
             
     def get_closest_store(self):
         """Get the closest store from the list."""
-        if not self.stores:
+        if not self.summaries:
             return None
-        return self.stores[0]  # API usually returns stores sorted by distance
+        # API usually returns stores sorted by distance
+        if self._stores is not None:
+            return self._stores[0]
+        return self.summaries[0].to_store(self._client)
         
     def filter_by_service(self, service_type):
         """Filter stores by service type (Delivery, Carryout, etc.)."""
-        filtered_stores = []
-        for store in self.stores:
-            if hasattr(store, 'data') and store.data.get('ServiceIsOpen', {}).get(service_type, False):
-                filtered_stores.append(store)
-        return filtered_stores
+        if self._stores is not None:
+            return [store for store in self._stores
+                    if store.info.get('ServiceIsOpen', {}).get(service_type, False)]
+        return [summary.to_store(self._client) for summary in self.summaries
+                if summary.is_service_open(service_type)]
+
+    @staticmethod
+    def query_key(address, pickup_type='Delivery'):
+        """Get a normalized key for the locator query of an Address.
+
+        Addresses with the same Address.canonical_key share a query.
+        """
+        return (address.canonical_key, pickup_type)
+
+    @classmethod
+    def bulk(cls, addresses, pickup_type='Delivery', country=COUNTRY_USA, concurrency=8, rate=None,
+             client=None, max_cached=1024):
+        """Resolve many addresses to their nearby stores concurrently.
+
+        Identical queries (see `query_key`) are sent once; the results of
+        the last `max_cached` successful queries are kept to answer repeats.
+        Unique queries run on `concurrency` threads, at most `rate` per
+        second when given. Results are yielded as they finish, not in
+        input order. A failed query is yielded as its exception and not
+        cached, so a later repeat of it is sent again.
+
+        Args:
+            addresses: Iterable of Address objects or address strings
+            pickup_type: Service method the stores must have open
+            country: Country whose API should be used
+            concurrency: Number of locator requests in flight
+            rate: Maximum locator requests per second (None for no limit)
+            client: Optional PizzaClient to send the requests through
+            max_cached: Number of query results kept for repeated addresses
+
+        Yields:
+            tuple: (address, NearbyStores) for every input address, or
+                (address, Exception) when its locator request failed
+        """
+        limiter = RateLimiter(rate, burst=concurrency) if rate else None
+        resolved = TTLCache(ttl=float('inf'), maxsize=max_cached)
+        waiting = {}
+        pending = {}
+
+        def resolve(address):
+            if limiter is not None:
+                limiter.acquire()
+            return cls(address, pickup_type, country, client)
+
+        def finish(futures):
+            for future in futures:
+                key = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = e
+                else:
+                    if result.error is not None:
+                        result = result.error
+                    else:
+                        resolved.set(key, result)
+                for address in waiting.pop(key):
+                    yield address, result
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for address in addresses:
+                if isinstance(address, str):
+                    address = Address(address, country=country)
+                key = cls.query_key(address, pickup_type)
+                cached = resolved.get(key)
+                if cached is not None:
+                    yield address, cached
+                elif key in waiting:
+                    waiting[key].append(address)
+                else:
+                    waiting[key] = [address]
+                    pending[executor.submit(resolve, address)] = key
+                    # Bound the work in flight so huge inputs stream through
+                    if len(pending) >= concurrency * 4:
+                        done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                        yield from finish(done)
+            while pending:
+                done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                yield from finish(done)
@@ -1,4 +1,5 @@
-import requests
+import copy
+import threading
 from datetime import datetime
 
 from .menu import Menu
@@ -7,6 +8,52 @@ from .dominos_format import DominosFormat
 from .amounts_breakdown import AmountsBreakdown
 from .address import Address
 from .item import Item
+from .order_journal import SENT, CONFIRMED, FAILED, OrderInDoubtError
+from .utils import canonical_hash, _requests
+from . import hooks, profiling
+
+
+# The parts of a price response that depend only on Order.price_fingerprint();
+# the rest (OrderID, customer details, ...) belongs to the order that was priced
+_PRICE_FIELDS = ('Amounts', 'AmountsBreakdown', 'BusinessDate', 'Coupons', 'Currency',
+                 'EstimatedWaitMinutes', 'Market', 'PriceOrderMs', 'PriceOrderTime',
+                 'Products', 'Promotions', 'ServiceMethod', 'StoreID')
+
+
+def _pricing_part(response):
+    """Get a price response without the priced order's own identifiers."""
+    pricing = {key: value for key, value in response.items() if key != 'Order'}
+    order = response.get('Order')
+    if isinstance(order, dict):
+        pricing['Order'] = {key: order[key] for key in _PRICE_FIELDS if key in order}
+    return copy.deepcopy(pricing)
+
+
+class _Share(object):
+    """Count of the orders sharing one copy-on-write value."""
+
+    __slots__ = ('holders', '_lock')
+
+    def __init__(self):
+        self.holders = 1
+        self._lock = threading.Lock()
+
+    def join(self):
+        with self._lock:
+            self.holders += 1
+
+    def leave(self):
+        """Drop one holder and return how many are left."""
+        with self._lock:
+            self.holders -= 1
+            return self.holders
+
+
+def _leave(share):
+    """Let go of a share (if any); returns None, the order's new share."""
+    if share is not None:
+        share.leave()
+    return None
 
 
 class Order(DominosFormat):
@@ -17,10 +64,19 @@ class Order(DominosFormat):
     determined what we want from the Menu.
     
     Updated with better structure and methods.
+
+    With a PizzaClient, requests go through the client and its country
+    is used whatever `country` is passed, and price() uses the client's
+    price cache unless given one.
     """
     
-    def __init__(self):
+    def __init__(self, client=None):
         super().__init__()
+        self._client = client
+        self._payment_objects = []
+        self._validation_issues = []
+        self._address_share = None
+        self._products_share = None
         
         # Initialize comprehensive order structure
         self.address = Address('', '', '', '')
@@ -63,14 +119,153 @@ class Order(DominosFormat):
         self.user_agent = ''
         self.version = '1.0'
             
-    def order_in_future(self, date):
-        """Schedule the order for a future date."""
+    @property
+    def address(self):
+        """Get the order's Address.
+
+        While the order shares it with a template or clone (see
+        Order.clone) it must be replaced, not changed in place.
+        """
+        return self._address
+
+    @address.setter
+    def address(self, value):
+        self._address = value
+        self._address_share = _leave(self._address_share)
+
+    @property
+    def products(self):
+        """Get the order's products.
+
+        While the order shares them with a template or clone (see
+        Order.clone) this is a tuple; add_item/remove_item or assigning
+        a new list give the order its own list.
+        """
+        return self._products
+
+    @products.setter
+    def products(self, value):
+        self._products = value
+        self._products_share = _leave(self._products_share)
+
+    def _own_products(self):
+        """Take a private, mutable copy of shared products before changing them."""
+        share = self._products_share
+        if share is None:
+            return self._products
+        if share.leave():
+            self._products = copy.deepcopy(list(self._products))
+        else:
+            # Every other holder has let go: the snapshot is ours alone
+            self._products = list(self._products)
+        self._products_share = None
+        return self._products
+
+    def clone(self):
+        """Create a copy-on-write copy of this order.
+
+        The clone and this order share one immutable snapshot of the
+        products and the Address; an order only copies the products when
+        add_item/remove_item change them, and drops the shared Address
+        when a new one is assigned. Everything else is copied shallowly,
+        so cloning costs little more than a dict copy. Coupon and payment
+        dicts are still shared between the copies: replace them rather
+        than editing them in place.
+        """
+        return self._cow_copy(self.__class__)
+
+    @classmethod
+    def from_template(cls, template, **fields):
+        """Create a new order from a template order.
+
+        Args:
+            template: Order to copy (copy-on-write, see Order.clone)
+            **fields: Attributes to set on the new order (e.g. store_id)
+
+        Returns:
+            Order: The new order
+        """
+        order = template._cow_copy(cls)
+        for key, value in fields.items():
+            setattr(order, key, value)
+        return order
+
+    def _cow_copy(self, cls):
+        if self._products_share is None:
+            self._products = tuple(self._products)
+            self._products_share = _Share()
+        if self._address_share is None:
+            self._address_share = _Share()
+        self._products_share.join()
+        self._address_share.join()
+        order = cls.__new__(cls)
+        for key, value in self.__dict__.items():
+            if key not in ('_address', '_products') and isinstance(value, (list, dict)):
+                value = copy.copy(value)
+            elif isinstance(value, AmountsBreakdown):
+                value = copy.copy(value)
+            order.__dict__[key] = value
+        order._validation_issues = []
+        return order
+
+    def to_dict(self):
+        """Get the order's state as JSON-serializable data (see Order.from_dict)."""
+        attributes = {}
+        for key, value in self.__dict__.items():
+            if key.startswith('_') or not isinstance(value, (str, int, float, bool, list, dict, type(None))):
+                continue
+            attributes[key] = value
+        address = self._address
+        return {
+            'attributes': attributes,
+            'address': address.data if hasattr(address, 'data') else address,
+            'country': getattr(address, 'country', COUNTRY_USA),
+            'products': [p.formatted if hasattr(p, 'formatted') else p for p in self._products],
+        }
+
+    @classmethod
+    def from_dict(cls, data, client=None):
+        """Rebuild an order from the output of Order.to_dict()."""
+        order = cls(client=client)
+        for key, value in data.get('attributes', {}).items():
+            setattr(order, key, value)
+        address = data.get('address') or {}
+        order.address = Address(address.get('Street', ''), address.get('City', ''),
+                                address.get('Region', ''), address.get('PostalCode', ''),
+                                data.get('country', COUNTRY_USA))
+        order.products = list(data.get('products', []))
+        return order
+
+    def order_in_future(self, date, store=None):
+        """Schedule the order for a future date.
+
+        The API takes the time as the store's local wall-clock time. A
+        naive datetime is taken to be that already. An aware datetime is
+        converted to it, which needs a Store whose profile gives its UTC
+        offset. With a Store "in the future" is also judged by the
+        store's clock, and a date when the order's service method is
+        closed is rejected.
+
+        Raises:
+            ValueError: The date is past or closed, or is aware and the
+                store's UTC offset isn't known
+        """
         if not isinstance(date, datetime):
             raise TypeError("Date must be a datetime object")
-            
-        now = datetime.now()
+
+        hours = store.service_hours if store is not None else None
+        offset_known = hours is not None and hours.utc_offset is not None
+        if date.tzinfo is not None:
+            if not offset_known:
+                raise ValueError("A timezone-aware date needs a store with a known UTC offset")
+            # Store-local wall-clock time
+            date = hours.local_time(date).replace(tzinfo=None)
+        now = hours.local_time().replace(tzinfo=None) if offset_known else datetime.now()
         if date <= now:
             raise ValueError("Order dates must be in the future")
+
+        if hours is not None and hours.is_open(date, self.service_method) is False:
+            raise ValueError(f"{self.service_method} is closed at {date:%Y-%m-%d %H:%M}")
             
         # Format date for Dominos API
         date_string = date.strftime('%Y-%m-%d %H:%M:%S')
@@ -156,20 +351,21 @@ class Order(DominosFormat):
         else:
             raise TypeError("Item must be an Item object, string code, or dictionary")
             
-        self.products.append(item_data)
+        self._own_products().append(item_data)
         return item_data
         
     def remove_item(self, item_code):
         """Remove an item from the order."""
-        for i, product in enumerate(self.products):
+        for i, product in enumerate(self._products):
             if product.get('Code') == item_code:
-                return self.products.pop(i)
+                return self._own_products().pop(i)
         raise ValueError(f"Item {item_code} not found in order")
         
     def add_payment(self, payment):
         """Add a payment method to the order."""
         if hasattr(payment, 'formatted'):
             payment_data = payment.formatted
+            self._payment_objects.append(payment)
         elif isinstance(payment, dict):
             payment_data = payment
         else:
@@ -219,6 +415,10 @@ class Order(DominosFormat):
     @property
     def formatted(self):
         """Get order data formatted for the Dominos API."""
+        with profiling.span('order.formatted'):
+            return self._format()
+
+    def _format(self):
         # Get base formatted data from parent class
         data = super().formatted
         
@@ -227,7 +427,7 @@ class Order(DominosFormat):
         
         # Format products properly
         formatted_products = []
-        for product in self.products:
+        for product in self._products:
             if hasattr(product, 'formatted'):
                 formatted_products.append(product.formatted)
             elif isinstance(product, dict):
@@ -239,34 +439,46 @@ class Order(DominosFormat):
         data['Products'] = formatted_products
         
         # Format address properly
-        if hasattr(self.address, 'formatted'):
-            data['Address'] = self.address.formatted
+        address = self._address
+        if hasattr(address, 'formatted'):
+            data['Address'] = address.formatted
         else:
             data['Address'] = {
-                'Street': self.address.street if hasattr(self.address, 'street') else '',
-                'City': self.address.city if hasattr(self.address, 'city') else '',
-                'Region': self.address.region if hasattr(self.address, 'region') else '',
-                'PostalCode': self.address.postal_code if hasattr(self.address, 'postal_code') else '',
+                'Street': address.street if hasattr(address, 'street') else '',
+                'City': address.city if hasattr(address, 'city') else '',
+                'Region': address.region if hasattr(address, 'region') else '',
+                'PostalCode': address.postal_code if hasattr(address, 'postal_code') else '',
                 'Type': 'House'
             }
         
         return data
 
-    def _send(self, url, merge=True, country=COUNTRY_USA):
-        """Send order data to the API."""
-        urls = Urls(country)
-        
-        # Prepare data
-        order_data = self.formatted
-        
-        # Add required fields
-        order_data.update({
-            'StoreID': self.store_id,
-            'Email': self.email,
-            'FirstName': self.first_name,
-            'LastName': self.last_name,
-            'Phone': self.phone,
-        })
+    def _country(self, country):
+        """Get the country to use: the client's when the order has one."""
+        return self._client.country if self._client is not None else country
+
+    def _send(self, url, merge=True, country=COUNTRY_USA, endpoint='place_url', sent=None):
+        """Send order data to the API.
+
+        `sent`, a threading.Event, is set just before the request goes out.
+        """
+        with profiling.span('order.send'):
+            return self._send_order(url, merge, endpoint, sent)
+
+    def _send_order(self, url, merge, endpoint, sent=None):
+        requests = _requests()
+        with profiling.span('order.serialize'):
+            # Prepare data
+            order_data = self.formatted
+            
+            # Add required fields
+            order_data.update({
+                'StoreID': self.store_id,
+                'Email': self.email,
+                'FirstName': self.first_name,
+                'LastName': self.last_name,
+                'Phone': self.phone,
+            })
         
         # Validate required fields
         for key in ('Products', 'StoreID', 'Address'):
@@ -278,24 +490,38 @@ class Order(DominosFormat):
             'Content-Type': 'application/json'
         }
         
+        if sent is not None:
+            sent.set()
         try:
-            r = requests.post(url=url, headers=headers, json={'Order': order_data})
-            r.raise_for_status()
-            json_data = r.json()
+            with profiling.span('order.post'):
+                if self._client is not None:
+                    r = self._client.request(endpoint, 'POST', url=url, headers=headers, json={'Order': order_data})
+                else:
+                    r = hooks.call(endpoint, 'POST', url, lambda: requests.post(
+                        url=url, headers=headers, json={'Order': order_data}))
+                    r.raise_for_status()
+            with profiling.span('order.json_decode'):
+                json_data = r.json()
             
-            if merge and 'Order' in json_data:
-                # Update order with response data
-                for key, value in json_data['Order'].items():
-                    if value or not isinstance(value, list):
-                        # Convert PascalCase to snake_case for Python
-                        snake_key = self._pascal_to_snake(key)
-                        if hasattr(self, snake_key):
-                            setattr(self, snake_key, value)
+            if merge:
+                with profiling.span('order.merge'):
+                    self._merge_response(json_data)
                             
             return json_data
             
         except requests.RequestException as e:
-            raise Exception(f"Error sending order: {e}")
+            raise Exception(f"Error sending order: {e}") from e
+
+    def _merge_response(self, json_data):
+        """Update the order with the 'Order' part of an API response."""
+        if 'Order' not in json_data:
+            return
+        for key, value in json_data['Order'].items():
+            if value or not isinstance(value, list):
+                # Convert PascalCase to snake_case for Python
+                snake_key = self._pascal_to_snake(key)
+                if hasattr(self, snake_key):
+                    setattr(self, snake_key, value)
             
     def _pascal_to_snake(self, pascal_str):
         """Convert PascalCase to snake_case."""
@@ -303,24 +529,166 @@ class Order(DominosFormat):
         s1 = re.sub('(.)([A-Z][a-z]+)', r'\1_\2', pascal_str)
         return re.sub('([a-z0-9])([A-Z])', r'\1_\2', s1).lower()
         
-    def validate(self, country=COUNTRY_USA):
-        """Validate the order with the API."""
+    @property
+    def validation_issues(self):
+        """Get the issues found by the last local pre-validation."""
+        return self._validation_issues
+
+    def validate(self, country=COUNTRY_USA, validator=None):
+        """Validate the order with the API.
+
+        Args:
+            country: Country whose API should be used
+            validator: Optional OrderValidator; when it finds issues the
+                order is certainly invalid, so the API is not called
+
+        Returns:
+            bool: True if the order is valid
+        """
+        if validator is not None:
+            self._validation_issues = validator.check(self)
+            if self._validation_issues:
+                return False
+        country = self._country(country)
         urls = Urls(country)
-        response = self._send(urls.validate_url(), True, country)
+        response = self._send(urls.validate_url(), True, country, 'validate_url')
         return response.get('Status', -1) != -1
         
-    def price(self, country=COUNTRY_USA):
-        """Get pricing for the order."""
+    def price(self, country=COUNTRY_USA, cache=None):
+        """Get pricing for the order.
+
+        Args:
+            country: Country whose API should be used
+            cache: Optional TTLCache of price responses keyed by
+                Order.price_fingerprint(). Only the pricing fields of a
+                response are cached, so a hit never gives this order
+                another order's OrderID or customer details
+
+        Returns:
+            dict: The price API response; on a cache hit, its pricing fields
+        """
+        country = self._country(country)
+        if cache is None and self._client is not None:
+            cache = self._client.price_cache
+        if cache is not None:
+            key = self.price_fingerprint(country)
+            response = cache.get(key)
+            hooks.cache_lookup('price_url', response is not None)
+            if response is not None:
+                # Merged values must not be shared between orders
+                response = copy.deepcopy(response)
+                self._merge_response(response)
+                return response
         urls = Urls(country)
-        response = self._send(urls.price_url(), True, country)
+        response = self._send(urls.price_url(), True, country, 'price_url')
+        if cache is not None and response.get('Status', -1) != -1:
+            cache.set(key, _pricing_part(response))
         return response
+
+    def price_fingerprint(self, country=COUNTRY_USA):
+        """Get a canonical hash of the fields that affect the order's price.
+
+        Products and coupons are sorted, so the fingerprint does not
+        depend on the order they were added in.
+        """
+        country = self._country(country)
+        address = self._address
+        return canonical_hash({
+            'Country': country,
+            'StoreID': self.store_id,
+            'ServiceMethod': self.service_method,
+            'Address': address.data if hasattr(address, 'data') else address,
+            'Products': self._canonical_products(),
+            'Coupons': self._canonical_coupons(),
+            'FutureOrderTime': getattr(self, 'future_order_time', ''),
+        })
         
-    def place(self, country=COUNTRY_USA):
-        """Place the order."""
+    def fingerprint(self):
+        """Get a canonical hash identifying this logical order.
+
+        Two orders with the same store, service method, address, customer,
+        products, coupons, payments and future order time share a
+        fingerprint, whatever order the products and coupons were added in.
+        """
+        address = self._address
+        return canonical_hash({
+            'StoreID': self.store_id,
+            'ServiceMethod': self.service_method,
+            'Address': address.data if hasattr(address, 'data') else address,
+            'Customer': [self.first_name, self.last_name, self.email, self.phone],
+            'Products': self._canonical_products(),
+            'Coupons': self._canonical_coupons(),
+            'Payments': self.payments,
+            'FutureOrderTime': getattr(self, 'future_order_time', ''),
+        })
+
+    def _canonical_products(self):
+        products = []
+        for product in self._products:
+            if hasattr(product, 'formatted'):
+                product = product.formatted
+            products.append({'Code': product.get('Code', ''),
+                             'Qty': product.get('Qty', 1),
+                             'Options': product.get('Options') or {}})
+        return sorted(products, key=canonical_hash)
+
+    def _canonical_coupons(self):
+        return sorted(str(coupon.get('Code', '')) for coupon in self.coupons)
+
+    def place(self, country=COUNTRY_USA, journal=None, key=None, reconcile=None):
+        """Place the order.
+
+        Without a journal this is a single POST to place_url. With an
+        OrderJournal the placement is idempotent: state transitions are
+        journaled before and after the POST, an order already confirmed
+        returns its journaled response, and an order whose earlier POST
+        has no known outcome is reconciled instead of being sent twice.
+
+        Args:
+            country: Country whose API should be used
+            journal: Optional OrderJournal
+            key: Idempotency key; defaults to Order.fingerprint()
+            reconcile: Optional callable (order, entry) returning the
+                placed order's data, or None if it was not placed
+
+        Raises:
+            OrderInDoubtError: The order may have been placed already
+        """
+        country = self._country(country)
         urls = Urls(country)
-        response = self._send(urls.place_url(), False, country)
+        if journal is None:
+            return self._send(urls.place_url(), False, country)
+
+        key = key or self.fingerprint()
+        entry, begun = journal.begin(key, store_id=self.store_id)
+        if not begun:
+            if entry['state'] == CONFIRMED:
+                return entry.get('response', {})
+            placed = None
+            if entry['state'] == SENT and reconcile:
+                placed = reconcile(self, entry)
+            if not placed:
+                # Sent with no known outcome, or being placed by another thread
+                raise OrderInDoubtError(key, entry)
+            journal.record(key, CONFIRMED, response=placed, reconciled=True)
+            return placed
+
+        journal.record(key, SENT)
+        sent = threading.Event()
+        try:
+            response = self._send(urls.place_url(), False, country, sent=sent)
+        except Exception as e:
+            # Once the POST has gone out any failure leaves it in doubt
+            if not sent.is_set():
+                journal.record(key, FAILED, error=str(e))
+            raise
+
+        if response.get('Status', -1) == -1:
+            journal.record(key, FAILED, response=response)
+        else:
+            journal.record(key, CONFIRMED, response=response)
         return response
-        
+
     def pay_with(self, payment):
         """Add payment method (legacy compatibility)."""
         return self.add_payment(payment)
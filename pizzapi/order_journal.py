@@ -0,0 +1,160 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from .urls import COUNTRY_USA
+
+
+PENDING = 'pending'
+SENT = 'sent'
+CONFIRMED = 'confirmed'
+FAILED = 'failed'
+
+
+class OrderInDoubtError(Exception):
+    """
+    Raised when an order may already have been placed.
+
+    The journal shows the order was sent but never recorded an outcome
+    (for example the POST timed out), and it could not be reconciled.
+    Placing it again could produce a duplicate order.
+    """
+
+    def __init__(self, key, entry=None):
+        super().__init__(f"Order {key} was sent but its outcome is unknown")
+        self.key = key
+        self.entry = entry or {}
+
+
+class OrderJournal(object):
+    """
+    Durable, append-only journal of order placements.
+
+    Every state transition (pending -> sent -> confirmed/failed) of an
+    order, identified by a key such as Order.fingerprint(), is written as
+    one JSON line and flushed to disk before Order.place() moves on.
+    The latest entry for each key is kept in memory so retries of the
+    same logical order can be deduplicated.
+
+    Attributes:
+        path (String): Path to the journal file
+        fsync (Boolean): fsync after every write (slower, survives power loss)
+    """
+
+    def __init__(self, path, fsync=True):
+        self.path = path
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._entries = {}
+        # Keys begun in this process whose placement hasn't finished
+        self._active = set()
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A torn write from a crash; everything before it is intact
+                    continue
+                self._entries[entry['key']] = entry
+
+    def _append(self, key, state, details):
+        # Called with self._lock held
+        entry = dict(details, key=key, state=state, time=time.time())
+        line = json.dumps(entry, sort_keys=True, default=str) + '\n'
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        self._entries[key] = entry
+        if state in (CONFIRMED, FAILED):
+            self._active.discard(key)
+        return entry
+
+    def record(self, key, state, **details):
+        """Append a state transition for `key` and return the journal entry."""
+        with self._lock:
+            return self._append(key, state, details)
+
+    def begin(self, key, **details):
+        """Start placing `key`, unless it is already placed or in progress.
+
+        Checks the latest entry and writes a pending one in a single step,
+        so two threads placing the same order can't both begin it.
+
+        Returns:
+            tuple: (entry, begun). `begun` is True when a new pending entry
+                was written; otherwise `entry` is the existing entry, which
+                is sent, confirmed, or pending in another thread
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if key in self._active or (entry and entry['state'] in (SENT, CONFIRMED)):
+                return entry, False
+            # Never journaled, failed, or left pending (never sent) by an
+            # earlier process: safe to send
+            self._active.add(key)
+            return self._append(key, PENDING, details), True
+
+    def entry(self, key):
+        """Get the latest entry for `key`, or None if it was never journaled."""
+        return self._entries.get(key)
+
+    def state(self, key):
+        """Get the latest state for `key`, or None if it was never journaled."""
+        entry = self._entries.get(key)
+        return entry['state'] if entry else None
+
+    def in_doubt(self):
+        """Get the keys of every order that was sent without a recorded outcome."""
+        return [key for key, entry in self._entries.items() if entry['state'] == SENT]
+
+
+def _start_time(status):
+    """Parse an OrderStatus StartTime (store local time), or None."""
+    value = str(status.get('StartTime') or '').split('.')[0]
+    try:
+        return datetime.strptime(value, '%Y-%m-%dT%H:%M:%S')
+    except ValueError:
+        return None
+
+
+def reconcile_by_phone(order, entry, country=COUNTRY_USA, window=900):
+    """Look for an order in doubt with the phone tracker.
+
+    Suitable as the `reconcile` argument of Order.place(). A tracked order
+    matches when it is from the order's store and either has the order's
+    OrderID (when the order has one, e.g. after price()) or started within
+    `window` seconds of the journaled send time. StartTime is compared in
+    local time, so this assumes the store is in the caller's timezone.
+
+    Returns:
+        dict: The tracker's OrderStatus when exactly one order matches;
+            None when none does or the match is ambiguous
+    """
+    from .track import track_by_phone
+    if not order.phone:
+        return None
+    try:
+        statuses = track_by_phone(order.phone, country)
+    except Exception:
+        return None
+    if isinstance(statuses, dict):
+        statuses = [statuses]
+    matches = [status for status in statuses or []
+               if isinstance(status, dict) and str(status.get('StoreID', '')) == str(order.store_id)]
+    if order.order_id:
+        matches = [status for status in matches if str(status.get('OrderID', '')) == str(order.order_id)]
+    else:
+        sent = datetime.fromtimestamp(entry.get('time', time.time()))
+        matches = [status for status in matches
+                   if _start_time(status) is not None
+                   and abs((_start_time(status) - sent).total_seconds()) <= window]
+    return matches[0] if len(matches) == 1 else None
@@ -0,0 +1,169 @@
+from datetime import datetime
+
+from .payment import PaymentObject
+from .service_hours import ServiceHours
+
+
+class ValidationIssue(object):
+    """
+    A single problem found while pre-validating an order.
+
+    Attributes:
+        rule (String): Name of the rule that produced the issue
+        field (String): Dominos API field the issue refers to (e.g. 'Products')
+        message (String): Human readable description
+        code (String): Product/option code involved, if any
+    """
+
+    __slots__ = ('rule', 'field', 'message', 'code')
+
+    def __init__(self, rule, field, message, code=''):
+        self.rule = rule
+        self.field = field
+        self.message = message
+        self.code = code
+
+    def to_dict(self):
+        """Get the issue as a plain dictionary."""
+        return {'rule': self.rule, 'field': self.field,
+                'message': self.message, 'code': self.code}
+
+    def __repr__(self):
+        return f"ValidationIssue({self.rule!r}, {self.field!r}, {self.message!r})"
+
+
+class OrderValidator(object):
+    """
+    Check an Order locally before sending it to validate_url.
+
+    The validator runs a list of rules against an order, using whatever
+    context it was given: the store's parsed Menu, the store profile and
+    the PaymentObjects used to pay. Rules that are missing their context
+    (no menu, no store info, ...) are skipped, so every issue reported is
+    one the API would certainly reject.
+
+    Rules are plain callables taking (validator, order) and returning an
+    iterable of ValidationIssue objects; pass extra ones with `rules`.
+    """
+
+    ADDRESS_FIELDS = (
+        ('street', 'Street'),
+        ('city', 'City'),
+        ('region', 'Region'),
+        ('postal_code', 'PostalCode'),
+    )
+
+    def __init__(self, menu=None, store=None, payments=None, rules=None):
+        self.menu = menu
+        self.store = store
+        self.payments = list(payments or [])
+        self.rules = list(self.DEFAULT_RULES)
+        if rules:
+            self.rules.extend(rules)
+
+    def check(self, order):
+        """Run every rule against the order and return a list of issues."""
+        issues = []
+        for rule in self.rules:
+            issues.extend(rule(self, order))
+        return issues
+
+    def is_valid(self, order):
+        """Return True if no rule found a problem with the order."""
+        return not self.check(order)
+
+    @property
+    def store_info(self):
+        """Get the store profile, or an empty dict when no store was given."""
+        if self.store is None:
+            return {}
+        if isinstance(self.store, dict):
+            return self.store
+        return getattr(self.store, 'info', None) or {}
+
+    def _unsupported(self, key):
+        if self.menu is None:
+            return {}
+        return self.menu.dominos_api_response.get(key, {}) or {}
+
+    def check_required_fields(self, order):
+        """The fields Order._send refuses to post without."""
+        if not order.products:
+            yield ValidationIssue('required_fields', 'Products', 'Order has no products')
+        if not order.store_id:
+            yield ValidationIssue('required_fields', 'StoreID', 'Order has no store ID')
+
+    def check_products(self, order):
+        """Product codes must exist in the menu and not be unsupported."""
+        if self.menu is None:
+            return
+        variants = self.menu.variants
+        unsupported_products = self._unsupported('UnsupportedProducts')
+        unsupported_options = self._unsupported('UnsupportedOptions')
+
+        for product in order.products:
+            code = product.get('Code', '')
+            if variants and code not in variants:
+                yield ValidationIssue('products', 'Products',
+                                      f"Product {code} not found in menu", code)
+            if code in unsupported_products:
+                yield ValidationIssue('products', 'Products',
+                                      f"Product {code} is not supported for online ordering", code)
+            for option in (product.get('Options') or {}):
+                if option in unsupported_options:
+                    yield ValidationIssue('options', 'Products',
+                                          f"Option {option} on product {code} is not supported", option)
+
+    def check_address(self, order):
+        """Delivery orders need a complete address."""
+        if order.service_method != 'Delivery':
+            return
+        address = order.address
+        for attr, field in self.ADDRESS_FIELDS:
+            if not getattr(address, attr, ''):
+                yield ValidationIssue('address', 'Address',
+                                      f"Address field {field} is empty", field)
+
+    def check_service_method(self, order):
+        """The store must be online and open for the order's service method.
+
+        For a future order the store's current state doesn't matter, so
+        its service hours are checked at the order's time instead.
+        """
+        info = self.store_info
+        if not info:
+            return
+        future_order_time = getattr(order, 'future_order_time', None)
+        if future_order_time:
+            try:
+                when = datetime.strptime(future_order_time, '%Y-%m-%d %H:%M:%S')
+            except (TypeError, ValueError):
+                return
+            if ServiceHours.from_profile(info).is_open(when, order.service_method) is False:
+                yield ValidationIssue('service_method', 'FutureOrderTime',
+                                      f"{order.service_method} is closed at {future_order_time}",
+                                      order.service_method)
+            return
+        if 'IsOnlineNow' in info and not info['IsOnlineNow']:
+            yield ValidationIssue('service_method', 'StoreID', 'Store is not currently online')
+        service_is_open = info.get('ServiceIsOpen') or {}
+        if order.service_method in service_is_open and not service_is_open[order.service_method]:
+            yield ValidationIssue('service_method', 'ServiceMethod',
+                                  f"{order.service_method} is not open at this store",
+                                  order.service_method)
+
+    def check_payments(self, order):
+        """Every PaymentObject used to pay must pass its own validate()."""
+        payments = self.payments or getattr(order, '_payment_objects', [])
+        for payment in payments:
+            if isinstance(payment, PaymentObject) and not payment.validate():
+                yield ValidationIssue('payments', 'Payments',
+                                      'Payment failed validation', payment.card_type)
+
+    DEFAULT_RULES = (
+        check_required_fields,
+        check_products,
+        check_address,
+        check_service_method,
+        check_payments,
+    )
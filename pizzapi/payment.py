@@ -2,6 +2,86 @@ import re
 from .dominos_format import DominosFormat
 
 
+# (card type, IIN prefixes, valid lengths), in the order they are tried
+CARD_RULES = (
+    ('VISA', ('4',), (13, 16)),
+    ('MASTERCARD', ('51', '52', '53', '54', '55'), (16,)),
+    ('AMEX', ('34', '37'), (15,)),
+    ('DINERS', ('300', '301', '302', '303', '304', '305', '36', '38'), (14,)),
+    ('DISCOVER', ('6011', '65'), (16,)),
+    ('JCB', ('2131', '1800'), (15,)),
+    ('JCB', ('35',), (16,)),
+    ('ENROUTE', ('2014', '2149'), (15,)),
+)
+
+
+def _build_iin_trie(rules):
+    root = {}
+    for card_type, prefixes, lengths in rules:
+        for prefix in prefixes:
+            node = root
+            for digit in prefix:
+                node = node.setdefault(digit, {})
+            node.setdefault(None, []).append((card_type, frozenset(lengths)))
+    return root
+
+
+_IIN_TRIE = _build_iin_trie(CARD_RULES)
+
+# Luhn value of a doubled digit, indexed by the digit's ASCII code
+_LUHN_DOUBLED = [0] * 48 + [0, 2, 4, 6, 8, 1, 3, 5, 7, 9]
+_DIGIT_ZERO = ord('0')
+_NON_DIGITS = re.compile(r'\D')
+# ASCII only: str.isdigit() also accepts digits from other scripts
+_ASCII_DIGITS = re.compile(r'[0-9]+')
+_SECURITY_CODE = re.compile(r'[0-9]{3,4}')
+_POSTAL_CODE = re.compile(r'[0-9]{5}(?:-[0-9]{4})?')
+
+
+def card_type(number):
+    """Get the card type of a digit string from its IIN prefix and length, or ''."""
+    node = _IIN_TRIE
+    length = len(number)
+    for digit in number:
+        node = node.get(digit)
+        if node is None:
+            return ''
+        for card, lengths in node.get(None, ()):
+            if length in lengths:
+                return card
+    return ''
+
+
+def luhn_valid(number):
+    """Check a digit string's Luhn checksum; False unless it is all ASCII digits."""
+    if not _ASCII_DIGITS.fullmatch(number):
+        return False
+    digits = number.encode('ascii')[::-1]
+    odd = digits[0::2]
+    total = sum(odd) - _DIGIT_ZERO * len(odd)
+    total += sum([_LUHN_DOUBLED[digit] for digit in digits[1::2]])
+    return total % 10 == 0
+
+
+def validate_cards(numbers):
+    """Classify and Luhn-check many card numbers.
+
+    Numbers may contain spaces or dashes. This is a single pass over the
+    input with no per-card objects, suitable for very large batches.
+
+    Yields:
+        tuple: (digits, card type or '', Luhn check passed)
+    """
+    for number in numbers:
+        if not number.isdigit():
+            number = _NON_DIGITS.sub('', number)
+            if not number:
+                yield number, '', False
+                continue
+        # Non-ASCII digits have no card type and fail the Luhn check
+        yield number, card_type(number), luhn_valid(number)
+
+
 class PaymentObject(DominosFormat):
     """A PaymentObject represents a credit card.
 
@@ -65,28 +145,15 @@ class PaymentObject(DominosFormat):
         """Validate card number and determine card type."""
         if not number or not number.isdigit():
             return ''
-            
-        patterns = {
-            'VISA': r'^4[0-9]{12}(?:[0-9]{3})?$',
-            'MASTERCARD': r'^5[1-5][0-9]{14}$',
-            'AMEX': r'^3[47][0-9]{13}$',
-            'DINERS': r'^3(?:0[0-5]|[68][0-9])[0-9]{11}$',
-            'DISCOVER': r'^6(?:011|5[0-9]{2})[0-9]{12}$',
-            'JCB': r'^(?:2131|1800|35\d{3})\d{11}$',
-            'ENROUTE': r'^(?:2014|2149)\d{11}$'
-        }
-        
-        for card_type, pattern in patterns.items():
-            if re.match(pattern, number):
-                return card_type
-                
-        return ''
+        return card_type(number)
 
     def validate(self):
         """Validate the payment object."""
         is_valid = bool(self.number and self.card_type and self.expiration)
-        is_valid &= bool(re.match(r'^[0-9]{3,4}$', self.security_code))
-        is_valid &= bool(re.match(r'^[0-9]{5}(?:-[0-9]{4})?$', self.postal_code))
+        is_valid = is_valid and luhn_valid(self.number)
+        is_valid &= _SECURITY_CODE.fullmatch(self.security_code) is not None
+        # A ZIP or ZIP+4
+        is_valid &= _POSTAL_CODE.fullmatch(self.postal_code) is not None
         return is_valid
 
     def find_type(self):
@@ -0,0 +1,201 @@
+import queue
+import threading
+import time
+
+from .urls import COUNTRY_USA
+
+
+_DONE = object()
+
+
+class PipelineResult(object):
+    """
+    The outcome of one order going through an OrderPipeline.
+
+    Attributes:
+        order (Order): The order
+        stage (String): Last stage the order reached
+        ok (Boolean): True if every stage succeeded
+        response: Result of the last stage that ran
+        error (String): Description of the failure, if any
+        latencies (Dict): Seconds spent in each stage
+    """
+
+    __slots__ = ('order', 'stage', 'ok', 'response', 'error', 'latencies')
+
+    def __init__(self, order):
+        self.order = order
+        self.stage = ''
+        self.ok = True
+        self.response = None
+        self.error = ''
+        self.latencies = {}
+
+    def __repr__(self):
+        return f"PipelineResult(stage={self.stage!r}, ok={self.ok!r})"
+
+
+class StageStats(object):
+    """Latency and throughput counters for one pipeline stage."""
+
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.failed = 0
+        self.latencies = []
+        self.first_start = None
+        self.last_finish = None
+        self._lock = threading.Lock()
+
+    def record(self, started, finished, ok):
+        with self._lock:
+            self.count += 1
+            if not ok:
+                self.failed += 1
+            self.latencies.append(finished - started)
+            if self.first_start is None or started < self.first_start:
+                self.first_start = started
+            if self.last_finish is None or finished > self.last_finish:
+                self.last_finish = finished
+
+    def summary(self):
+        """Get counts, latency percentiles (seconds) and throughput (orders/second)."""
+        with self._lock:
+            latencies = sorted(self.latencies)
+            elapsed = (self.last_finish - self.first_start) if self.count else 0.0
+
+        def percentile(p):
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+        return {
+            'count': self.count,
+            'failed': self.failed,
+            'mean': sum(latencies) / len(latencies) if latencies else 0.0,
+            'p50': percentile(0.50),
+            'p95': percentile(0.95),
+            'max': latencies[-1] if latencies else 0.0,
+            'throughput': self.count / elapsed if elapsed > 0 else 0.0,
+        }
+
+
+class OrderPipeline(object):
+    """
+    Stream many orders through validate -> price -> place.
+
+    Each stage has its own pool of worker threads, so while one order is
+    being placed others are being priced or validated. Stages are joined
+    by bounded queues: when a later stage (or the consumer of `run`) falls
+    behind, earlier stages block instead of buffering without limit.
+
+    Example:
+        pipeline = OrderPipeline(validate_workers=8, place_workers=2)
+        for result in pipeline.run(orders):
+            print(result.order.store_id, result.stage, result.ok)
+        print(pipeline.stats)
+    """
+
+    STAGES = ('validate', 'price', 'place')
+
+    def __init__(self, validate_workers=4, price_workers=4, place_workers=2, queue_size=16,
+                 country=COUNTRY_USA, place=True, validator=None, price_cache=None, journal=None):
+        self.workers = {'validate': validate_workers, 'price': price_workers, 'place': place_workers}
+        self.queue_size = queue_size
+        self.country = country
+        self.stages = self.STAGES if place else self.STAGES[:2]
+        self.validator = validator
+        self.price_cache = price_cache
+        self.journal = journal
+        self._stats = {}
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def stats(self):
+        """Get per-stage latency and throughput from the last run."""
+        return {name: stats.summary() for name, stats in self._stats.items()}
+
+    def run(self, orders):
+        """Process `orders` (any iterable) and yield a PipelineResult as each finishes."""
+        self._stopped.clear()
+        self._stats = {name: StageStats(name) for name in self.stages}
+        queues = [queue.Queue(self.queue_size) for _ in range(len(self.stages) + 1)]
+
+        threads = [threading.Thread(target=self._feed, args=(orders, queues[0]), daemon=True)]
+        for index, name in enumerate(self.stages):
+            remaining = [self.workers[name]]
+            for _ in range(self.workers[name]):
+                threads.append(threading.Thread(
+                    target=self._work, args=(name, queues[index], queues[index + 1], remaining),
+                    daemon=True))
+        for thread in threads:
+            thread.start()
+
+        results = queues[-1]
+        try:
+            while True:
+                item = results.get()
+                if item is _DONE:
+                    return
+                yield item
+        finally:
+            self._stopped.set()
+
+    def _put(self, q, item):
+        while not self._stopped.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _feed(self, orders, out):
+        for order in orders:
+            if not self._put(out, PipelineResult(order)):
+                return
+        self._put(out, _DONE)
+
+    def _work(self, name, inbox, out, remaining):
+        while not self._stopped.is_set():
+            try:
+                item = inbox.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if item is _DONE:
+                # Let the other workers of this stage see it too; the last
+                # one out closes the next stage
+                with self._lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                self._put(out if last else inbox, _DONE)
+                return
+            if item.ok:
+                self._run_stage(name, item)
+            self._put(out, item)
+
+    def _run_stage(self, name, result):
+        order = result.order
+        started = time.perf_counter()
+        try:
+            if name == 'validate':
+                response = order.validate(self.country, self.validator)
+                ok = bool(response)
+                if not ok:
+                    result.error = 'Order failed validation'
+            elif name == 'price':
+                response = order.price(self.country, self.price_cache)
+                ok = response.get('Status', -1) != -1
+            else:
+                response = order.place(self.country, journal=self.journal)
+                ok = response.get('Status', -1) != -1
+        except Exception as e:
+            response, ok = None, False
+            result.error = str(e)
+        finished = time.perf_counter()
+        self._stats[name].record(started, finished, ok)
+        result.stage = name
+        result.ok = ok
+        result.response = response
+        result.latencies[name] = finished - started
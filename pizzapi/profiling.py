@@ -0,0 +1,156 @@
+import marshal
+import threading
+import time
+
+
+# Spans are only timed while this is set (see enable/disable)
+enabled = False
+
+_lock = threading.Lock()
+_local = threading.local()
+# (parent name, name) -> [count, total seconds, child seconds, min, max]
+_calls = {}
+
+
+class _NullSpan(object):
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span(object):
+    __slots__ = ('name', 'parent', 'started', 'children')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        stack = getattr(_local, 'stack', None)
+        if stack is None:
+            stack = _local.stack = []
+        self.parent = stack[-1] if stack else None
+        self.children = 0.0
+        stack.append(self)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.started
+        _local.stack.pop()
+        if self.parent is not None:
+            self.parent.children += elapsed
+        key = (self.parent.name if self.parent is not None else None, self.name)
+        with _lock:
+            entry = _calls.get(key)
+            if entry is None:
+                _calls[key] = [1, elapsed, self.children, elapsed, elapsed]
+            else:
+                entry[0] += 1
+                entry[1] += elapsed
+                entry[2] += self.children
+                if elapsed < entry[3]:
+                    entry[3] = elapsed
+                if elapsed > entry[4]:
+                    entry[4] = elapsed
+        return False
+
+
+def span(name):
+    """Time a block as the span `name`, nested under the enclosing span.
+
+    Returns a shared no-op context manager while profiling is disabled.
+
+    Example:
+        with profiling.span('menu.parse'):
+            ...
+    """
+    if not enabled:
+        return _NULL_SPAN
+    return _Span(name)
+
+
+def enable(clear=False):
+    """Start recording spans, optionally clearing earlier results first."""
+    global enabled
+    if clear:
+        reset()
+    enabled = True
+
+
+def disable():
+    """Stop recording spans; results are kept until reset()."""
+    global enabled
+    enabled = False
+
+
+def reset():
+    """Clear every recorded span."""
+    with _lock:
+        _calls.clear()
+
+
+def stats():
+    """Get timings per span name.
+
+    Returns:
+        dict: Span name to {'count', 'total', 'self', 'mean', 'min', 'max'},
+            in seconds; 'self' excludes time spent in nested spans
+    """
+    with _lock:
+        calls = [(key, list(entry)) for key, entry in _calls.items()]
+    result = {}
+    for (_, name), (count, total, children, low, high) in calls:
+        stat = result.get(name)
+        if stat is None:
+            result[name] = {'count': count, 'total': total, 'self': total - children,
+                            'min': low, 'max': high}
+        else:
+            stat['count'] += count
+            stat['total'] += total
+            stat['self'] += total - children
+            stat['min'] = min(stat['min'], low)
+            stat['max'] = max(stat['max'], high)
+    for stat in result.values():
+        stat['mean'] = stat['total'] / stat['count']
+    return result
+
+
+def _function(name):
+    # pstats identifies functions by (filename, line, name)
+    return ('pizzapi', 0, name)
+
+
+class _SpanStats(object):
+    """Adapter giving pstats.Stats the recorded spans in cProfile's format."""
+
+    def create_stats(self):
+        with _lock:
+            calls = [(key, list(entry)) for key, entry in _calls.items()]
+        self.stats = {}
+        for (parent, name), (count, total, children, _, _) in calls:
+            function = _function(name)
+            cc, nc, tt, ct, callers = self.stats.get(function, (0, 0, 0.0, 0.0, {}))
+            self.stats[function] = (cc + count, nc + count, tt + total - children, ct + total, callers)
+            if parent is not None:
+                callers[_function(parent)] = (count, count, total - children, total)
+
+
+def pstats_stats():
+    """Get the recorded spans as a pstats.Stats, e.g. to sort_stats('cumulative').print_stats()."""
+    import pstats
+    return pstats.Stats(_SpanStats())
+
+
+def dump(path):
+    """Write the recorded spans as a cProfile/pstats file, readable by pstats.Stats(path) and snakeviz."""
+    span_stats = _SpanStats()
+    span_stats.create_stats()
+    with open(path, 'wb') as f:
+        marshal.dump(span_stats.stats, f)
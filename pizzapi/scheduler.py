@@ -0,0 +1,371 @@
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from .order import Order
+from .urls import COUNTRY_USA
+
+
+SCHEDULED = 'scheduled'
+PREPARED = 'prepared'
+RUNNING = 'running'
+PLACED = 'placed'
+FAILED = 'failed'
+EXPIRED = 'expired'
+CANCELLED = 'cancelled'
+
+_PENDING_STATES = (SCHEDULED, PREPARED)
+# States whose jobs are kept in the persisted file
+_LIVE_STATES = _PENDING_STATES + (RUNNING,)
+
+
+class ScheduledOrder(object):
+    """
+    An order waiting in an OrderScheduler.
+
+    Attributes:
+        job_id (String): Scheduler job ID
+        order (Order): The order to place
+        place_at (Float): UNIX timestamp of the order's slot
+        country (String): Country whose API should be used
+        state (String): scheduled, prepared, running, placed, failed, expired or cancelled
+        response (Dict): The place (or failing) API response
+        error (String): Description of the failure, if any
+
+    Payment data is never persisted: to_dict() leaves the order's payments
+    out, so a job reloaded from disk has none until they are re-attached
+    (see OrderScheduler's `on_restore`).
+    """
+
+    __slots__ = ('job_id', 'order', 'place_at', 'country', 'state', 'response', 'error', 'prepared', 'lock')
+
+    def __init__(self, job_id, order, place_at, country=COUNTRY_USA, state=SCHEDULED):
+        self.job_id = job_id
+        self.order = order
+        self.place_at = place_at
+        self.country = country
+        self.state = state
+        self.response = None
+        self.error = ''
+        # Validated and priced (by the prepare step or while placing)
+        self.prepared = state == PREPARED
+        # Held while the order is being prepared or placed
+        self.lock = threading.Lock()
+
+    def to_dict(self):
+        order = self.order.to_dict()
+        order['attributes'].pop('payments', None)
+        return {'job_id': self.job_id, 'place_at': self.place_at, 'country': self.country,
+                'state': self.state, 'order': order}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['job_id'], Order.from_dict(data['order']), data['place_at'],
+                   data.get('country', COUNTRY_USA), data.get('state', SCHEDULED))
+
+
+class OrderScheduler(object):
+    """
+    Place future-dated orders at their slot.
+
+    Jobs are kept in a min-heap of (time, action) events. `lead_time`
+    seconds before its slot an order is validated and priced, so problems
+    surface early (right away when that time has already passed); at the
+    slot it is placed. Work runs on a thread pool of `max_concurrency`
+    workers.
+
+    When `path` is given every change is appended to it as a JSON line
+    and the pending jobs are reloaded on construction. The file is
+    rewritten with just the pending jobs when dead entries outnumber
+    them, so scheduling N orders costs O(N) writes in total.
+
+    Attributes:
+        lead_time (Float): Seconds before the slot to validate and price
+        max_lag (Float): Jobs reloaded more than this many seconds past
+            their slot are expired instead of placed (None to always place)
+        journal (OrderJournal): Optional journal passed to Order.place()
+        on_restore (Callable): Called with each job reloaded from `path`;
+            payments aren't persisted, so it should re-attach them
+            (e.g. job.order.add_payment(card)). A job it raises on is
+            marked failed.
+    """
+
+    def __init__(self, max_concurrency=4, lead_time=300, path=None, max_lag=None,
+                 journal=None, on_complete=None, on_restore=None):
+        self.lead_time = lead_time
+        self.path = path
+        self.max_lag = max_lag
+        self.journal = journal
+        self.on_complete = on_complete
+        self.on_restore = on_restore
+        self._jobs = {}
+        self._heap = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        self._thread = None
+        self._running = False
+        self._lag = {'count': 0, 'total': 0.0, 'max': 0.0, 'last': 0.0}
+        # Lines in `path`, to decide when to compact it
+        self._lines = 0
+        if path and os.path.exists(path):
+            self._restore()
+
+    def schedule(self, order, when=None, country=COUNTRY_USA, job_id=None, store=None):
+        """Schedule an order.
+
+        Naive times, including future_order_time, are the store's local
+        wall-clock time. Pass the Store so they can be converted with its
+        UTC offset; without one they are read in the host's timezone.
+
+        Args:
+            order: Order to place
+            when: datetime or UNIX timestamp of the slot; defaults to the
+                order's future_order_time (see Order.order_in_future)
+            country: Country whose API should be used
+            job_id: Optional job ID; one is generated otherwise
+            store: Optional Store the order is for
+
+        Returns:
+            String: The job ID
+        """
+        place_at = self._slot_time(order, when, store)
+        job = ScheduledOrder(job_id or uuid.uuid4().hex, order, place_at, country)
+        with self._cond:
+            self._jobs[job.job_id] = job
+            self._push(job)
+            self._save(job.to_dict())
+            self._cond.notify()
+        return job.job_id
+
+    def cancel(self, job_id):
+        """Cancel a job that has not started placing. Returns True on success."""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None or job.state not in _PENDING_STATES:
+                return False
+            job.state = CANCELLED
+            self._save_state(job)
+        return True
+
+    def get(self, job_id):
+        """Get a ScheduledOrder by job ID."""
+        return self._jobs.get(job_id)
+
+    def start(self):
+        """Start the scheduler thread."""
+        with self._cond:
+            if self._running:
+                return self
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name='pizzapi-scheduler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, wait=True):
+        """Stop the scheduler. Pending jobs stay persisted for the next run."""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._executor.shutdown(wait=wait)
+
+    @property
+    def metrics(self):
+        """Get job counts and scheduling lag (seconds between slot and start)."""
+        with self._cond:
+            states = {}
+            for job in self._jobs.values():
+                states[job.state] = states.get(job.state, 0) + 1
+            lag = dict(self._lag)
+        count = lag.pop('count')
+        total = lag.pop('total')
+        return {
+            'states': states,
+            'pending': sum(states.get(state, 0) for state in _PENDING_STATES),
+            'lag_count': count,
+            'lag_last': lag['last'],
+            'lag_max': lag['max'],
+            'lag_mean': total / count if count else 0.0,
+        }
+
+    def _slot_time(self, order, when, store=None):
+        if when is None:
+            when = getattr(order, 'future_order_time', None)
+            if not when:
+                raise ValueError("Order has no future_order_time; pass `when`")
+            when = datetime.strptime(when, '%Y-%m-%d %H:%M:%S')
+        if isinstance(when, datetime):
+            offset = store.service_hours.utc_offset if store is not None else None
+            if when.tzinfo is None and offset is not None:
+                when = when.replace(tzinfo=timezone(timedelta(minutes=offset)))
+            return when.timestamp()
+        return float(when)
+
+    def _push(self, job):
+        if job.state == SCHEDULED:
+            # A prepare time already past is simply due now
+            heapq.heappush(self._heap, (job.place_at - self.lead_time, next(self._counter), 'prepare', job.job_id))
+        heapq.heappush(self._heap, (job.place_at, next(self._counter), 'place', job.job_id))
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running:
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    delay = self._heap[0][0] - time.time()
+                    if delay <= 0:
+                        break
+                    self._cond.wait(delay)
+                if not self._running:
+                    return
+                due, _, action, job_id = heapq.heappop(self._heap)
+                job = self._jobs.get(job_id)
+                if job is None or job.state not in _PENDING_STATES:
+                    continue
+                if action == 'place':
+                    job.state = RUNNING
+            self._executor.submit(getattr(self, '_' + action), job, due)
+
+    def _record_lag(self, due):
+        lag = max(0.0, time.time() - due)
+        with self._cond:
+            self._lag['count'] += 1
+            self._lag['total'] += lag
+            self._lag['last'] = lag
+            self._lag['max'] = max(self._lag['max'], lag)
+        return lag
+
+    def _check(self, job):
+        """Validate and price the order. Returns an error string, '' if it's fine."""
+        try:
+            if not job.order.validate(job.country):
+                return 'Order failed validation'
+            job.order.price(job.country)
+        except Exception as e:
+            return str(e)
+        job.prepared = True
+        return ''
+
+    def _prepare(self, job, due):
+        self._record_lag(due)
+        # The job lock keeps a late prepare from running alongside the place
+        with job.lock:
+            if job.state != SCHEDULED:
+                # Cancelled, or already being placed
+                return
+            error = self._check(job)
+            if error:
+                self._finish(job, FAILED, error=error, expected=(SCHEDULED,))
+                return
+            with self._cond:
+                if job.state == SCHEDULED:
+                    job.state = PREPARED
+                    self._save_state(job)
+
+    def _place(self, job, due):
+        lag = self._record_lag(due)
+        with job.lock:
+            if self.max_lag is not None and lag > self.max_lag:
+                self._finish(job, EXPIRED, error=f"Slot missed by {lag:.0f} seconds", expected=(RUNNING,))
+                return
+            if not job.prepared:
+                # The prepare step lost the race to the slot
+                error = self._check(job)
+                if error:
+                    self._finish(job, FAILED, error=error, expected=(RUNNING,))
+                    return
+            try:
+                # The slot is now, so the order is placed for immediate delivery
+                job.order.order_now()
+                response = job.order.place(job.country, journal=self.journal)
+            except Exception as e:
+                self._finish(job, FAILED, error=str(e), expected=(RUNNING,))
+                return
+            self._finish(job, PLACED if response.get('Status', -1) != -1 else FAILED, response,
+                         expected=(RUNNING,))
+
+    def _finish(self, job, state, response=None, error='', expected=_PENDING_STATES):
+        # Only move the job on from a state this step owns, so e.g. a
+        # failing prepare can't overwrite a cancel
+        with self._cond:
+            if job.state not in expected:
+                return
+            job.state = state
+            job.response = response
+            job.error = error
+            self._save_state(job)
+        if self.on_complete:
+            self.on_complete(job)
+
+    def _save_state(self, job):
+        self._save({'job_id': job.job_id, 'state': job.state})
+
+    def _save(self, record):
+        # Called with self._cond held
+        if not self.path:
+            return
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, default=str) + '\n')
+        self._lines += 1
+        live = sum(1 for job in self._jobs.values() if job.state in _LIVE_STATES)
+        if self._lines > 2 * live + 64:
+            self._compact()
+
+    def _compact(self):
+        # Rewrite `path` with just the pending jobs
+        pending = [job.to_dict() for job in self._jobs.values() if job.state in _LIVE_STATES]
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for record in pending:
+                f.write(json.dumps(record, default=str) + '\n')
+        os.replace(tmp_path, self.path)
+        self._lines = len(pending)
+
+    def _read(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        if text.startswith('['):
+            # Written by an older version: one JSON array of pending jobs
+            return json.loads(text)
+        records = {}
+        for line in text.splitlines():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A torn write from a crash; everything before it is intact
+                continue
+            if 'order' in record:
+                records[record['job_id']] = record
+            elif record['job_id'] in records:
+                records[record['job_id']]['state'] = record['state']
+        return [record for record in records.values() if record.get('state', SCHEDULED) in _LIVE_STATES]
+
+    def _restore(self):
+        for data in self._read():
+            job = ScheduledOrder.from_dict(data)
+            # A job that was running when we stopped goes back in line;
+            # pass a journal to keep it from being placed twice
+            if job.state == RUNNING:
+                job.state = PREPARED
+                job.prepared = True
+            self._jobs[job.job_id] = job
+            if self.on_restore is not None:
+                try:
+                    self.on_restore(job)
+                except Exception as e:
+                    job.state = FAILED
+                    job.error = f"Restore failed: {e}"
+                    continue
+            self._push(job)
+        self._compact()
@@ -0,0 +1,128 @@
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone
+
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+_DAYS = {
+    'mon': 0, 'monday': 0,
+    'tue': 1, 'tuesday': 1,
+    'wed': 2, 'wednesday': 2,
+    'thu': 3, 'thursday': 3,
+    'fri': 4, 'friday': 4,
+    'sat': 5, 'saturday': 5,
+    'sun': 6, 'sunday': 6,
+}
+
+
+def _parse_time(value):
+    hours, minutes = str(value).split(':')[:2]
+    return int(hours) * 60 + int(minutes)
+
+
+class ServiceHours(object):
+    """
+    A store's weekly service hours, answerable for any time.
+
+    Hours are parsed once from the store profile into sorted,
+    non-overlapping minute-of-week intervals per service method, so
+    `is_open` is a binary search instead of a profile fetch. Hours that
+    run past midnight (close time before open time) spill into the next
+    day, and Sunday night wraps around to Monday morning. The store's
+    general Hours, when the profile has them, are kept as the 'Store'
+    service and answer for services without hours of their own.
+
+    Attributes:
+        utc_offset (Integer): Store's offset from UTC in minutes, if known
+    """
+
+    def __init__(self, hours=None, utc_offset=None):
+        self.utc_offset = utc_offset
+        self._starts = {}
+        self._ends = {}
+        for service, day_hours in (hours or {}).items():
+            self._add_service(service, day_hours)
+
+    @classmethod
+    def from_profile(cls, profile):
+        """Parse the ServiceHours (falling back to Hours) of a store profile."""
+        hours = dict(profile.get('ServiceHours') or {})
+        if profile.get('Hours'):
+            hours.setdefault('Store', profile['Hours'])
+        offset = profile.get('TimeZoneMinutes')
+        try:
+            offset = int(offset) if offset is not None else None
+        except (TypeError, ValueError):
+            offset = None
+        return cls(hours, offset)
+
+    def _add_service(self, service, day_hours):
+        intervals = []
+        for day, periods in (day_hours or {}).items():
+            day_index = _DAYS.get(str(day).lower())
+            if day_index is None:
+                continue
+            for period in periods or []:
+                try:
+                    opens = _parse_time(period['OpenTime'])
+                    closes = _parse_time(period['CloseTime'])
+                except (KeyError, ValueError):
+                    continue
+                if closes <= opens:
+                    # Open past midnight
+                    closes += MINUTES_PER_DAY
+                start = day_index * MINUTES_PER_DAY + opens
+                end = day_index * MINUTES_PER_DAY + closes
+                if end > MINUTES_PER_WEEK:
+                    intervals.append((start, MINUTES_PER_WEEK))
+                    intervals.append((0, end - MINUTES_PER_WEEK))
+                else:
+                    intervals.append((start, end))
+
+        merged = []
+        for start, end in sorted(intervals):
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        self._starts[service] = [start for start, _ in merged]
+        self._ends[service] = [end for _, end in merged]
+
+    @property
+    def services(self):
+        """Get the service methods with known hours."""
+        return list(self._starts)
+
+    def local_time(self, when=None):
+        """Convert `when` (default now) to the store's local wall-clock time.
+
+        Naive datetimes are taken to be store-local already. Aware ones
+        are converted when the store's UTC offset is known.
+        """
+        store_tz = timezone(timedelta(minutes=self.utc_offset)) if self.utc_offset is not None else None
+        if when is None:
+            return datetime.now(store_tz) if store_tz else datetime.now()
+        if when.tzinfo is not None and store_tz is not None:
+            return when.astimezone(store_tz)
+        return when
+
+    def is_open(self, when=None, service='Delivery'):
+        """Whether the service is open at `when` (default now).
+
+        Falls back to the store's general hours for a service without
+        hours of its own.
+
+        Returns:
+            bool: True/False, or None when the profile has no hours for the service
+        """
+        starts = self._starts.get(service)
+        if starts is None:
+            service = 'Store'
+            starts = self._starts.get(service)
+        if starts is None:
+            return None
+        local = self.local_time(when)
+        minute = local.weekday() * MINUTES_PER_DAY + local.hour * 60 + local.minute
+        index = bisect_right(starts, minute) - 1
+        return index >= 0 and minute < self._ends[service][index]
@@ -1,88 +1,433 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from . import hooks
+from .service_hours import ServiceHours
 from .utils import request_json
 from .urls import Urls, COUNTRY_USA
 
 
+logger = logging.getLogger(__name__)
+
+# Shared by every Store so prefetching many stores doesn't spawn threads per store
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='pizzapi-store')
+
+
+def store_coordinates(data):
+    """Get (latitude, longitude) from a locator entry or store profile, or None."""
+    coordinates = data.get('StoreCoordinates') or {}
+    latitude = coordinates.get('StoreLatitude', data.get('Latitude'))
+    longitude = coordinates.get('StoreLongitude', data.get('Longitude'))
+    try:
+        return float(latitude), float(longitude)
+    except (TypeError, ValueError):
+        return None
+
+
+class StoreSummary(object):
+    """
+    A compact record of one store in a store-locator response.
+
+    NearbyStores keeps these instead of full Store objects; call
+    `to_store()` to get a Store when the profile or menu is needed.
+
+    Attributes:
+        store_id (String): Store ID
+        distance (Float): Distance from the searched address, in miles
+        is_online (Boolean): Whether the store is online now
+        is_delivery_open (Boolean): Whether delivery is open now
+        is_carryout_open (Boolean): Whether carryout is open now
+        latitude (Float): Store latitude, or None
+        longitude (Float): Store longitude, or None
+        data (Dict): The locator entry itself (not a copy)
+    """
+
+    __slots__ = ('store_id', 'distance', 'is_online', 'is_delivery_open', 'is_carryout_open',
+                 'latitude', 'longitude', 'data', 'country')
+
+    def __init__(self, data, country=COUNTRY_USA):
+        service_is_open = data.get('ServiceIsOpen') or {}
+        point = store_coordinates(data)
+        self.store_id = str(data.get('StoreID', -1))
+        try:
+            self.distance = float(data.get('MinDistance', 0) or 0)
+        except (TypeError, ValueError):
+            self.distance = 0.0
+        self.is_online = bool(data.get('IsOnlineNow', False))
+        self.is_delivery_open = bool(service_is_open.get('Delivery', False))
+        self.is_carryout_open = bool(service_is_open.get('Carryout', False))
+        self.latitude, self.longitude = point if point else (None, None)
+        self.data = data
+        self.country = country
+
+    def is_service_open(self, service):
+        """Check whether a service method is open now."""
+        return bool((self.data.get('ServiceIsOpen') or {}).get(service, False))
+
+    def to_store(self, client=None):
+        """Promote the summary to a full Store (using `client` when given)."""
+        return Store(self.data, self.country, client=client)
+
+    def __repr__(self):
+        return f"StoreSummary({self.store_id!r}, distance={self.distance!r})"
+
+
+class StoreProfileCache(object):
+    """
+    Cache of store profiles (info_url responses) with background refresh.
+
+    A profile younger than `refresh_after` seconds is served as is. Between
+    `refresh_after` and `ttl` it is still served, but a refresh is started
+    in the background so the next caller gets fresh data without waiting.
+    Older profiles are fetched again synchronously.
+
+    Attributes:
+        ttl (Float): Seconds after which a profile is no longer served
+        refresh_after (Float): Age in seconds that triggers a background refresh
+        hits (Integer): Lookups served from the cache
+        misses (Integer): Lookups that had to fetch
+        refreshes (Integer): Background refreshes started
+    """
+
+    def __init__(self, ttl=60, refresh_after=None, client=None):
+        self.ttl = ttl
+        self.refresh_after = refresh_after if refresh_after is not None else ttl * 0.8
+        self.client = client
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._refreshing = set()
+
+    def get(self, store_id, country=COUNTRY_USA):
+        """Get a store's profile, or {} if it could not be fetched."""
+        key = (country, str(store_id))
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            age = now - entry[1] if entry else None
+            hit = bool(entry) and age < self.ttl
+            if hit:
+                self.hits += 1
+                if age >= self.refresh_after and key not in self._refreshing:
+                    self._refreshing.add(key)
+                    self.refreshes += 1
+                    _executor.submit(self._refresh, key)
+            else:
+                self.misses += 1
+        hooks.cache_lookup('info_url', hit)
+        if hit:
+            return entry[0]
+        try:
+            return self.fetch(store_id, country)
+        except Exception as e:
+            logger.warning("Error fetching store info for %s: %s", store_id, e, extra={'store_id': str(store_id)})
+            return {}
+
+    def fetch(self, store_id, country=COUNTRY_USA):
+        """Fetch a store's profile from the API and cache it."""
+        if self.client is not None and self.client.country == country:
+            profile = self.client.get_json('info_url', store_id=store_id)
+        else:
+            profile = request_json(Urls(country).info_url(), store_id=store_id)
+        with self._lock:
+            self._entries[(country, str(store_id))] = (profile, time.time())
+        return profile
+
+    def _refresh(self, key):
+        try:
+            self.fetch(key[1], key[0])
+        except Exception as e:
+            logger.warning("Error refreshing store info for %s: %s", key[1], e, extra={'store_id': key[1]})
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def warm(self, store_ids, country=COUNTRY_USA, concurrency=16):
+        """Fetch many profiles concurrently and cache them.
+
+        Returns:
+            dict: Store ID to profile ({} for stores that failed)
+        """
+        store_ids = [str(store_id) for store_id in store_ids]
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            profiles = executor.map(lambda store_id: self.get(store_id, country), store_ids)
+            return dict(zip(store_ids, profiles))
+
+    def freshness(self, store_id, country=COUNTRY_USA):
+        """Get freshness metadata for a cached profile, or None if it isn't cached."""
+        key = (country, str(store_id))
+        with self._lock:
+            entry = self._entries.get(key)
+            refreshing = key in self._refreshing
+        if entry is None:
+            return None
+        age = time.time() - entry[1]
+        return {'fetched_at': entry[1], 'age': age, 'stale': age >= self.refresh_after,
+                'expired': age >= self.ttl, 'refreshing': refreshing}
+
+    def invalidate(self, store_id=None, country=COUNTRY_USA):
+        """Drop one store's profile, or every profile when store_id is None."""
+        with self._lock:
+            if store_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop((country, str(store_id)), None)
+
+    @property
+    def stats(self):
+        """Get hit/miss/refresh counters and the current size."""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'refreshes': self.refreshes, 'size': len(self._entries)}
+
+
 class Store(object):
     """
     The interface to the Store API
 
     You can use this to find store information about stores near an
     address, or to find the closest store to an address.
-    
-    Updated with flexible initialization and automatic data fetching.
+
+    The store profile (`info`) and `menu` are fetched lazily on first
+    access, so status checks like `is_online` never download the menu.
+    Call `prefetch()` when both are needed to fetch them concurrently.
+
+    Stores created from an ID read their profile through `profile_cache`
+    (or the class-wide `Store.profile_cache`) when one is set, so status
+    properties are served from the cache on every access.
+
+    With a PizzaClient, requests go through the client, its country is
+    used and its profile cache and menu cache are shared.
     """
-    
-    def __init__(self, store_id_or_data, country=COUNTRY_USA, lang='en'):
+
+    # Shared StoreProfileCache used by stores that aren't given their own
+    profile_cache = None
+
+    def __init__(self, store_id_or_data, country=COUNTRY_USA, lang='en', profile_cache=None, client=None):
+        if client is not None:
+            country = client.country
+            if profile_cache is None:
+                profile_cache = client.profile_cache
         self.country = country
-        self.urls = Urls(country)
-        self.info = {}
-        self.menu = None
-        
+        self.urls = client.urls if client is not None else Urls(country)
+        self.lang = lang
+        self._client = client
+        self._info = None
+        self._menu = None
+        self._info_future = None
+        self._menu_future = None
+        # The exception of a failed menu fetch; see refresh_menu()
+        self._menu_error = None
+        # Separate locks so a slow menu download doesn't hold up status checks
+        self._info_lock = threading.Lock()
+        self._menu_lock = threading.Lock()
+        self._info_fetched_at = None
+        self._profile_cache = None
+        self._service_hours = (None, None)
+
         if isinstance(store_id_or_data, (str, int)):
-            # Initialize with store ID - fetch info and menu
+            # Initialize with store ID - info and menu are fetched on demand
             self.id = str(store_id_or_data)
-            self._init_from_id(lang)
+            self._profile_cache = profile_cache if profile_cache is not None else Store.profile_cache
         elif isinstance(store_id_or_data, dict):
             # Initialize from store data (from nearby stores search)
             self.data = store_id_or_data
             self.id = str(store_id_or_data.get('StoreID', -1))
-            self.info = store_id_or_data
+            self._info = store_id_or_data
         else:
             raise TypeError("store_id_or_data must be a string, int, or dict")
-            
-    def _init_from_id(self, lang='en'):
-        """Initialize store info and menu from store ID."""
+
+    @property
+    def info(self):
+        """Get the store profile, fetching it on first access."""
+        if self._profile_cache is not None:
+            return self._profile_cache.get(self.id, self.country)
+        if self._info is None:
+            with self._info_lock:
+                # Only the first thread in fetches; the rest wait for its result
+                if self._info is None:
+                    if self._info_future is not None:
+                        self._info = self._info_future.result()
+                        self._info_future = None
+                    else:
+                        self._info = self._fetch_info()
+        return self._info
+
+    @info.setter
+    def info(self, value):
+        with self._info_lock:
+            self._info = value
+            self._info_future = None
+            self._info_fetched_at = time.time()
+            self._profile_cache = None
+
+    @property
+    def info_freshness(self):
+        """Get when the profile was fetched, and how old it is, or None if it wasn't."""
+        if self._profile_cache is not None:
+            return self._profile_cache.freshness(self.id, self.country)
+        if self._info_fetched_at is None:
+            return None
+        return {'fetched_at': self._info_fetched_at,
+                'age': time.time() - self._info_fetched_at,
+                'stale': False, 'expired': False, 'refreshing': False}
+
+    @classmethod
+    def warm(cls, store_ids, concurrency=16, country=COUNTRY_USA, cache=None, install=False):
+        """Fetch many store profiles concurrently into a StoreProfileCache.
+
+        Args:
+            store_ids: Store IDs to fetch
+            concurrency: Number of profiles fetched at once
+            country: Country whose API should be used
+            cache: StoreProfileCache to fill; defaults to Store.profile_cache,
+                or a new cache when that isn't set
+            install: Also make the cache the class-wide Store.profile_cache,
+                so every Store created from an ID afterwards reads it
+
+        Returns:
+            list: A Store backed by the cache for every ID
+        """
+        if cache is None:
+            cache = cls.profile_cache if cls.profile_cache is not None else StoreProfileCache()
+        if install:
+            cls.profile_cache = cache
+        cache.warm(store_ids, country, concurrency)
+        return [cls(store_id, country, profile_cache=cache) for store_id in store_ids]
+
+    @property
+    def menu(self):
+        """Get the store's Menu, fetching it on first access.
+
+        A failed fetch is remembered: the menu stays None (see menu_error)
+        until refresh_menu() is called, instead of being refetched on
+        every access.
+        """
+        if self._menu is None and self._menu_error is None:
+            with self._menu_lock:
+                if self._menu is None and self._menu_error is None:
+                    if self._menu_future is not None:
+                        self._menu = self._menu_future.result()
+                        self._menu_future = None
+                    else:
+                        self._menu = self._fetch_menu(self.lang)
+        return self._menu
+
+    @menu.setter
+    def menu(self, value):
+        with self._menu_lock:
+            self._menu = value
+            self._menu_future = None
+            self._menu_error = None
+
+    @property
+    def menu_error(self):
+        """Get the exception of the last failed menu fetch, or None."""
+        return self._menu_error
+
+    def refresh_menu(self, lang=None):
+        """Fetch the menu again, e.g. after a failed fetch.
+
+        Returns:
+            Menu: The new menu, or None if the fetch failed again
+        """
+        with self._menu_lock:
+            self._menu_future = None
+            self._menu_error = None
+            self._menu = self._fetch_menu(lang or self.lang)
+            return self._menu
+
+    def prefetch(self, info=True, menu=True):
+        """Start fetching the profile and/or menu concurrently in the background.
+
+        Returns:
+            Store: self, so `Store(store_id).prefetch()` can be chained
+        """
+        if info and self._profile_cache is not None:
+            _executor.submit(self._profile_cache.get, self.id, self.country)
+        elif info:
+            with self._info_lock:
+                if self._info is None and self._info_future is None:
+                    self._info_future = _executor.submit(self._fetch_info)
+        if menu:
+            with self._menu_lock:
+                if self._menu is None and self._menu_future is None and self._menu_error is None:
+                    self._menu_future = _executor.submit(self._fetch_menu, self.lang)
+        return self
+
+    def _fetch_info(self):
         try:
-            # Fetch store info
-            self.info = request_json(self.urls.info_url(), store_id=self.id)
-            
+            if self._client is not None:
+                info = self._client.get_json('info_url', store_id=self.id)
+            else:
+                info = request_json(self.urls.info_url(), store_id=self.id)
+            self._info_fetched_at = time.time()
+            return info
         except Exception as e:
-            print(f"Warning: Error fetching store info for {self.id}: {e}")
-            self.info = {}
-            
+            logger.warning("Error fetching store info for %s: %s", self.id, e, extra={'store_id': self.id})
+            return {}
+
+    def _fetch_menu(self, lang='en'):
         try:
-            # Fetch menu
+            if self._client is not None:
+                return self._client.menu(self.id, lang)
             from .menu import Menu
-            self.menu = Menu.from_store(self.id, lang, self.country)
-            
+            return Menu.from_store(self.id, lang, self.country)
         except Exception as e:
-            print(f"Warning: Error fetching store menu for {self.id}: {e}")
-            self.menu = None
+            logger.warning("Error fetching store menu for %s: %s", self.id, e, extra={'store_id': self.id})
+            self._menu_error = e
+            return None
 
     def get_details(self):
         """Get detailed store information."""
-        if not self.info:
-            try:
-                self.info = request_json(self.urls.info_url(), store_id=self.id)
-            except Exception as e:
-                print(f"Error fetching store details: {e}")
-                return {}
+        if not self.info and self._profile_cache is None:
+            # A failed fetch is cached as {}; try once more
+            with self._info_lock:
+                if not self._info:
+                    self._info = self._fetch_info()
         return self.info
 
     def get_menu(self, lang='en'):
         """Get the store's menu."""
-        if not self.menu:
-            try:
-                from .menu import Menu
-                self.menu = Menu.from_store(self.id, lang, self.country)
-            except Exception as e:
-                print(f"Error fetching store menu: {e}")
-                return None
+        with self._menu_lock:
+            if self._menu is None and self._menu_future is None and self._menu_error is None:
+                self._menu = self._fetch_menu(lang)
+                return self._menu
         return self.menu
-        
+
     @property
     def is_online(self):
         """Check if the store is currently online."""
-        return self.info.get('IsOnlineNow', False) or self.data.get('IsOnlineNow', False) if hasattr(self, 'data') else False
-        
+        return self.info.get('IsOnlineNow', False)
+
     @property
     def is_delivery_open(self):
         """Check if delivery service is open."""
-        service_info = self.info.get('ServiceIsOpen', {}) or (self.data.get('ServiceIsOpen', {}) if hasattr(self, 'data') else {})
-        return service_info.get('Delivery', False)
-        
+        return self.info.get('ServiceIsOpen', {}).get('Delivery', False)
+
     @property
     def is_carryout_open(self):
         """Check if carryout service is open."""
-        service_info = self.info.get('ServiceIsOpen', {}) or (self.data.get('ServiceIsOpen', {}) if hasattr(self, 'data') else {})
-        return service_info.get('Carryout', False)
+        return self.info.get('ServiceIsOpen', {}).get('Carryout', False)
+
+    @property
+    def service_hours(self):
+        """Get the store's ServiceHours, parsed once per profile."""
+        info = self.info
+        profile, hours = self._service_hours
+        if profile is not info:
+            hours = ServiceHours.from_profile(info)
+            self._service_hours = (info, hours)
+        return hours
+
+    def is_open_at(self, when=None, service='Delivery'):
+        """Check locally whether a service is open at `when` (default now).
+
+        Returns:
+            bool: True/False, or None when the profile has no hours for the service
+        """
+        return self.service_hours.is_open(when, service)
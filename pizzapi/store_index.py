@@ -0,0 +1,198 @@
+import math
+import threading
+
+from .store import Store, store_coordinates
+from .urls import COUNTRY_USA
+
+
+EARTH_RADIUS_MILES = 3958.8
+MILES_PER_DEGREE = 69.0
+
+
+def haversine_miles(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two points, in miles."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2 +
+         math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_MILES * math.asin(math.sqrt(a))
+
+
+class StoreIndex(object):
+    """
+    A local spatial index of stores for nearest-store lookups.
+
+    Stores are bucketed in a grid of `cell_size` degree cells, filled from
+    store-locator responses and store profiles. Nearest-N and
+    within-radius queries only look at nearby cells, so they run in
+    microseconds without calling find_url.
+
+    The index only knows the stores it has been fed. A point is "covered"
+    once a locator response for a query at that point has been added;
+    `lookup` answers covered points locally and falls back to the
+    locator API (adding its response) everywhere else.
+    """
+
+    def __init__(self, cell_size=0.1, country=COUNTRY_USA):
+        self.cell_size = cell_size
+        self.country = country
+        self._lock = threading.Lock()
+        self._stores = {}
+        self._cells = {}
+        self._covered = set()
+        self._max_radius = 0.0
+
+    def __len__(self):
+        return len(self._stores)
+
+    def _cell(self, latitude, longitude):
+        return (int(math.floor(latitude / self.cell_size)),
+                int(math.floor(longitude / self.cell_size)))
+
+    def add(self, data):
+        """Add (or update) a store from a locator entry or profile.
+
+        Returns:
+            bool: False if the data has no usable coordinates
+        """
+        point = store_coordinates(data)
+        if point is None:
+            return False
+        store_id = str(data.get('StoreID', ''))
+        radius = data.get('ServiceRadius')
+        record = (point[0], point[1], float(radius) if radius else None, data)
+        cell = self._cell(*point)
+        with self._lock:
+            old = self._stores.get(store_id)
+            if old is not None:
+                self._cells[self._cell(old[0], old[1])].discard(store_id)
+            self._stores[store_id] = record
+            self._cells.setdefault(cell, set()).add(store_id)
+            if record[2]:
+                self._max_radius = max(self._max_radius, record[2])
+        return True
+
+    def add_locator_response(self, response, latitude=None, longitude=None):
+        """Add every store in a find_url response.
+
+        Pass the coordinates the query was made for to mark that point as
+        covered, so `lookup` can answer it locally from now on.
+        """
+        for data in response.get('Stores', []):
+            self.add(data)
+        if latitude is not None and longitude is not None:
+            with self._lock:
+                self._covered.add(self._cell(latitude, longitude))
+
+    def covers(self, latitude, longitude):
+        """Whether a locator query near this point has been indexed."""
+        return self._cell(latitude, longitude) in self._covered
+
+    def _matches(self, data, service):
+        if service is None:
+            return True
+        return data.get('IsOnlineNow', False) and data.get('ServiceIsOpen', {}).get(service, False)
+
+    def _cells_within(self, latitude, longitude, miles):
+        """Yield the cells that may hold a store within `miles` of a point."""
+        lat_cells = int(math.ceil(miles / MILES_PER_DEGREE / self.cell_size))
+        cos_lat = max(math.cos(math.radians(latitude)), 0.01)
+        lon_cells = int(math.ceil(miles / (MILES_PER_DEGREE * cos_lat) / self.cell_size))
+        row, col = self._cell(latitude, longitude)
+        for i in range(row - lat_cells, row + lat_cells + 1):
+            for j in range(col - lon_cells, col + lon_cells + 1):
+                yield i, j
+
+    def within(self, latitude, longitude, miles, service=None):
+        """Get (distance, store data) pairs within `miles` of a point, nearest first."""
+        results = []
+        with self._lock:
+            for cell in self._cells_within(latitude, longitude, miles):
+                for store_id in self._cells.get(cell, ()):
+                    lat, lon, _, data = self._stores[store_id]
+                    distance = haversine_miles(latitude, longitude, lat, lon)
+                    if distance <= miles and self._matches(data, service):
+                        results.append((distance, data))
+        results.sort(key=lambda result: result[0])
+        return results
+
+    def _ring(self, row, col, ring):
+        """Yield the cells on the perimeter of the square `ring` cells out."""
+        if ring == 0:
+            yield row, col
+            return
+        for j in range(col - ring, col + ring + 1):
+            yield row - ring, j
+            yield row + ring, j
+        for i in range(row - ring + 1, row + ring):
+            yield i, col - ring
+            yield i, col + ring
+
+    def nearest(self, latitude, longitude, n=1, service=None):
+        """Get the `n` nearest (distance, store data) pairs to a point, nearest first."""
+        row, col = self._cell(latitude, longitude)
+        cell_miles = self.cell_size * MILES_PER_DEGREE * max(math.cos(math.radians(latitude)), 0.01)
+        results = []
+        with self._lock:
+            if not self._cells:
+                return []
+            # No store is further out than the ring reaching the outermost cell
+            last_ring = max(max(abs(i - row), abs(j - col)) for i, j in self._cells)
+            for ring in range(last_ring + 1):
+                # Every store in ring k is at least (k - 1) cells away
+                if len(results) >= n and results[n - 1][0] < (ring - 1) * cell_miles:
+                    break
+                found = False
+                for cell in self._ring(row, col, ring):
+                    for store_id in self._cells.get(cell, ()):
+                        lat, lon, _, data = self._stores[store_id]
+                        if self._matches(data, service):
+                            results.append((haversine_miles(latitude, longitude, lat, lon), data))
+                            found = True
+                if found:
+                    results.sort(key=lambda result: result[0])
+                    del results[n:]
+        return results
+
+    def delivering_to(self, latitude, longitude, service='Delivery'):
+        """Get stores whose known service radius contains the point, nearest first."""
+        results = []
+        with self._lock:
+            # No store further out than the largest radius can deliver here
+            for cell in self._cells_within(latitude, longitude, self._max_radius):
+                for store_id in self._cells.get(cell, ()):
+                    lat, lon, radius, data = self._stores[store_id]
+                    if not radius:
+                        continue
+                    distance = haversine_miles(latitude, longitude, lat, lon)
+                    if distance <= radius and self._matches(data, service):
+                        results.append((distance, data))
+        results.sort(key=lambda result: result[0])
+        return results
+
+    def lookup(self, address, latitude=None, longitude=None, n=1, service='Delivery'):
+        """Find the stores nearest an address, locally when possible.
+
+        Args:
+            address: Address (or address string) to look up
+            latitude, longitude: The address's coordinates, if known
+            n: Number of stores to return
+            service: Service method the stores must have open
+
+        Returns:
+            list: Store objects, nearest first
+        """
+        if latitude is not None and longitude is not None and self.covers(latitude, longitude):
+            if service == 'Delivery':
+                # The nearest store may not deliver this far; when no
+                # known radius covers the point, ask the locator
+                results = self.delivering_to(latitude, longitude, service)[:n]
+            else:
+                results = self.nearest(latitude, longitude, n, service)
+            if results:
+                return [Store(data, self.country) for _, data in results]
+
+        from .nearby_stores import NearbyStores
+        nearby = NearbyStores(address, service, self.country)
+        if nearby.error is None:
+            self.add_locator_response(nearby.dominos_api_response, latitude, longitude)
+        return [summary.to_store() for summary in nearby.summaries[:n]]
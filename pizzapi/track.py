@@ -1,18 +1,64 @@
+import asyncio
+import functools
+import time
+
 from .urls import Urls, COUNTRY_USA
-from .utils import request_xml, request_json
+from .utils import request_json, request_xml, request_xml_records, _requests, _xmltodict
 from .dominos_format import DominosFormat
 
 
+# Order statuses reported by the tracker, in the order they happen
+ORDER_STATUSES = ('Order Placed', 'Makeline', 'Oven', 'Routing Station', 'Out the Door', 'Complete')
+
+# Statuses after which an order won't change any more
+TERMINAL_STATUSES = frozenset(('Complete', 'Delivered', 'Bad', 'Void', 'Abandoned', 'Cancelled'))
+
+
+class StatusEvent(object):
+    """
+    A change in an order's tracker status.
+
+    Attributes:
+        store_id (String): Store ID
+        order_key (String): Order key
+        status (String): The new OrderStatus
+        previous (String): The status before it ('' for the first event)
+        timestamp (Float): UNIX time the change was seen
+        data (Dict): Tracker response that reported the change
+    """
+
+    __slots__ = ('store_id', 'order_key', 'status', 'previous', 'timestamp', 'data')
+
+    def __init__(self, store_id, order_key, status, previous, data):
+        self.store_id = store_id
+        self.order_key = order_key
+        self.status = status
+        self.previous = previous
+        self.timestamp = time.time()
+        self.data = data
+
+    def __repr__(self):
+        return f"StatusEvent({self.previous!r} -> {self.status!r})"
+
+
+def _status_rank(status):
+    return ORDER_STATUSES.index(status) if status in ORDER_STATUSES else -1
+
+
 class Tracking(DominosFormat):
     """
     Advanced tracking class that provides detailed order tracking information.
     
     This class provides methods to track orders by phone number and gives 
     access to detailed tracking data.
+
+    With a PizzaClient every request goes through the client, and its
+    country is used.
     """
     
-    def __init__(self):
+    def __init__(self, client=None):
         super().__init__()
+        self._client = client
         self._dominos_phone_api_result = {}
         self._dominos_api_result = {}
         
@@ -32,29 +78,23 @@ class Tracking(DominosFormat):
             raise TypeError("Phone number must be a string")
             
         phone = str(phone).strip()
+        if self._client is not None:
+            country = self._client.country
         urls = Urls(country)
         
         try:
             # First get the tracking URL from phone lookup
             track_url = f"{urls.track_by_phone()}?phonenumber={phone}"
             
-            # For now, use the legacy XML method to get initial data
-            xml_data = request_xml(urls.track_by_phone(), phone=phone)
+            # Keep the whole SOAP response, as callers of
+            # dominos_phone_api_result expect; only the first OrderStatus is used
+            xml_data = self._phone_soap(phone, urls)
             self._dominos_phone_api_result = xml_data
+            order_status = _order_statuses(xml_data)
+            if isinstance(order_status, list):
+                order_status = order_status[0] if order_status else None
             
-            # Extract tracking information
-            soap_body = xml_data.get('soap:Envelope', {}).get('soap:Body', {})
-            response_data = soap_body.get('GetTrackerDataResponse', {})
-            order_statuses = response_data.get('OrderStatuses', {})
-            
-            if 'OrderStatus' in order_statuses:
-                order_status = order_statuses['OrderStatus']
-                
-                # If this is a list, take the first one
-                if isinstance(order_status, list):
-                    if not order_status:
-                        raise Exception('No tracking results found')
-                    order_status = order_status[0]
+            if order_status:
                 
                 # Try to get more detailed tracking if available
                 if 'Actions' in order_status and 'Track' in order_status['Actions']:
@@ -62,7 +102,10 @@ class Tracking(DominosFormat):
                     detailed_url = f"{urls.track_by_order().split('?')[0]}{track_action}"
                     
                     try:
-                        detailed_data = request_json(detailed_url)
+                        if self._client is not None:
+                            detailed_data = self._client.get_json('track_by_order', url=detailed_url)
+                        else:
+                            detailed_data = request_json(detailed_url)
                         self._dominos_api_result = detailed_data
                         self.formatted = detailed_data
                     except Exception:
@@ -80,6 +123,85 @@ class Tracking(DominosFormat):
             
         return self
         
+    def _phone_soap(self, phone, urls):
+        """Get the phone tracker's whole SOAP response as an xmltodict dict."""
+        if self._client is not None:
+            response = self._client.request('track_by_phone', url=urls.track_by_phone().format(phone=phone))
+            return _xmltodict().parse(response.text)
+        return request_xml(urls.track_by_phone(), phone=phone)
+
+    def _transition(self, store_id, order_key, previous, data):
+        """Record a tracker response; return a StatusEvent if the status moved forward."""
+        self._dominos_api_result = data
+        status = data.get('OrderStatus', '') if isinstance(data, dict) else ''
+        if not status or status == previous:
+            return None
+        # The tracker occasionally reports an earlier status again; skip it
+        if _status_rank(status) != -1 and _status_rank(status) < _status_rank(previous):
+            return None
+        return StatusEvent(str(store_id), str(order_key), status, previous, data)
+
+    def watch(self, store_id, order_key, country=COUNTRY_USA, interval=15, timeout=None, session=None,
+              max_errors=5):
+        """Poll an order and yield a StatusEvent each time its status changes.
+
+        Repeated and backwards statuses are skipped, and the generator ends
+        once the order reaches a terminal status or `timeout` seconds pass.
+        A failed poll is retried with exponential backoff, like
+        OrderTracker does; the error is raised after `max_errors` failures
+        in a row.
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        previous = ''
+        errors = 0
+        while True:
+            try:
+                data = track_by_order(store_id, order_key, country, session, self._client)
+            except _requests().RequestException:
+                errors += 1
+                if errors >= max_errors:
+                    raise
+            else:
+                errors = 0
+                event = self._transition(store_id, order_key, previous, data)
+                if event is not None:
+                    previous = event.status
+                    yield event
+                if previous in TERMINAL_STATUSES:
+                    return
+            delay = interval * 2 ** errors
+            if deadline is not None and time.monotonic() + delay > deadline:
+                return
+            time.sleep(delay)
+
+    async def awatch(self, store_id, order_key, country=COUNTRY_USA, interval=15, timeout=None, session=None,
+                     max_errors=5):
+        """Async iterator version of `watch`; requests run in the loop's default executor."""
+        loop = asyncio.get_event_loop()
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        previous = ''
+        errors = 0
+        while True:
+            try:
+                data = await loop.run_in_executor(
+                    None, functools.partial(track_by_order, store_id, order_key, country, session, self._client))
+            except _requests().RequestException:
+                errors += 1
+                if errors >= max_errors:
+                    raise
+            else:
+                errors = 0
+                event = self._transition(store_id, order_key, previous, data)
+                if event is not None:
+                    previous = event.status
+                    yield event
+                if previous in TERMINAL_STATUSES:
+                    return
+            delay = interval * 2 ** errors
+            if deadline is not None and time.monotonic() + delay > deadline:
+                return
+            await asyncio.sleep(delay)
+
     def get_order_status(self):
         """Get a simplified order status."""
         if not self._dominos_api_result:
@@ -95,27 +217,51 @@ class Tracking(DominosFormat):
         }
 
 
-def track_by_phone(phone, country=COUNTRY_USA):
-    """Query the API to get tracking information.
+def iter_track_by_phone(phone, country=COUNTRY_USA, session=None, client=None):
+    """Stream the OrderStatus records for a phone number, one dict at a time.
 
-    Not quite sure what this gets you - problem to solve for next time I get pizza. 
+    The SOAP response is parsed incrementally, so memory use does not
+    grow with the number of orders on the phone number.
     """
     phone = str(phone).strip()
-    data = request_xml(
-        Urls(country).track_by_phone(), 
-        phone=phone
-    )['soap:Envelope']['soap:Body']
+    if client is not None:
+        return client.get_xml_records('track_by_phone', 'OrderStatus', 'OrderStatuses', phone=phone)
+    return request_xml_records(Urls(country).track_by_phone(), 'OrderStatus', 'OrderStatuses',
+                               session=session, phone=phone)
+
+
+def _order_statuses(xml_data):
+    """Get the OrderStatus value out of a phone tracker SOAP dict, or None."""
+    body = (xml_data or {}).get('soap:Envelope', {}).get('soap:Body', {})
+    statuses = (body.get('GetTrackerDataResponse') or {}).get('OrderStatuses') or {}
+    return statuses.get('OrderStatus')
 
-    response = data['GetTrackerDataResponse']['OrderStatuses']['OrderStatus']
 
-    return response
+def track_by_phone(phone, country=COUNTRY_USA, client=None):
+    """Query the API to get tracking information.
+
+    Returns the OrderStatus dict, or a list of them when the phone number
+    has several orders (the same shape xmltodict used to give). The
+    response is streamed (see iter_track_by_phone).
+
+    Raises:
+        KeyError: The phone number has no orders, as when this looked up
+            ['OrderStatus'] in the xmltodict response
+    """
+    response = list(iter_track_by_phone(phone, country, client=client))
+    if not response:
+        raise KeyError('OrderStatus')
+    return response[0] if len(response) == 1 else response
 
 
-def track_by_order(store_id, order_key, country=COUNTRY_USA):
+def track_by_order(store_id, order_key, country=COUNTRY_USA, session=None, client=None):
     """Query the API to get tracking information.
     """
+    if client is not None:
+        return client.get_json('track_by_order', store_id=store_id, order_key=order_key)
     return request_json(
         Urls(country).track_by_order(),
+        session=session,
         store_id=store_id,
         order_key=order_key
     )
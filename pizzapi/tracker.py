@@ -0,0 +1,213 @@
+import heapq
+import itertools
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .track import track_by_order, TERMINAL_STATUSES
+from .urls import COUNTRY_USA
+from .utils import RateLimiter, _requests
+
+
+# Seconds between polls for each status: slow while the pizza is being
+# made, fast once it's on the way
+DEFAULT_INTERVALS = {
+    'Order Placed': 30,
+    'Makeline': 30,
+    'Oven': 60,
+    'Routing Station': 20,
+    'Out the Door': 10,
+}
+
+
+class TrackedOrder(object):
+    """
+    An order followed by an OrderTracker.
+
+    Attributes:
+        store_id (String): Store ID
+        order_key (String): Order key
+        country (String): Country whose API is used
+        status (String): Last OrderStatus seen ('' before the first poll)
+        data (Dict): Last tracker response
+        polls (Integer): Number of successful polls
+        errors (Integer): Consecutive failed polls
+    """
+
+    __slots__ = ('store_id', 'order_key', 'country', 'status', 'data', 'polls', 'errors')
+
+    def __init__(self, store_id, order_key, country=COUNTRY_USA):
+        self.store_id = str(store_id)
+        self.order_key = str(order_key)
+        self.country = country
+        self.status = ''
+        self.data = {}
+        self.polls = 0
+        self.errors = 0
+
+    @property
+    def key(self):
+        return (self.store_id, self.order_key)
+
+    def __repr__(self):
+        return f"TrackedOrder({self.store_id!r}, {self.order_key!r}, status={self.status!r})"
+
+
+class OrderTracker(object):
+    """
+    Poll the tracker for many live orders at once.
+
+    Orders wait in a min-heap keyed by their next poll time. Every poll
+    goes through one rate limiter (`max_rate` requests per second across
+    all orders) and one requests.Session, so thousands of orders share a
+    small pool of keep-alive connections. The interval depends on the
+    order's status (see DEFAULT_INTERVALS) with +/- `jitter` randomization
+    so polls don't bunch up, and orders are dropped automatically once
+    they reach a terminal status or fail `max_errors` polls in a row.
+
+    Example:
+        tracker = OrderTracker(on_update=lambda order: print(order.status))
+        tracker.track(store_id, order_key)
+        tracker.start()
+    """
+
+    def __init__(self, max_rate=10, workers=8, intervals=None, default_interval=30, jitter=0.2,
+                 max_errors=5, session=None, on_update=None, on_complete=None):
+        self.intervals = dict(DEFAULT_INTERVALS, **(intervals or {}))
+        self.default_interval = default_interval
+        self.jitter = jitter
+        self.max_errors = max_errors
+        self.on_update = on_update
+        self.on_complete = on_complete
+        self.session = session or self._make_session(workers)
+        self._limiter = RateLimiter(max_rate, burst=workers)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='pizzapi-tracker')
+        self._orders = {}
+        self._heap = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+        self.polls = 0
+        self.errors = 0
+
+    @staticmethod
+    def _make_session(workers):
+        requests = _requests()
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=workers)
+        session.mount('https://', adapter)
+        return session
+
+    def track(self, store_id, order_key, country=COUNTRY_USA):
+        """Start tracking an order; it is polled as soon as possible."""
+        order = TrackedOrder(store_id, order_key, country)
+        with self._cond:
+            if order.key in self._orders:
+                return self._orders[order.key]
+            self._orders[order.key] = order
+            heapq.heappush(self._heap, (time.monotonic(), next(self._counter), order.key))
+            self._cond.notify()
+        return order
+
+    def untrack(self, store_id, order_key):
+        """Stop tracking an order."""
+        with self._cond:
+            return self._orders.pop((str(store_id), str(order_key)), None)
+
+    @property
+    def orders(self):
+        """Get the orders currently tracked."""
+        with self._cond:
+            return list(self._orders.values())
+
+    def __len__(self):
+        return len(self._orders)
+
+    def start(self):
+        """Start polling in a background thread."""
+        with self._cond:
+            if self._running:
+                return self
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name='pizzapi-tracker', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop polling."""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._executor.shutdown(wait=True)
+
+    def interval(self, status):
+        """Get the jittered number of seconds to wait before polling an order in `status`."""
+        base = self.intervals.get(status, self.default_interval)
+        return base * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running:
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    delay = self._heap[0][0] - time.monotonic()
+                    if delay <= 0:
+                        break
+                    self._cond.wait(delay)
+                if not self._running:
+                    return
+                _, _, key = heapq.heappop(self._heap)
+                order = self._orders.get(key)
+            if order is None:
+                continue
+            # Blocks the dispatcher, so the cap holds across all orders
+            self._limiter.acquire()
+            self._executor.submit(self._poll, order)
+
+    def _poll(self, order):
+        try:
+            data = track_by_order(order.store_id, order.order_key, order.country, session=self.session)
+        except Exception:
+            with self._cond:
+                self.errors += 1
+            order.errors += 1
+            if order.errors >= self.max_errors:
+                self._drop(order)
+            else:
+                # Back off exponentially on errors
+                self._reschedule(order, self.interval(order.status) * 2 ** order.errors)
+            return
+
+        with self._cond:
+            self.polls += 1
+        order.polls += 1
+        order.errors = 0
+        order.data = data
+        status = data.get('OrderStatus', '') if isinstance(data, dict) else ''
+        changed = status != order.status
+        order.status = status
+        if changed and self.on_update:
+            self.on_update(order)
+        if status in TERMINAL_STATUSES:
+            self._drop(order)
+        else:
+            self._reschedule(order, self.interval(status))
+
+    def _reschedule(self, order, delay):
+        with self._cond:
+            if order.key in self._orders:
+                heapq.heappush(self._heap, (time.monotonic() + delay, next(self._counter), order.key))
+                self._cond.notify()
+
+    def _drop(self, order):
+        with self._cond:
+            self._orders.pop(order.key, None)
+        if self.on_complete:
+            self.on_complete(order)
@@ -1,6 +1,28 @@
-import requests
-import xmltodict
+import hashlib
+import json
+import threading
+import time
 import re
+import xml.etree.ElementTree as ElementTree
+
+from . import hooks
+from .urls import endpoint_name
+
+
+def _requests():
+    """Get the requests module, importing it on first use.
+
+    requests is slow to import, so pizzapi only loads it once a request
+    is made; `from pizzapi import Address` never does.
+    """
+    import requests
+    return requests
+
+
+def _xmltodict():
+    """Get the xmltodict module, importing it on first use."""
+    import xmltodict
+    return xmltodict
 
 
 def to_pascal_case(data):
@@ -57,29 +79,145 @@ def default_parameters(obj, parameters):
     return obj
 
 
+def canonical_hash(data):
+    """Get a stable SHA-256 hex digest of JSON-serializable data.
+
+    Dict keys are sorted, so two payloads that differ only in key order
+    hash the same.
+    """
+    encoded = json.dumps(data, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+class RateLimiter(object):
+    """
+    Thread-safe token bucket limiting calls to `rate` per second.
+
+    Up to `burst` calls may go through at once; after that `acquire()`
+    blocks until a token is available.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a call is allowed."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
 # TODO: Find out why this occasionally hangs
 # TODO: Can we wrap this up, so the callers don't have to worry about the 
     # complexity of two types of requests? 
-def request_json(url, **kwargs):
+def request_json(url, session=None, **kwargs):
     """
     Send a GET request to one of the API endpoints that returns JSON.
 
     Send a GET request to an endpoint, ideally a URL from the urls module.
-    The endpoint is formatted with the kwargs passed to it.
+    The endpoint is formatted with the kwargs passed to it. Pass a
+    requests.Session as `session` to reuse its pooled connections.
 
     This will error on an invalid request (requests.Request.raise_for_status()), but will otherwise return a dict.
     """
-    r = requests.get(url.format(**kwargs))
+    requests = _requests()
+    full_url = url.format(**kwargs)
+    r = hooks.call(endpoint_name(url), 'GET', full_url, lambda: (session or requests).get(full_url))
     r.raise_for_status()
     return r.json()
 
 
-def request_xml(url, **kwargs):
+def request_xml(url, session=None, **kwargs):
     """
     Send an XML request to one of the API endpoints that returns XML.
     
     This is in every respect identical to request_json. 
     """
-    r = requests.get(url.format(**kwargs))
+    requests = _requests()
+    xmltodict = _xmltodict()
+    full_url = url.format(**kwargs)
+    r = hooks.call(endpoint_name(url), 'GET', full_url, lambda: (session or requests).get(full_url))
     r.raise_for_status()
     return xmltodict.parse(r.text)
+
+
+def _local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def _element_to_dict(element):
+    """Convert an element to the same shape xmltodict.parse would give it."""
+    children = list(element)
+    text = element.text.strip() if element.text else ''
+    if not children and not element.attrib:
+        return text or None
+    data = {'@' + key: value for key, value in element.attrib.items()}
+    for child in children:
+        name = _local_name(child.tag)
+        value = _element_to_dict(child)
+        if name in data:
+            if not isinstance(data[name], list):
+                data[name] = [data[name]]
+            data[name].append(value)
+        else:
+            data[name] = value
+    if text:
+        data['#text'] = text
+    return data
+
+
+def iter_xml_records(source, tag, parent=None):
+    """
+    Stream every `tag` element of an XML document as an xmltodict-style dict.
+
+    The document is read incrementally with ElementTree.iterparse and each
+    matching element is detached once converted, so memory stays constant
+    however many records the document holds. Namespaces are ignored when
+    matching `tag`.
+
+    Args:
+        source: A file-like object (e.g. a streamed response's raw body)
+        tag: Local name of the elements to extract
+        parent: Only extract `tag` elements directly under an element with
+            this local name (needed when records nest same-named children)
+    """
+    stack = []
+    for event, element in ElementTree.iterparse(source, events=('start', 'end')):
+        if event == 'start':
+            stack.append(element)
+            continue
+        stack.pop()
+        if _local_name(element.tag) == tag and (
+                parent is None or (stack and _local_name(stack[-1].tag) == parent)):
+            yield _element_to_dict(element)
+            if stack:
+                stack[-1].remove(element)
+
+
+def request_xml_records(url, tag, parent=None, session=None, **kwargs):
+    """
+    Stream the `tag` elements of an XML endpoint's response (see iter_xml_records).
+
+    Unlike request_xml the body is never held in memory as a whole.
+    """
+    requests = _requests()
+    full_url = url.format(**kwargs)
+    r = hooks.call(endpoint_name(url), 'GET', full_url,
+                   lambda: (session or requests).get(full_url, stream=True), stream=True)
+    try:
+        r.raise_for_status()
+        r.raw.decode_content = True
+        yield from iter_xml_records(r.raw, tag, parent)
+    finally:
+        r.close()
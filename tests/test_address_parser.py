@@ -0,0 +1,67 @@
+import pytest
+
+from pizzapi.address_parser import UNIT_TYPES, canonical_key, parse_address
+
+
+@pytest.mark.parametrize('unit', sorted(UNIT_TYPES))
+def test_commaless_unit_stays_on_street(unit):
+    parsed = parse_address(f'123 Main Street {unit} 200 Springfield IL 62704')
+    assert parsed.street == f'123 Main Street {unit} 200'
+    assert parsed.city == 'Springfield'
+    assert parsed.region == 'IL'
+    assert parsed.postal_code == '62704'
+    assert parsed.unit_type == UNIT_TYPES[unit]
+    assert parsed.unit_number == '200'
+
+
+def test_commaless_suite():
+    parsed = parse_address('123 Main Street Suite 200 Springfield IL 62704')
+    assert parsed.street == '123 Main Street Suite 200'
+    assert parsed.city == 'Springfield'
+
+
+@pytest.mark.parametrize('unit', ['#200', 'Apt #200', 'Ste. 200', 'Ste.200'])
+def test_commaless_unit_spellings(unit):
+    parsed = parse_address(f'123 Main Street {unit} Springfield IL 62704')
+    assert parsed.street == f'123 Main Street {unit}'
+    assert parsed.city == 'Springfield'
+    assert parsed.unit_number == '200'
+
+
+def test_commaless_city_starting_like_a_unit():
+    parsed = parse_address('123 Main Street Sterling VA 20164')
+    assert parsed.street == '123 Main Street'
+    assert parsed.city == 'Sterling'
+
+
+def test_commas():
+    parsed = parse_address('123 Main St, Apt 4, Springfield, IL 62704-1234')
+    assert parsed.street == '123 Main St Apt 4'
+    assert parsed.city == 'Springfield'
+    assert parsed.postal_code == '62704-1234'
+
+
+@pytest.mark.parametrize('street, unit_type, unit_number', [
+    ('500 Broadway Ste 2', 'STE', '2'),
+    ('500 Broadway #2', '#', '2'),
+    ('500 Broadway Apt B', 'APT', 'B'),
+])
+def test_commaless_unit_without_street_suffix(street, unit_type, unit_number):
+    parsed = parse_address(f'{street} Oakland CA 94607')
+    assert parsed.street == street
+    assert parsed.city == 'Oakland'
+    assert (parsed.unit_type, parsed.unit_number) == (unit_type, unit_number)
+    assert parsed.street_name == 'Broadway'
+
+
+def test_commaless_city_starting_with_a_unit_word():
+    parsed = parse_address('1 Ranch Road Lot Ranch TX 75001')
+    assert parsed.street == '1 Ranch Road'
+    assert parsed.city == 'Lot Ranch'
+
+
+def test_canonical_key_abbreviates_only_the_street():
+    assert canonical_key('100 North Street', 'North Bay', 'Ontario', 'P1B 8G3') == \
+        '100 N ST|NORTH BAY|ON|P1B8G3'
+    assert parse_address('100 North St, North Bay, ON P1B 8G3').key == \
+        parse_address('100 N. Street, NORTH BAY, Ontario P1B8G3').key
@@ -0,0 +1,71 @@
+from decimal import Decimal
+
+import pytest
+
+from pizzapi.amounts_breakdown import AmountsBreakdown, AmountsBreakdownBatch, from_cents, to_cents
+
+
+@pytest.mark.parametrize('value, cents', [
+    (None, 0), ('', 0), (3, 300), ('12.34', 1234), ('12.3', 1230), ('-0.5', -50),
+    (2.675, 268), ('0.005', 1), ('1,234.56', 123456), ('-1,000', -100000),
+])
+def test_to_cents(value, cents):
+    assert to_cents(value) == cents
+
+
+@pytest.mark.parametrize('value', ['abc', '1.2.3', 'NaN', 'Infinity'])
+def test_to_cents_rejects_non_amounts(value):
+    with pytest.raises(ValueError):
+        to_cents(value)
+
+
+def test_from_cents_is_exact():
+    assert from_cents(123456) == Decimal('1234.56')
+
+
+def _response(store_id, date, food, tax, customer):
+    return {'Order': {'StoreID': store_id, 'BusinessDate': date,
+                      'AmountsBreakdown': {'FoodAndBeverage': food, 'Tax': tax, 'Customer': customer,
+                                           'Bottle': 0, 'Savings': [{'Code': 'X'}]}}}
+
+
+RESPONSES = [
+    _response('4336', '2030-01-07', '10.10', 0.81, 10.91),
+    _response('4336', '2030-01-08', '20.20', 1.62, 21.82),
+    _response('7021', '2030-01-07', '0.10', 0.01, 0.11),
+]
+
+
+def test_from_responses_totals_are_exact():
+    batch = AmountsBreakdownBatch.from_responses(RESPONSES * 1000)
+    assert len(batch) == 3000
+    # Float sums would drift here
+    assert batch.sum('food_and_beverage') == Decimal('30400.00')
+    assert batch.total_tax() == Decimal('2440.00')
+    assert batch.total() == Decimal('32840.00')
+    assert batch.sum('customer_total') == Decimal('32840.00')
+    assert batch.sum('savings') == 0
+
+
+def test_total_matches_calculate_total():
+    breakdown = AmountsBreakdown()
+    breakdown.food_and_beverage = 10.10
+    breakdown.tax = 0.81
+    breakdown.delivery_fee = 3.99
+    batch = AmountsBreakdownBatch.from_breakdowns([breakdown])
+    assert batch.total() == Decimal(str(round(breakdown.calculate_total(), 2)))
+    assert list(batch.row_totals()) == [1490]
+
+
+def test_group_by():
+    batch = AmountsBreakdownBatch.from_responses(RESPONSES)
+    by_store = batch.group_by('store_id')
+    assert by_store['4336']['count'] == 2
+    assert by_store['4336']['total'] == Decimal('32.73')
+    assert by_store['7021']['food_and_beverage'] == Decimal('0.10')
+
+    by_date = batch.group_by('business_date')
+    assert by_date['2030-01-07']['total_tax'] == Decimal('0.82')
+
+    both = batch.group_by(('store_id', 'business_date'))
+    assert set(both) == {('4336', '2030-01-07'), ('4336', '2030-01-08'), ('7021', '2030-01-07')}
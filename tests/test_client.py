@@ -0,0 +1,81 @@
+import pytest
+import requests
+
+from pizzapi.client import PizzaClient
+
+
+class FakeResponse(object):
+    def __init__(self, status_code=200, data=None):
+        self.status_code = status_code
+        self.data = data if data is not None else {}
+        self.headers = {}
+        self.content = b'{}'
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error", response=self)
+
+    def json(self):
+        return self.data
+
+
+class FakeSession(object):
+    """Stands in for requests.Session, recording every request."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def request(self, method, url, **kwargs):
+        self.calls.append((method, url, kwargs))
+        return self.responses.pop(0) if self.responses else FakeResponse()
+
+    def close(self):
+        pass
+
+
+def test_requests_reuse_one_session():
+    session = FakeSession()
+    client = PizzaClient(session=session)
+    client.get_json('info_url', store_id='4336')
+    client.get_json('info_url', store_id='7021')
+    client.post_json('price_url', {'Order': {}})
+    assert [call[0] for call in session.calls] == ['GET', 'GET', 'POST']
+    assert session.calls[1][1] == client.url('info_url').format(store_id='7021')
+    assert client.metrics()['endpoints']['info_url']['requests'] == 2
+
+
+def test_default_session_pools_connections():
+    client = PizzaClient(pool_size=20)
+    adapter = client.session.get_adapter('https://order.dominos.com/')
+    assert adapter._pool_maxsize == 20
+    # Every HTTPS request goes through the same adapter (and so its pool)
+    assert client.session.get_adapter('https://order.dominos.com/power/store/4336/profile') is adapter
+    client.close()
+
+
+def test_request_passes_timeout_through():
+    session = FakeSession()
+    PizzaClient(session=session).request('info_url', url='https://example.com', timeout=5)
+    assert session.calls[0][2] == {'timeout': 5}
+
+
+def test_http_errors_are_raised():
+    session = FakeSession(FakeResponse(500))
+    client = PizzaClient(session=session)
+    with pytest.raises(requests.HTTPError):
+        client.get_json('info_url', store_id='4336')
+    assert client.metrics()['endpoints']['info_url']['requests'] == 1
+
+
+def test_not_modified_is_not_an_error():
+    session = FakeSession(FakeResponse(304))
+    response = PizzaClient(session=session).request('menu_url', url='https://example.com')
+    assert response.status_code == 304
+
+
+def test_reset_metrics():
+    client = PizzaClient(session=FakeSession())
+    client.get_json('info_url', store_id='4336')
+    client.reset_metrics()
+    assert client.metrics()['endpoints'] == {}
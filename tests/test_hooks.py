@@ -0,0 +1,46 @@
+from pizzapi import hooks
+from pizzapi.client import PizzaClient
+
+
+class _Response(object):
+    status_code = 200
+    headers = {}
+    content = b'{}'
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {}
+
+
+class _Session(object):
+    def request(self, method, url, **kwargs):
+        return _Response()
+
+
+def test_call_without_hooks_just_sends():
+    assert hooks.call('menu_url', 'GET', 'https://example', lambda: 'sent') == 'sent'
+
+
+def test_client_request_is_recorded_once():
+    events = []
+    hook = hooks.add_hook(events.append)
+    try:
+        client = PizzaClient(session=_Session())
+        client.get_json('menu_url', store_id='4336', lang='en')
+    finally:
+        hooks.remove_hook(hook)
+    assert hooks.registered == ()
+    assert [event.endpoint for event in events] == ['menu_url']
+    endpoints = client.metrics()['endpoints']
+    assert endpoints['menu_url']['requests'] == 1
+    assert endpoints['menu_url']['errors'] == 0
+    client.reset_metrics()
+    assert client.metrics()['endpoints'] == {}
+
+
+def test_client_metrics_without_registered_hooks():
+    client = PizzaClient(session=_Session())
+    client.get_json('menu_url', store_id='4336', lang='en')
+    assert client.metrics()['endpoints']['menu_url']['requests'] == 1
@@ -0,0 +1,53 @@
+import os
+import stat
+
+import pytest
+import requests
+
+from pizzapi import image
+from pizzapi.image import Image
+
+
+@pytest.mark.skipif(os.name != 'posix', reason='POSIX file modes')
+def test_saved_file_gets_umask_mode(tmp_path):
+    path = str(tmp_path / 'pizza.jpg')
+    img = Image('S_PIZZA')
+    img._content = b'jpeg'
+    umask = os.umask(0o027)
+    try:
+        img.save_to_file(path)
+    finally:
+        os.umask(umask)
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o640
+    assert os.listdir(str(tmp_path)) == ['pizza.jpg']
+    with open(path, 'rb') as f:
+        assert f.read() == b'jpeg'
+
+
+def test_save_to_file_chains_request_errors(tmp_path, monkeypatch):
+    def fail(self):
+        raise requests.ConnectionError('down')
+
+    monkeypatch.setattr(Image, '_get', fail)
+    with pytest.raises(ValueError) as info:
+        Image('S_PIZZA').save_to_file(str(tmp_path / 'pizza.jpg'))
+    assert isinstance(info.value.__cause__, requests.ConnectionError)
+
+
+def test_prefetch_retries_failed_codes_in_later_calls(tmp_path, monkeypatch):
+    attempts = []
+
+    def download(self):
+        attempts.append(self.product_code)
+        if len(attempts) == 1:
+            raise requests.ConnectionError('down')
+        return 4
+
+    monkeypatch.setattr(Image, 'download', download)
+    seen = set()
+    report = image.prefetch_images(['S_PIZZA'], str(tmp_path), session=object(), seen=seen)
+    assert report.failed == ['S_PIZZA']
+    assert seen == set()
+    report = image.prefetch_images(['S_PIZZA'], str(tmp_path), session=object(), seen=seen)
+    assert report.downloaded == 1
+    assert seen == {('us', 'S_PIZZA')}
@@ -0,0 +1,56 @@
+import subprocess
+import sys
+
+import pytest
+
+
+def _imported_modules(statement):
+    """Run `statement` in a fresh interpreter and list the modules it left loaded."""
+    script = statement + '\nimport sys\nprint("\\n".join(sys.modules))'
+    result = subprocess.run([sys.executable, '-c', script],
+                            stdout=subprocess.PIPE, universal_newlines=True, check=True)
+    return set(result.stdout.split())
+
+
+def test_address_import_does_not_load_http_stack():
+    modules = _imported_modules('from pizzapi import Address')
+    assert 'pizzapi.address' in modules
+    assert 'requests' not in modules
+    assert 'xmltodict' not in modules
+    assert 'pizzapi.menu' not in modules
+
+
+def test_payment_import_does_not_load_http_stack():
+    modules = _imported_modules('from pizzapi import PaymentObject, OrderValidator')
+    assert 'requests' not in modules
+    assert 'xmltodict' not in modules
+
+
+def test_submodules_are_attributes():
+    modules = _imported_modules('import pizzapi\nassert pizzapi.menu.Menu is pizzapi.Menu\npizzapi.urls, pizzapi.utils')
+    assert {'pizzapi.menu', 'pizzapi.urls', 'pizzapi.utils'} <= modules
+
+
+def test_unknown_attribute_raises():
+    import pizzapi
+    with pytest.raises(AttributeError):
+        pizzapi.no_such_name
+
+
+def test_bare_import_loads_no_submodules():
+    modules = _imported_modules('import pizzapi')
+    assert not {module for module in modules if module.startswith('pizzapi.')}
+    assert 'requests' not in modules
+
+
+def test_star_import_resolves_every_export():
+    modules = _imported_modules('from pizzapi import *\nassert OrderTracker and prefetch_images')
+    assert 'pizzapi.tracker' in modules
+
+
+def test_resolved_names_are_cached():
+    import pizzapi
+    vars(pizzapi).pop('Menu', None)
+    menu_class = pizzapi.Menu
+    assert vars(pizzapi)['Menu'] is menu_class
+    assert 'Menu' in dir(pizzapi)
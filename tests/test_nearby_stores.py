@@ -0,0 +1,77 @@
+from pizzapi import nearby_stores
+from pizzapi.nearby_stores import NearbyStores
+from pizzapi.store import Store, StoreSummary
+
+
+def test_bulk_yields_failures_without_caching_them(monkeypatch):
+    calls = []
+
+    def request_json(url, **query):
+        calls.append(query['line1'])
+        if len(calls) == 1:
+            raise IOError('down')
+        return {'Stores': []}
+
+    monkeypatch.setattr(nearby_stores, 'request_json', request_json)
+    address = '123 Main St, Springfield, IL 62704'
+    first = list(NearbyStores.bulk([address], concurrency=1))
+    assert isinstance(first[0][1], IOError)
+
+    results = list(NearbyStores.bulk([address, address], concurrency=1))
+    assert all(isinstance(result, NearbyStores) for _, result in results)
+    assert len(calls) == 2
+
+
+def test_bulk_sends_repeated_queries_once(monkeypatch):
+    calls = []
+    monkeypatch.setattr(nearby_stores, 'request_json',
+                        lambda url, **query: calls.append(query['line1']) or {'Stores': []})
+    addresses = [f'{n} Main St, Springfield, IL 62704' for n in (1, 2, 1)]
+    results = list(NearbyStores.bulk(addresses, concurrency=1, max_cached=1))
+    assert len(results) == 3
+    assert len(calls) == 2
+
+
+LOCATOR_RESPONSE = {
+    'Status': 0,
+    'Stores': [
+        {'StoreID': '4336', 'MinDistance': '1.2', 'IsOnlineNow': True,
+         'ServiceIsOpen': {'Delivery': True, 'Carryout': True},
+         'StoreCoordinates': {'StoreLatitude': '39.78', 'StoreLongitude': '-89.65'}},
+        {'StoreID': '7021', 'MinDistance': '2.5', 'IsOnlineNow': False,
+         'ServiceIsOpen': {'Delivery': True, 'Carryout': True}},
+        {'StoreID': '5555', 'MinDistance': 'far', 'IsOnlineNow': True,
+         'ServiceIsOpen': {'Delivery': False, 'Carryout': True}},
+    ],
+}
+
+
+def test_store_summary_fields():
+    summary = StoreSummary(LOCATOR_RESPONSE['Stores'][0])
+    assert (summary.store_id, summary.distance) == ('4336', 1.2)
+    assert (summary.is_online, summary.is_delivery_open, summary.is_carryout_open) == (True, True, True)
+    assert (summary.latitude, summary.longitude) == (39.78, -89.65)
+    assert summary.data is LOCATOR_RESPONSE['Stores'][0]
+
+    other = StoreSummary(LOCATOR_RESPONSE['Stores'][2])
+    assert other.distance == 0.0
+    assert (other.latitude, other.longitude) == (None, None)
+    assert not other.is_service_open('Delivery')
+
+
+def test_summaries_are_promoted_to_stores_on_demand(monkeypatch):
+    monkeypatch.setattr(nearby_stores, 'request_json', lambda url, **query: LOCATOR_RESPONSE)
+    nearby = NearbyStores('123 Main St, Springfield, IL 62704')
+    # Offline and delivery-closed stores are left out
+    assert [summary.store_id for summary in nearby.summaries] == ['4336']
+    assert nearby._stores is None
+
+    store = nearby.summaries[0].to_store()
+    assert isinstance(store, Store)
+    assert store.id == '4336'
+    assert store.info is LOCATOR_RESPONSE['Stores'][0]
+    assert nearby.get_closest_store().id == '4336'
+    assert [store.id for store in nearby.stores] == ['4336']
+
+    carryout = NearbyStores('123 Main St, Springfield, IL 62704', pickup_type='Carryout')
+    assert [summary.store_id for summary in carryout.summaries] == ['4336', '5555']
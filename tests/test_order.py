@@ -0,0 +1,70 @@
+from pizzapi.address import Address
+from pizzapi.order import Order
+
+
+def _template():
+    order = Order()
+    order.store_id = '4336'
+    order.address = Address('123 Main St', 'Springfield', 'IL', '62704')
+    order.add_item({'Code': '14SCREEN'})
+    return order
+
+
+def test_clone_shares_until_written():
+    template = _template()
+    clone = template.clone()
+    assert clone.products is template.products
+    assert clone.address is template.address
+    clone.add_item({'Code': '2LCOKE'})
+    assert [p['Code'] for p in clone.products] == ['14SCREEN', '2LCOKE']
+    assert [p['Code'] for p in template.products] == ['14SCREEN']
+    assert clone.products[0] is not template.products[0]
+
+
+def test_last_holder_takes_the_snapshot_without_copying():
+    template = _template()
+    clone = template.clone()
+    clone.add_item({'Code': '2LCOKE'})
+    shared = template.products[0]
+    template.add_item({'Code': 'W08PBNLW'})
+    assert template._products_share is None
+    assert template.products[0] is shared
+
+
+def test_address_setter_drops_the_share():
+    template = _template()
+    clone = Order.from_template(template, store_id='7')
+    clone.address = Address('1 Elm St', 'Springfield', 'IL', '62704')
+    assert template.address.street == '123 Main St'
+    assert clone.store_id == '7' and template.store_id == '4336'
+
+
+def test_remove_item_on_clone_keeps_template():
+    template = _template()
+    clone = template.clone()
+    clone.remove_item('14SCREEN')
+    assert len(clone.products) == 0
+    assert len(template.products) == 1
+
+
+def test_price_cache_hit_does_not_copy_order_identifiers(monkeypatch):
+    from pizzapi.cache import TTLCache
+
+    responses = [{'Status': 1, 'Order': {'OrderID': 'first-order', 'Email': 'a@example.com',
+                                         'Amounts': {'Customer': 15.99}, 'EstimatedWaitMinutes': '20-30'}}]
+    monkeypatch.setattr(Order, '_send', lambda self, url, merge, country, endpoint: (
+        self._merge_response(responses[0]) or responses[0]))
+    cache = TTLCache()
+    first = _template()
+    first.price(cache=cache)
+    assert first.order_id == 'first-order'
+
+    second = _template()
+    second.email = 'b@example.com'
+    response = second.price(cache=cache)
+    assert cache.hits == 1
+    assert second.amounts == {'Customer': 15.99}
+    assert second.estimated_wait_minutes == '20-30'
+    assert second.order_id == ''
+    assert second.email == 'b@example.com'
+    assert 'OrderID' not in response['Order']
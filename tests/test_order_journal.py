@@ -0,0 +1,89 @@
+import threading
+import time
+from datetime import datetime
+
+import pytest
+import requests
+
+from pizzapi.address import Address
+from pizzapi.order import Order
+from pizzapi.order_journal import OrderJournal, CONFIRMED, FAILED, PENDING, SENT, reconcile_by_phone
+
+
+def test_begin_only_once_per_key(tmp_path):
+    journal = OrderJournal(str(tmp_path / 'journal.jsonl'), fsync=False)
+    results = []
+    barrier = threading.Barrier(8)
+
+    def begin():
+        barrier.wait()
+        results.append(journal.begin('key')[1])
+
+    threads = [threading.Thread(target=begin) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results.count(True) == 1
+    assert journal.state('key') == PENDING
+
+
+def test_begin_after_confirm_returns_entry(tmp_path):
+    journal = OrderJournal(str(tmp_path / 'journal.jsonl'), fsync=False)
+    journal.begin('key')
+    journal.record('key', CONFIRMED, response={'Status': 1})
+    entry, begun = journal.begin('key')
+    assert not begun
+    assert entry['response'] == {'Status': 1}
+
+
+def _order():
+    order = Order()
+    order.phone = '5555555555'
+    order.store_id = '4336'
+    return order
+
+
+def _status(order_id, start):
+    return {'StoreID': '4336', 'OrderID': order_id, 'StartTime': start.strftime('%Y-%m-%dT%H:%M:%S')}
+
+
+def test_reconcile_matches_send_time(monkeypatch):
+    sent = time.time()
+    now = datetime.fromtimestamp(sent)
+    old = datetime.fromtimestamp(sent - 86400)
+    monkeypatch.setattr('pizzapi.track.track_by_phone',
+                        lambda phone, country: [_status('1', old), _status('2', now)])
+    assert reconcile_by_phone(_order(), {'state': SENT, 'time': sent})['OrderID'] == '2'
+
+
+def test_reconcile_ambiguous_returns_none(monkeypatch):
+    sent = time.time()
+    now = datetime.fromtimestamp(sent)
+    monkeypatch.setattr('pizzapi.track.track_by_phone',
+                        lambda phone, country: [_status('1', now), _status('2', now)])
+    assert reconcile_by_phone(_order(), {'state': SENT, 'time': sent}) is None
+    order = _order()
+    order.order_id = '2'
+    assert reconcile_by_phone(order, {'state': SENT, 'time': sent})['OrderID'] == '2'
+
+
+def test_error_before_post_fails_the_entry(tmp_path):
+    journal = OrderJournal(str(tmp_path / 'journal.jsonl'), fsync=False)
+    with pytest.raises(ValueError):
+        _order().place(journal=journal, key='key')
+    assert journal.state('key') == FAILED
+
+
+def test_error_after_post_leaves_the_entry_in_doubt(tmp_path, monkeypatch):
+    def post(**kwargs):
+        raise requests.ConnectionError('reset')
+
+    monkeypatch.setattr(requests, 'post', post)
+    journal = OrderJournal(str(tmp_path / 'journal.jsonl'), fsync=False)
+    order = _order()
+    order.add_item({'Code': '14SCREEN'})
+    order.address = Address('1 Main St', 'Beverly Hills', 'CA', '90210')
+    with pytest.raises(Exception, match='Error sending order'):
+        order.place(journal=journal, key='key')
+    assert journal.state('key') == SENT
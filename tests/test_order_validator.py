@@ -0,0 +1,96 @@
+from datetime import datetime
+
+from pizzapi.address import Address
+from pizzapi.order import Order
+from pizzapi.order_validator import OrderValidator, ValidationIssue
+from pizzapi.payment import PaymentObject
+
+PROFILE = {
+    'IsOnlineNow': False,
+    'ServiceIsOpen': {'Delivery': False},
+    'ServiceHours': {'Delivery': {'Mon': [{'OpenTime': '10:00', 'CloseTime': '23:00'}]}},
+}
+
+
+def _issues(order):
+    return [issue.field for issue in OrderValidator(store=PROFILE).check_service_method(order)]
+
+
+def test_closed_store_fails_an_order_for_now():
+    assert _issues(Order()) == ['StoreID', 'ServiceMethod']
+
+
+def test_future_order_uses_service_hours():
+    order = Order()
+    order.future_order_time = datetime(2030, 1, 7, 12, 0).strftime('%Y-%m-%d %H:%M:%S')  # a Monday
+    assert _issues(order) == []
+    order.future_order_time = '2030-01-07 08:00:00'
+    assert _issues(order) == ['FutureOrderTime']
+
+
+class FakeMenu(object):
+    def __init__(self, variants, unsupported_products=None, unsupported_options=None):
+        self.variants = variants
+        self.dominos_api_response = {'UnsupportedProducts': unsupported_products or {},
+                                     'UnsupportedOptions': unsupported_options or {}}
+
+
+def _delivery_order(*codes, **options):
+    order = Order()
+    order.store_id = '4336'
+    order.service_method = 'Delivery'
+    order.address = Address('1 Main St', 'Beverly Hills', 'CA', '90210')
+    for code in codes:
+        order.add_item({'Code': code, 'Options': options})
+    return order
+
+
+def test_required_fields():
+    issues = OrderValidator().check_required_fields(Order())
+    assert [(issue.rule, issue.field) for issue in issues] == [
+        ('required_fields', 'Products'), ('required_fields', 'StoreID')]
+
+
+def test_products_must_be_on_the_menu_and_supported():
+    menu = FakeMenu({'14SCREEN': {}, 'W08PBNLW': {}}, unsupported_products={'W08PBNLW': 'x'},
+                    unsupported_options={'X': 'x'})
+    order = _delivery_order('14SCREEN', 'W08PBNLW', 'NOPE', X={'1/1': '1'})
+    issues = OrderValidator(menu=menu).check_products(order)
+    assert [(issue.rule, issue.code) for issue in issues] == [
+        ('options', 'X'), ('products', 'W08PBNLW'), ('options', 'X'), ('products', 'NOPE'), ('options', 'X')]
+
+
+def test_delivery_needs_a_complete_address():
+    order = _delivery_order('14SCREEN')
+    assert list(OrderValidator().check_address(order)) == []
+    order.address = Address('1 Main St', '', 'CA', '')
+    assert [issue.code for issue in OrderValidator().check_address(order)] == ['City', 'PostalCode']
+    order.service_method = 'Carryout'
+    assert list(OrderValidator().check_address(order)) == []
+
+
+def test_invalid_payments_are_reported():
+    bad = PaymentObject({'number': '4111111111111112', 'expiration': '0130',
+                         'security_code': '123', 'postal_code': '62704'})
+    issues = OrderValidator(payments=[bad]).check_payments(_delivery_order('14SCREEN'))
+    assert [(issue.field, issue.code) for issue in issues] == [('Payments', 'VISA')]
+
+
+def test_extra_rules_run_after_the_defaults():
+    def no_anchovies(validator, order):
+        if any(product['Code'] == 'ANCHOVY' for product in order.products):
+            yield ValidationIssue('anchovies', 'Products', 'No anchovies', 'ANCHOVY')
+
+    validator = OrderValidator(rules=[no_anchovies])
+    assert [issue.rule for issue in validator.check(_delivery_order('ANCHOVY'))] == ['anchovies']
+    assert validator.is_valid(_delivery_order('14SCREEN'))
+
+
+def test_validate_skips_the_api_when_issues_are_found(monkeypatch):
+    def send(*args, **kwargs):
+        raise AssertionError('validate_url must not be called')
+
+    order = Order()
+    monkeypatch.setattr(order, '_send', send)
+    assert order.validate(validator=OrderValidator()) is False
+    assert [issue.field for issue in order.validation_issues][:2] == ['Products', 'StoreID']
@@ -0,0 +1,110 @@
+import itertools
+import threading
+import time
+
+from pizzapi.pipeline import OrderPipeline
+
+
+class FakeOrder(object):
+    """Stands in for an Order with controllable stage delays and failures."""
+
+    def __init__(self, name, delay=0.0, invalid=False, fail=None):
+        self.name = name
+        self.delay = delay
+        self.invalid = invalid
+        self.fail = fail
+        self.calls = []
+
+    def _stage(self, name, response):
+        self.calls.append(name)
+        time.sleep(self.delay)
+        if self.fail == name:
+            raise Exception(f"{name} failed")
+        return response
+
+    def validate(self, country, validator=None):
+        return self._stage('validate', not self.invalid)
+
+    def price(self, country, cache=None):
+        return self._stage('price', {'Status': 1})
+
+    def place(self, country, journal=None):
+        return self._stage('place', {'Status': 1})
+
+
+def test_every_order_goes_through_every_stage():
+    orders = [FakeOrder(i) for i in range(20)]
+    results = list(OrderPipeline().run(orders))
+    assert sorted(result.order.name for result in results) == list(range(20))
+    assert all(result.ok and result.stage == 'place' for result in results)
+    assert all(order.calls == ['validate', 'price', 'place'] for order in orders)
+    assert set(results[0].latencies) == {'validate', 'price', 'place'}
+
+
+def test_failures_short_circuit_later_stages():
+    invalid = FakeOrder('invalid', invalid=True)
+    unpriced = FakeOrder('unpriced', fail='price')
+    results = {result.order.name: result for result in OrderPipeline().run([invalid, unpriced])}
+
+    assert invalid.calls == ['validate']
+    assert (results['invalid'].stage, results['invalid'].ok) == ('validate', False)
+    assert results['invalid'].error == 'Order failed validation'
+
+    assert unpriced.calls == ['validate', 'price']
+    assert (results['unpriced'].stage, results['unpriced'].ok) == ('price', False)
+    assert results['unpriced'].error == 'price failed'
+
+
+def test_place_false_stops_after_pricing():
+    order = FakeOrder('order')
+    results = list(OrderPipeline(place=False).run([order]))
+    assert order.calls == ['validate', 'price']
+    assert results[0].stage == 'price'
+
+
+def test_stats():
+    orders = [FakeOrder(i, delay=0.01) for i in range(9)] + [FakeOrder('bad', fail='place')]
+    pipeline = OrderPipeline()
+    list(pipeline.run(orders))
+    stats = pipeline.stats
+    assert set(stats) == {'validate', 'price', 'place'}
+    assert stats['validate']['count'] == 10
+    assert stats['place']['count'] == 10
+    assert stats['place']['failed'] == 1
+    assert stats['price']['failed'] == 0
+    assert 0.01 <= stats['price']['p50'] <= stats['price']['max']
+    assert stats['price']['throughput'] > 0
+
+
+def test_slow_consumer_applies_backpressure():
+    pulled = []
+
+    def orders():
+        for i in itertools.count():
+            pulled.append(i)
+            yield FakeOrder(i)
+
+    pipeline = OrderPipeline(validate_workers=1, price_workers=1, place_workers=1, queue_size=2)
+    results = pipeline.run(orders())
+    next(results)
+    time.sleep(0.3)
+    # Four queues of two, a worker per stage and the feeder's order in hand
+    assert len(pulled) <= 4 * 2 + 3 + 2
+    results.close()
+
+
+def test_early_exit_stops_the_workers():
+    orders = [FakeOrder(i, delay=0.01) for i in range(200)]
+    before = set(threading.enumerate())
+    for result in OrderPipeline(queue_size=2).run(orders):
+        break
+
+    def started():
+        return set(threading.enumerate()) - before
+
+    deadline = time.monotonic() + 2
+    while started() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not started()
+    placed = sum('place' in order.calls for order in orders)
+    assert placed < len(orders)
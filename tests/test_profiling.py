@@ -0,0 +1,76 @@
+import logging
+import pstats
+
+import pytest
+
+from pizzapi import profiling
+from pizzapi.menu import Menu
+
+
+@pytest.fixture
+def enabled():
+    profiling.enable(clear=True)
+    yield
+    profiling.disable()
+    profiling.reset()
+
+
+def test_disabled_spans_are_not_recorded():
+    profiling.reset()
+    with profiling.span('outer'):
+        pass
+    assert profiling.stats() == {}
+
+
+def test_nested_span_in_stats_and_pstats_dump(enabled, tmp_path):
+    with profiling.span('outer'):
+        with profiling.span('inner'):
+            sum(range(1000))
+    stats = profiling.stats()
+    assert stats['outer']['count'] == stats['inner']['count'] == 1
+    assert stats['outer']['total'] >= stats['inner']['total']
+    assert stats['outer']['self'] == pytest.approx(stats['outer']['total'] - stats['inner']['total'])
+
+    path = str(tmp_path / 'spans.prof')
+    profiling.dump(path)
+    loaded = pstats.Stats(path).stats
+    outer, inner = ('pizzapi', 0, 'outer'), ('pizzapi', 0, 'inner')
+    assert loaded[outer][:2] == (1, 1)
+    assert loaded[inner][:2] == (1, 1)
+    # inner was called from outer
+    assert outer in loaded[inner][4]
+    assert loaded[outer][3] == pytest.approx(stats['outer']['total'])
+
+
+def test_menu_parse_spans(enabled):
+    Menu({'Variants': {}, 'Products': {}})
+    assert {'menu.parse', 'menu.new_structure', 'menu.section.Products'} <= set(profiling.stats())
+
+
+def test_menu_log_records_carry_store_id(caplog):
+    data = {'Variants': {'X': {'Code': 'X'}}, 'Products': {},
+            'Categorization': {'Food': {'Categories': [], 'Products': ['MISSING'], 'Code': 'Food'}}}
+    with caplog.at_level(logging.WARNING, logger='pizzapi.menu'):
+        Menu(data, store_id=4336)
+    record = next(record for record in caplog.records if 'MISSING' in record.getMessage())
+    assert record.store_id == '4336'
+    assert record.product_code == 'MISSING'
+
+
+def test_menu_section_errors_name_the_failing_section(caplog, monkeypatch):
+    parse_section = Menu._parse_section
+    bad = {'Broken': True}
+
+    def fail_on_bad(self, dominos_data, menu_section):
+        if dominos_data is bad:
+            raise ValueError('bad section')
+        return parse_section(self, dominos_data, menu_section)
+
+    monkeypatch.setattr(Menu, '_parse_section', fail_on_bad)
+    with caplog.at_level(logging.WARNING, logger='pizzapi.menu'):
+        menu = Menu({'Variants': {}, 'Products': {}, 'Sizes': bad, 'Toppings': {'Pizza': {}}}, store_id=4336)
+    record = next(record for record in caplog.records if 'bad section' in record.getMessage())
+    assert record.section == 'Sizes'
+    assert 'Sizes' in record.getMessage()
+    # Later sections still load
+    assert 'Pizza' in menu.menu['toppings']
@@ -0,0 +1,127 @@
+import json
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from pizzapi.order import Order
+from pizzapi.scheduler import OrderScheduler, ScheduledOrder, CANCELLED, FAILED, PLACED, PREPARED, SCHEDULED
+from pizzapi.service_hours import ServiceHours
+
+
+def _order():
+    order = Order()
+    order.store_id = '4336'
+    order.add_item({'Code': '14SCREEN'})
+    order.add_payment({'Type': 'CreditCard', 'Number': '4100123422343234', 'SecurityCode': '123'})
+    return order
+
+
+def test_payments_are_not_persisted(tmp_path):
+    path = str(tmp_path / 'jobs.json')
+    scheduler = OrderScheduler(path=path)
+    scheduler.schedule(_order(), when=time.time() + 3600, job_id='job')
+    with open(path) as f:
+        saved = f.read()
+    assert '4100123422343234' not in saved
+    assert 'payments' not in json.loads(saved.splitlines()[0])['order']['attributes']
+    scheduler.stop()
+
+
+def test_on_restore_reattaches_payment(tmp_path):
+    path = str(tmp_path / 'jobs.json')
+    OrderScheduler(path=path).schedule(_order(), when=time.time() + 3600, job_id='job')
+    card = {'Type': 'CreditCard', 'Number': '4100123422343234'}
+    scheduler = OrderScheduler(path=path, on_restore=lambda job: job.order.add_payment(card))
+    assert scheduler.get('job').order.payments == [card]
+    assert scheduler.get('job').state == SCHEDULED
+
+
+def test_failing_prepare_does_not_overwrite_cancel():
+    scheduler = OrderScheduler()
+    job = ScheduledOrder('job', _order(), time.time() + 3600)
+    scheduler._jobs[job.job_id] = job
+    job.state = CANCELLED
+    scheduler._finish(job, FAILED, error='boom', expected=(SCHEDULED,))
+    assert job.state == CANCELLED
+    assert job.error == ''
+
+
+def test_slot_uses_store_utc_offset(monkeypatch):
+    # Host in New York, store on Pacific Standard Time
+    monkeypatch.setenv('TZ', 'America/New_York')
+    time.tzset()
+    try:
+        order = _order()
+        order.future_order_time = '2030-01-15 12:00:00'
+        store = SimpleNamespace(service_hours=ServiceHours(utc_offset=-480))
+        scheduler = OrderScheduler()
+        scheduler.schedule(order, job_id='job', store=store)
+        expected = datetime(2030, 1, 15, 20, 0, tzinfo=timezone.utc).timestamp()
+        assert scheduler.get('job').place_at == expected
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+
+
+def _recording_order(calls, valid=True):
+    order = _order()
+    order.validate = lambda country: calls.append('validate') or valid
+    order.price = lambda country: calls.append('price') or {'Status': 1}
+    order.place = lambda country, journal=None: calls.append('place') or {'Status': 1}
+    return order
+
+
+def _wait_for(predicate):
+    deadline = time.monotonic() + 2
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert predicate()
+
+
+def test_prepare_runs_at_once_when_its_time_has_passed():
+    calls = []
+    scheduler = OrderScheduler(lead_time=300).start()
+    try:
+        scheduler.schedule(_recording_order(calls), when=time.time() + 60, job_id='job')
+        _wait_for(lambda: scheduler.get('job').state == PREPARED)
+        assert calls == ['validate', 'price']
+    finally:
+        scheduler.stop()
+
+
+def test_slot_already_due_is_prepared_before_placing():
+    calls, invalid_calls = [], []
+    scheduler = OrderScheduler(lead_time=300).start()
+    try:
+        scheduler.schedule(_recording_order(calls), when=time.time(), job_id='job')
+        scheduler.schedule(_recording_order(invalid_calls, valid=False), when=time.time(), job_id='invalid')
+        _wait_for(lambda: scheduler.get('job').state == PLACED and scheduler.get('invalid').state == FAILED)
+        assert calls == ['validate', 'price', 'place']
+        assert invalid_calls == ['validate']
+    finally:
+        scheduler.stop()
+
+
+def test_persistence_is_append_only_and_compacted(tmp_path):
+    path = str(tmp_path / 'jobs.json')
+    scheduler = OrderScheduler(path=path)
+    for i in range(200):
+        scheduler.schedule(_order(), when=time.time() + 3600, job_id=str(i))
+    for i in range(150):
+        scheduler.cancel(str(i))
+    with open(path) as f:
+        lines = f.read().splitlines()
+    # Dead entries are compacted away instead of growing without bound
+    assert len(lines) <= 2 * 50 + 64
+    restored = OrderScheduler(path=path)
+    assert sorted(restored._jobs, key=int) == [str(i) for i in range(150, 200)]
+    with open(path) as f:
+        assert len(f.read().splitlines()) == 50
+
+
+def test_restores_the_old_array_format(tmp_path):
+    path = str(tmp_path / 'jobs.json')
+    job = ScheduledOrder('job', _order(), time.time() + 3600)
+    with open(path, 'w') as f:
+        json.dump([job.to_dict()], f)
+    assert OrderScheduler(path=path).get('job').state == SCHEDULED
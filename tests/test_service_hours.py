@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from pizzapi.order import Order
+from pizzapi.service_hours import ServiceHours
+from pizzapi.store import Store
+
+PROFILE = {
+    'StoreID': '4336',
+    'TimeZoneMinutes': -300,
+    'Hours': {'Mon': [{'OpenTime': '10:00', 'CloseTime': '22:00'}]},
+    'ServiceHours': {'Delivery': {'Mon': [{'OpenTime': '11:00', 'CloseTime': '21:00'}]}},
+}
+
+# Mondays
+NEXT_MONDAY = datetime(2030, 1, 7)
+
+
+def test_store_hours_answer_for_services_without_their_own():
+    hours = ServiceHours.from_profile(PROFILE)
+    assert hours.is_open(NEXT_MONDAY.replace(hour=10, minute=30), 'Carryout') is True
+    assert hours.is_open(NEXT_MONDAY.replace(hour=10, minute=30), 'Delivery') is False
+    assert ServiceHours({}).is_open(NEXT_MONDAY, 'Carryout') is None
+
+
+def test_aware_date_is_converted_to_store_time():
+    order = Order()
+    store_time = timezone(timedelta(minutes=-300))
+    # 17:00 UTC is noon at the store
+    order.order_in_future(NEXT_MONDAY.replace(hour=17, tzinfo=timezone.utc), Store(PROFILE))
+    assert order.future_order_time == '2030-01-07 12:00:00'
+    order.order_in_future(NEXT_MONDAY.replace(hour=12, tzinfo=store_time), Store(PROFILE))
+    assert order.future_order_time == '2030-01-07 12:00:00'
+
+
+def test_aware_date_needs_a_store_offset():
+    with pytest.raises(ValueError):
+        Order().order_in_future(NEXT_MONDAY.replace(hour=17, tzinfo=timezone.utc))
+
+
+def test_closed_time_in_store_timezone_is_rejected():
+    with pytest.raises(ValueError):
+        # 14:00 UTC is 09:00 at the store, before delivery opens
+        Order().order_in_future(NEXT_MONDAY.replace(hour=14, tzinfo=timezone.utc), Store(PROFILE))
+
+
+def test_past_date_is_rejected():
+    with pytest.raises(ValueError):
+        Order().order_in_future(datetime(2000, 1, 3, 12))
@@ -0,0 +1,111 @@
+import time
+
+import pytest
+
+from pizzapi import menu
+from pizzapi import store as store_module
+from pizzapi.store import Store, StoreProfileCache
+from pizzapi.urls import COUNTRY_USA
+
+
+def test_failed_menu_fetch_is_cached_until_refresh(monkeypatch):
+    calls = []
+
+    def fail(store_id, lang, country):
+        calls.append(store_id)
+        raise IOError('down')
+
+    monkeypatch.setattr(menu.Menu, 'from_store', staticmethod(fail))
+    store = Store('4336')
+    assert store.menu is None
+    assert store.menu is None
+    assert store.get_menu() is None
+    assert len(calls) == 1
+    assert isinstance(store.menu_error, IOError)
+
+    monkeypatch.setattr(menu.Menu, 'from_store', staticmethod(lambda store_id, lang, country: 'menu'))
+    assert store.refresh_menu() == 'menu'
+    assert store.menu == 'menu'
+    assert store.menu_error is None
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+class FakeClient(object):
+    """Stands in for a PizzaClient, returning numbered profiles."""
+
+    country = COUNTRY_USA
+
+    def __init__(self):
+        self.calls = []
+
+    def get_json(self, endpoint, store_id):
+        self.calls.append(store_id)
+        return {'StoreID': store_id, 'Version': len(self.calls)}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(store_module, 'time', clock)
+    return clock
+
+
+def _wait_for_refresh(cache, store_id):
+    deadline = time.monotonic() + 2
+    while cache.freshness(store_id)['refreshing'] and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_profile_cache_expires_after_ttl(clock):
+    client = FakeClient()
+    cache = StoreProfileCache(ttl=60, refresh_after=60, client=client)
+    assert cache.get('4336')['Version'] == 1
+    clock.now += 59
+    assert cache.get('4336')['Version'] == 1
+    clock.now += 1
+    assert cache.get('4336')['Version'] == 2
+    assert cache.stats == {'hits': 1, 'misses': 2, 'refreshes': 0, 'size': 1}
+
+
+def test_profile_cache_refreshes_stale_profiles_in_background(clock):
+    client = FakeClient()
+    cache = StoreProfileCache(ttl=60, refresh_after=30, client=client)
+    cache.get('4336')
+    clock.now += 45
+    # Still served from the cache while the refresh runs
+    assert cache.get('4336')['Version'] == 1
+    _wait_for_refresh(cache, '4336')
+    assert cache.get('4336')['Version'] == 2
+    assert cache.stats['refreshes'] == 1
+    assert client.calls == ['4336', '4336']
+
+
+def test_profile_cache_freshness(clock):
+    cache = StoreProfileCache(ttl=60, refresh_after=30, client=FakeClient())
+    assert cache.freshness('4336') is None
+    cache.get('4336')
+    clock.now += 10
+    assert cache.freshness('4336') == {'fetched_at': 1000.0, 'age': 10.0, 'stale': False,
+                                       'expired': False, 'refreshing': False}
+    clock.now += 50
+    freshness = cache.freshness('4336')
+    assert freshness['stale'] and freshness['expired']
+
+
+def test_warm_only_installs_the_cache_when_asked(monkeypatch):
+    monkeypatch.setattr(Store, 'profile_cache', None)
+    cache = StoreProfileCache(client=FakeClient())
+    stores = Store.warm(['1', '2'], cache=cache)
+    assert Store.profile_cache is None
+    assert [store.info['StoreID'] for store in stores] == ['1', '2']
+    assert cache.stats['misses'] == 2 and cache.stats['hits'] == 2
+
+    Store.warm(['3'], cache=cache, install=True)
+    assert Store.profile_cache is cache
@@ -0,0 +1,81 @@
+import random
+
+from pizzapi.store_index import StoreIndex, haversine_miles
+
+
+def _store(store_id, latitude, longitude, radius=None):
+    return {'StoreID': store_id, 'Latitude': latitude, 'Longitude': longitude, 'ServiceRadius': radius,
+            'IsOnlineNow': True, 'ServiceIsOpen': {'Delivery': True, 'Carryout': True}}
+
+
+def test_nearest_matches_brute_force():
+    rng = random.Random(7)
+    index = StoreIndex()
+    stores = [_store(str(i), 40 + rng.uniform(-3, 3), -75 + rng.uniform(-3, 3)) for i in range(300)]
+    for data in stores:
+        index.add(data)
+    for _ in range(20):
+        lat, lon = 40 + rng.uniform(-4, 4), -75 + rng.uniform(-4, 4)
+        expected = sorted(haversine_miles(lat, lon, s['Latitude'], s['Longitude']) for s in stores)[:5]
+        assert [round(d, 9) for d, _ in index.nearest(lat, lon, 5)] == [round(d, 9) for d in expected]
+
+
+def test_nearest_far_from_every_store():
+    index = StoreIndex()
+    index.add(_store('1', 40.0, -75.0))
+    assert [data['StoreID'] for _, data in index.nearest(10.0, -75.0, 3)] == ['1']
+
+
+def test_delivery_lookup_uses_service_radius(monkeypatch):
+    index = StoreIndex()
+    index.add(_store('near', 40.0, -75.0, radius=0.5))
+    index.add(_store('far', 40.05, -75.0, radius=10))
+    index.add_locator_response({'Stores': []}, 40.01, -75.0)
+    stores = index.lookup('address', 40.01, -75.0)
+    assert [store.id for store in stores] == ['far']
+    assert [store.id for store in index.lookup('address', 40.01, -75.0, service='Carryout')] == ['near']
+
+
+def test_delivery_lookup_falls_back_to_locator(monkeypatch):
+    calls = []
+
+    class FakeNearbyStores(object):
+        def __init__(self, address, service, country):
+            calls.append(address)
+            self.dominos_api_response = {'Stores': []}
+            self.summaries = []
+            self.error = None
+
+    monkeypatch.setattr('pizzapi.nearby_stores.NearbyStores', FakeNearbyStores)
+    index = StoreIndex()
+    index.add(_store('near', 40.0, -75.0, radius=0.5))
+    index.add_locator_response({'Stores': []}, 40.2, -75.0)
+    assert index.lookup('address', 40.2, -75.0) == []
+    assert calls == ['address']
+
+
+def test_delivering_to_matches_brute_force():
+    rng = random.Random(11)
+    index = StoreIndex()
+    stores = [_store(str(i), 40 + rng.uniform(-2, 2), -75 + rng.uniform(-2, 2), radius=rng.uniform(1, 15))
+              for i in range(300)]
+    for data in stores:
+        index.add(data)
+    for _ in range(20):
+        lat, lon = 40 + rng.uniform(-2, 2), -75 + rng.uniform(-2, 2)
+        expected = sorted(s['StoreID'] for s in stores
+                          if haversine_miles(lat, lon, s['Latitude'], s['Longitude']) <= s['ServiceRadius'])
+        assert sorted(data['StoreID'] for _, data in index.delivering_to(lat, lon)) == expected
+
+
+def test_failed_locator_does_not_mark_coverage(monkeypatch):
+    class FailingNearbyStores(object):
+        def __init__(self, address, service, country):
+            self.dominos_api_response = {}
+            self.summaries = []
+            self.error = ValueError('locator down')
+
+    monkeypatch.setattr('pizzapi.nearby_stores.NearbyStores', FailingNearbyStores)
+    index = StoreIndex()
+    assert index.lookup('address', 40.0, -75.0) == []
+    assert not index.covers(40.0, -75.0)
@@ -0,0 +1,176 @@
+"""Concurrent access to shared objects.
+
+Nothing here relies on the GIL: every check is about the locks in the
+library, so the tests hold on free-threaded builds too, where they are
+most likely to catch a race.
+"""
+import sys
+import threading
+import time
+
+from pizzapi import store as store_module
+from pizzapi.cache import TTLCache
+from pizzapi.image import Image
+from pizzapi.item import Item
+from pizzapi.menu import Menu
+from pizzapi.order import Order
+from pizzapi.store import Store
+
+THREADS = 16
+
+
+def _run_concurrently(target, threads=THREADS):
+    """Start `target` on every thread at once and return what each returned."""
+    barrier = threading.Barrier(threads)
+    results = [None] * threads
+    errors = []
+
+    def run(index):
+        barrier.wait()
+        try:
+            results[index] = target()
+        except BaseException as e:
+            errors.append(e)
+
+    workers = [threading.Thread(target=run, args=(index,)) for index in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert not errors, errors
+    return results
+
+
+def test_gil_state_is_reported():
+    # Not a check, just makes free-threaded runs visible in -v output
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', lambda: True)
+    assert is_gil_enabled() in (True, False)
+
+
+def test_concurrent_items_get_unique_ids():
+    ids = _run_concurrently(lambda: [Item().id for _ in range(2000)])
+    flat = [item_id for chunk in ids for item_id in chunk]
+    assert len(set(flat)) == len(flat)
+
+
+MENU_DATA = {
+    'Variants': {
+        '14SCREEN': {'Code': '14SCREEN', 'Name': 'Large Hand Tossed', 'Price': '13.99',
+                     'SizeCode': '14', 'ProductCode': 'S_PIZZA',
+                     'Tags': {'DefaultToppings': 'X=1,C=1'}},
+        '2LCOKE': {'Code': '2LCOKE', 'Name': 'Coke', 'Price': '3.49', 'SizeCode': '2LTB',
+                   'ProductCode': 'F_COKE', 'Tags': {}},
+    },
+}
+
+
+def test_concurrent_menu_searches_do_not_write_to_the_menu():
+    menu = Menu(MENU_DATA)
+    before = {key: dict(variant) for key, variant in menu.variants.items()}
+    results = _run_concurrently(lambda: [menu.search(Toppings='x') for _ in range(200)])
+    for chunk in results:
+        for found in chunk:
+            assert [result['Code'] for result in found] == ['14SCREEN']
+            assert found[0]['FullData']['Toppings'] == {'X': '1', 'C': '1'}
+    assert menu.variants == before
+    assert 'Toppings' not in menu.variants['14SCREEN']
+
+
+def test_concurrent_store_info_is_fetched_once(monkeypatch):
+    calls = []
+
+    def request_json(url, **kwargs):
+        calls.append(kwargs)
+        time.sleep(0.05)
+        return {'StoreID': kwargs['store_id'], 'IsOnlineNow': True}
+
+    monkeypatch.setattr(store_module, 'request_json', request_json)
+    store = Store('4336')
+    assert all(_run_concurrently(lambda: store.is_online))
+    assert len(calls) == 1
+
+
+def test_concurrent_store_menu_is_fetched_once(monkeypatch):
+    calls = []
+
+    def from_store(store_id, lang, country):
+        calls.append(store_id)
+        time.sleep(0.05)
+        return Menu(MENU_DATA)
+
+    monkeypatch.setattr(Menu, 'from_store', staticmethod(from_store))
+    store = Store('4336')
+    menus = _run_concurrently(lambda: store.menu)
+    assert len(calls) == 1
+    assert all(menu is menus[0] for menu in menus)
+
+
+class _Response(object):
+    status_code = 200
+    headers = {}
+
+    def __init__(self, content):
+        self.content = content
+
+    def raise_for_status(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class _Session(object):
+    def __init__(self):
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def get(self, url, headers=None, stream=False):
+        with self._lock:
+            self.calls += 1
+        time.sleep(0.05)
+        return _Response(b'jpeg')
+
+
+def test_concurrent_image_content_is_fetched_once():
+    session = _Session()
+    image = Image('S_PIZZA', session=session)
+    contents = _run_concurrently(lambda: image.content)
+    assert contents == [b'jpeg'] * THREADS
+    assert session.calls == 1
+
+
+def test_concurrent_cache_use_keeps_counts_and_bounds():
+    cache = TTLCache(ttl=60, maxsize=50)
+
+    def use():
+        for n in range(1000):
+            if cache.get(n % 100) is None:
+                cache.set(n % 100, n)
+
+    _run_concurrently(use)
+    stats = cache.stats
+    assert stats['hits'] + stats['misses'] == 1000 * THREADS
+    assert stats['size'] <= 50
+
+
+def test_concurrent_clones_do_not_share_changes():
+    template = Order()
+    template.add_item({'Code': '14SCREEN'})
+    codes = iter(range(THREADS))
+    lock = threading.Lock()
+
+    def clone():
+        with lock:
+            code = f"ITEM{next(codes)}"
+        order = Order.from_template(template, store_id='4336')
+        for _ in range(100):
+            order.add_item({'Code': code})
+            order = order.clone()
+        return code, order
+
+    for code, order in _run_concurrently(clone):
+        assert [product['Code'] for product in order.products] == ['14SCREEN'] + [code] * 100
+    assert [product['Code'] for product in template.products] == ['14SCREEN']
@@ -0,0 +1,173 @@
+import io
+import time
+import tracemalloc
+
+import pytest
+import xmltodict
+
+from pizzapi import track
+from pizzapi.track import Tracking, track_by_phone
+from pizzapi.utils import iter_xml_records
+
+ENVELOPE = ('<?xml version="1.0" encoding="utf-8"?>'
+            '<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">'
+            '<soap:Body><GetTrackerDataResponse xmlns="http://www.dominos.com/message/">'
+            '<OrderStatuses>{}</OrderStatuses></GetTrackerDataResponse></soap:Body></soap:Envelope>')
+RECORD = ('<OrderStatus><StoreID>4336</StoreID><OrderID>{0}</OrderID><Phone>5555555555</Phone>'
+          '<OrderStatus>Oven</OrderStatus><StartTime>2026-10-19T18:00:00</StartTime>'
+          '<Actions><Track>/orderstorage/GetTrackerData?StoreID=4336&amp;OrderKey={0}</Track></Actions>'
+          '</OrderStatus>')
+
+
+def _envelope(count):
+    return ENVELOPE.format(''.join(RECORD.format(n) for n in range(count))).encode('utf-8')
+
+
+def _xmltodict_records(document):
+    body = xmltodict.parse(document)['soap:Envelope']['soap:Body']
+    records = body['GetTrackerDataResponse']['OrderStatuses']['OrderStatus']
+    return records if isinstance(records, list) else [records]
+
+
+def test_streamed_records_match_xmltodict():
+    document = _envelope(3)
+    assert list(iter_xml_records(io.BytesIO(document), 'OrderStatus', 'OrderStatuses')) == \
+        _xmltodict_records(document)
+
+
+def test_track_by_phone_without_orders_raises_key_error(monkeypatch):
+    monkeypatch.setattr(track, 'request_xml_records', lambda *args, **kwargs: iter(()))
+    with pytest.raises(KeyError):
+        track_by_phone('5555555555')
+
+
+def test_by_phone_keeps_the_whole_soap_response(monkeypatch):
+    document = xmltodict.parse(_envelope(2))
+    monkeypatch.setattr(track, 'request_xml', lambda url, **kwargs: document)
+    monkeypatch.setattr(track, 'request_json', lambda url: {'OrderStatus': 'Oven', 'OrderID': '0'})
+    tracking = Tracking().by_phone('5555555555')
+    assert tracking.dominos_phone_api_result is document
+    assert tracking.get_order_status()['order_id'] == '0'
+
+
+class CountingReader(io.BytesIO):
+    """A file that remembers how many bytes have been read from it."""
+
+    bytes_read = 0
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self.bytes_read += len(data)
+        return data
+
+
+def test_records_are_streamed_before_the_document_is_read():
+    document = _envelope(2000)
+    source = CountingReader(document)
+    records = iter_xml_records(source, 'OrderStatus', 'OrderStatuses')
+    assert next(records)['OrderID'] == '0'
+    assert source.bytes_read < len(document) / 4
+    assert sum(1 for _ in records) == 1999
+
+
+def test_track_by_phone_result_shapes(monkeypatch):
+    records = [[{'OrderID': '1'}], [{'OrderID': '1'}, {'OrderID': '2'}]]
+    monkeypatch.setattr(track, 'request_xml_records', lambda *args, **kwargs: iter(records.pop(0)))
+    assert track_by_phone('5555555555') == {'OrderID': '1'}
+    assert track_by_phone('5555555555') == [{'OrderID': '1'}, {'OrderID': '2'}]
+
+
+def test_iter_track_by_phone_streams_the_response():
+    class FakeResponse(object):
+        closed = False
+
+        def __init__(self):
+            self.raw = io.BytesIO(_envelope(3))
+
+        def raise_for_status(self):
+            pass
+
+        def close(self):
+            self.closed = True
+
+    class FakeSession(object):
+        def get(self, url, stream=False):
+            assert stream
+            self.response = FakeResponse()
+            return self.response
+
+    session = FakeSession()
+    statuses = list(track.iter_track_by_phone(' 5555555555 ', session=session))
+    assert [status['OrderID'] for status in statuses] == ['0', '1', '2']
+    assert session.response.closed
+
+
+def _measure(parse, document):
+    tracemalloc.start()
+    started = time.perf_counter()
+    count = parse(document)
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return count, elapsed, peak
+
+
+@pytest.mark.slow
+def test_benchmark_streaming_against_xmltodict():
+    document = _envelope(5000)
+    streamed = _measure(lambda doc: sum(1 for _ in iter_xml_records(io.BytesIO(doc), 'OrderStatus',
+                                                                    'OrderStatuses')), document)
+    parsed = _measure(lambda doc: len(_xmltodict_records(doc)), document)
+    print(f"\niterparse: {streamed[1]:.3f}s peak {streamed[2] / 2 ** 20:.1f} MiB; "
+          f"xmltodict: {parsed[1]:.3f}s peak {parsed[2] / 2 ** 20:.1f} MiB")
+    assert streamed[0] == parsed[0] == 5000
+    # Memory is the point of streaming: it must not grow with the records
+    assert streamed[2] * 10 < parsed[2]
+    assert streamed[1] < parsed[1] * 1.5
+
+
+def _flaky_tracker(monkeypatch, failures):
+    import requests
+    responses = [requests.ConnectionError('reset')] * failures + [
+        {'OrderStatus': 'Oven'}, {'OrderStatus': 'Complete'}]
+    sleeps = []
+
+    def track_by_order(*args):
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    monkeypatch.setattr(track, 'track_by_order', track_by_order)
+    monkeypatch.setattr(track.time, 'sleep', sleeps.append)
+    return sleeps
+
+
+def test_watch_retries_transient_errors_with_backoff(monkeypatch):
+    sleeps = _flaky_tracker(monkeypatch, 2)
+    events = list(Tracking().watch('4336', 'key', interval=1))
+    assert [event.status for event in events] == ['Oven', 'Complete']
+    assert sleeps == [2, 4, 1]
+
+
+def test_watch_gives_up_after_max_errors(monkeypatch):
+    import requests
+    _flaky_tracker(monkeypatch, 3)
+    with pytest.raises(requests.ConnectionError):
+        list(Tracking().watch('4336', 'key', interval=1, max_errors=3))
+
+
+def test_awatch_retries_transient_errors(monkeypatch):
+    import asyncio
+    _flaky_tracker(monkeypatch, 1)
+    sleep = asyncio.sleep
+    monkeypatch.setattr(track.asyncio, 'sleep', lambda delay: sleep(0))
+
+    async def collect():
+        return [event.status async for event in Tracking().awatch('4336', 'key', interval=1)]
+
+    loop = asyncio.new_event_loop()
+    try:
+        assert loop.run_until_complete(collect()) == ['Oven', 'Complete']
+    finally:
+        loop.close()
@@ -0,0 +1,117 @@
+import random
+import threading
+
+import pytest
+
+from pizzapi import tracker as tracker_module
+from pizzapi.tracker import OrderTracker
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+class FakeTracker(object):
+    """Stands in for track_by_order, replaying statuses or raising errors."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = 0
+
+    def __call__(self, store_id, order_key, country, session=None):
+        self.calls += 1
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return {'OrderStatus': result}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(tracker_module, 'time', clock)
+    return clock
+
+
+def _tracker(monkeypatch, *results, **kwargs):
+    fake = FakeTracker(*results)
+    monkeypatch.setattr(tracker_module, 'track_by_order', fake)
+    kwargs.setdefault('jitter', 0)
+    return OrderTracker(session=object(), **kwargs), fake
+
+
+def _next_poll(tracker):
+    return min(tracker._heap)[0]
+
+
+def test_interval_follows_status(monkeypatch, clock):
+    tracker, _ = _tracker(monkeypatch, 'Oven', 'Out the Door', 'Unknown')
+    order = tracker.track('4336', 'key')
+    tracker._heap.clear()
+    for expected in (60, 10, 30):
+        tracker._poll(order)
+        assert _next_poll(tracker) == clock.now + expected
+        tracker._heap.clear()
+
+
+def test_jitter_spreads_intervals(monkeypatch):
+    monkeypatch.setattr(tracker_module, 'random', random.Random(3))
+    tracker = OrderTracker(session=object(), jitter=0.2)
+    intervals = [tracker.interval('Oven') for _ in range(200)]
+    assert all(48 <= interval <= 72 for interval in intervals)
+    assert max(intervals) - min(intervals) > 12
+
+
+def test_terminal_status_drops_the_order(monkeypatch, clock):
+    updates, completed = [], []
+    tracker, _ = _tracker(monkeypatch, 'Oven', 'Oven', 'Complete',
+                          on_update=lambda order: updates.append(order.status), on_complete=completed.append)
+    order = tracker.track('4336', 'key')
+    for _ in range(3):
+        tracker._heap.clear()
+        tracker._poll(order)
+    assert updates == ['Oven', 'Complete']
+    assert completed == [order]
+    assert len(tracker) == 0
+    assert tracker._heap == []
+    assert order.polls == 3
+
+
+def test_errors_back_off_then_drop(monkeypatch, clock):
+    completed = []
+    tracker, _ = _tracker(monkeypatch, *[IOError('down')] * 3, max_errors=3, on_complete=completed.append)
+    order = tracker.track('4336', 'key')
+    for expected in (60, 120):
+        tracker._heap.clear()
+        tracker._poll(order)
+        # The default interval (30s) doubled per consecutive error
+        assert _next_poll(tracker) == clock.now + expected
+    tracker._heap.clear()
+    tracker._poll(order)
+    assert completed == [order]
+    assert (order.errors, tracker.errors) == (3, 3)
+    assert tracker._heap == []
+
+
+def test_success_resets_errors(monkeypatch, clock):
+    tracker, _ = _tracker(monkeypatch, IOError('down'), 'Makeline')
+    order = tracker.track('4336', 'key')
+    tracker._poll(order)
+    tracker._poll(order)
+    assert (order.errors, order.status) == (0, 'Makeline')
+
+
+def test_background_polling(monkeypatch):
+    done = threading.Event()
+    tracker, fake = _tracker(monkeypatch, 'Complete', max_rate=100, on_complete=lambda order: done.set())
+    tracker.track('4336', 'key')
+    tracker.start()
+    try:
+        assert done.wait(2)
+    finally:
+        tracker.stop()
+    assert fake.calls == 1